@@ -52,28 +52,33 @@ os.environ["QT_ENABLE_HIGHDPI_SCALING"] = "1"
 import shutil
 import subprocess
 import time
-import requests
 import threading
 import json
 import random
-from queue import Queue, Empty
 try:
     import pydirectinput
 except Exception:
     pydirectinput = None
 
 XDO_TOOL = shutil.which("xdotool") if not sys.platform.startswith("win") else None
-import sqlite3
 import dashboard_qt  # New file must be in the same folder!
 import launcher_qt
 import characters_qt
 import settings_qt
 import overlay_config_qt
 from discord_presence import DiscordPresenceManager
+from census_rest import CensusRestError, get_census_client
 from census_worker import CensusWorker
+from name_resolver import NameResolver
+from session_clock import SessionClock
+from session_stats import SessionStatsStore
 from overlay_window import QtOverlay
-from dior_utils import BASE_DIR, ASSETS_DIR, IMAGES_DIR, SOUNDS_DIR, CROSSHAIR_DIR, DB_PATH, get_asset_path, log_exception, clean_path, IS_WINDOWS, get_user_data_dir
+from player_cache import PlayerCache
+from dior_utils import BASE_DIR, ASSETS_DIR, IMAGES_DIR, SOUNDS_DIR, CROSSHAIR_DIR, get_asset_path, log_exception, clean_path, IS_WINDOWS, get_user_data_dir
 from dior_db import DatabaseHandler
+from item_catalog import get_item_catalog
+from db_maintenance import DatabaseMaintenance
+from session_journal import SessionJournal
 from twitch_worker import TwitchWorker
 from release_updater import ReleaseUpdater
 
@@ -269,6 +274,7 @@ class DiorClientGUI:
         self.BASE_DIR = BASE_DIR  # Now comes from 'dior_utils' import
         self.db = DatabaseHandler()  # Comes from 'dior_db'
         self.s_id = os.getenv("CENSUS_S_ID", "s:example")
+        self.census_rest = get_census_client(self.s_id)  # Shared pooled/caching REST client
 
         # 2. LOAD DATA
         self.config = self.load_config()
@@ -281,8 +287,11 @@ class DiorClientGUI:
         self.release_updater = self._build_release_updater()
         self.char_data = self.db.load_my_chars()
 
-        # Load cache (Returns 2 dictionaries: Names and Outfits)
-        self.name_cache, self.outfit_cache = self.db.load_player_cache()
+        # Name/outfit lookups: bounded LRU in front of player_cache point lookups,
+        # warmed with the most recently seen players.
+        self.player_cache = PlayerCache(self.db, capacity=self.config.get("player_cache_size", 20000))
+        self.player_cache.warm(self.config.get("player_cache_warm", 5000))
+        self.name_cache, self.outfit_cache = self.player_cache.names, self.player_cache.outfits
 
         # 2. LOGIC VARIABLES
         self.ps2_dir = self.config.get("ps2_path", "")
@@ -324,7 +333,8 @@ class DiorClientGUI:
         self.last_session_update = 0
         self.stats_last_refresh_time = 0  # To throttle stats updates
         self.live_stats = {"VS": 0, "NC": 0, "TR": 0, "NSO": 0, "Total": 0}
-        self.session_stats = {}
+        self.session_stats = SessionStatsStore()
+        self.session_clock = SessionClock()  # Event-time clock for session time / KPM
         self.active_players = {}
 
         self.db_player_count = 0
@@ -335,8 +345,7 @@ class DiorClientGUI:
         self.last_killer_name = "None"
         self.last_killer_id = "0"
         self.last_evidence_url = ""
-        self.item_db = {}
-        self.id_queue = Queue()  # IMPORTANT: Initialize here for Cache Worker
+        self.item_db = get_item_catalog()  # sanction-list.csv index, loads in the background
         self.websocket = None
         self.loop = None
 
@@ -442,19 +451,34 @@ class DiorClientGUI:
             QTimer.singleShot(1200, self._prompt_apply_staged_update_if_available)
 
         # 8. BACKGROUND THREADS
-        threading.Thread(target=self.cache_worker, daemon=True).start()
-        print("SYS: Cache Worker Thread started.")
+        # Batched character ID -> name/outfit lookups (fills name_cache / outfit_cache)
+        self.name_resolver = NameResolver(
+            self.census_rest, self.name_cache, self.outfit_cache,
+            on_results=self._store_resolved_names, on_error=self._name_resolver_error,
+        ).start()
+        print("SYS: Name Resolver Thread started.")
+
+        # Player DB retention / incremental vacuum / size stats
+        self.db_maintenance = DatabaseMaintenance(
+            self.db, self.player_cache,
+            retention_days=self.config.get("db_retention_days", 90),
+            interval_s=self.config.get("db_maintenance_interval_min", 60) * 60,
+            on_stats=self._on_db_stats, log=self.add_log,
+        ).start()
+        threading.Thread(target=self.db_maintenance.publish_stats, daemon=True).start()
+
+        # Write-behind history of own-character session stats (last-7-days KPM/KD)
+        self.stats_journal = SessionJournal(
+            self.db, lambda: self.session_stats, lambda: list(self.char_data.values()),
+            clock=self.session_clock, interval_s=self.config.get("stats_journal_interval_s", 5),
+            log=self.add_log,
+        ).start()
 
         self.census = CensusWorker(self, self.s_id)
         self.census.start()
 
         threading.Thread(target=self.ps2_process_monitor, daemon=True).start()
 
-        # Item DB
-        csv_path = get_asset_path("sanction-list.csv")
-        if os.path.exists(csv_path):
-            self.load_item_db(csv_path)
-
         # Stats Timer
         self.stats_timer = QTimer(self.main_hub)
         self.stats_timer.timeout.connect(self.update_live_graph)
@@ -711,14 +735,7 @@ class DiorClientGUI:
 
     def update_db_count_cache(self):
         """Reads the number of unique players from the DB."""
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            count = cursor.execute("SELECT COUNT(*) FROM player_cache").fetchone()[0]
-            conn.close()
-            self.db_player_count = count
-        except Exception as e:
-            print(f"DB Count Error: {e}")
+        self.db_player_count = self.db.player_count()
 
     def _resolve_overlay_stats_payload(self, force_placeholder=False):
         """
@@ -759,28 +776,29 @@ class DiorClientGUI:
             found_any = False
             latest_kill = 0
             
-            now = time.time()
+            now = self.session_clock.now()
             total_acc_t = 0
 
-            for cid, s_obj in self.session_stats.items():
-                if cid in owned_ids:
-                    found_any = True
-                    for k in ["k", "d", "a", "hs", "hsrkill", "dhs", "dhs_eligible", "revives_received"]:
-                        agg_stats[k] += s_obj.get(k, 0)
-                    
-                    # Add accumulated time. If this is the currently active character, add the time since their start.
-                    char_acc_t = s_obj.get("acc_t", 0)
-                    char_start = s_obj.get("start", 0)
-                    
-                    if cid == my_id and char_start > 0:
-                        char_acc_t += (now - char_start)
-                    
-                    total_acc_t += char_acc_t
-                        
-                    if s_obj.get("last_kill_time", 0) > latest_kill:
-                        latest_kill = s_obj.get("last_kill_time", 0)
-            
+            for cid in owned_ids:
+                s_obj = self.session_stats.get(cid)
+                if s_obj is None:
+                    continue
+                found_any = True
+
+                # Add accumulated time. If this is the currently active character, add the time since their start.
+                char_acc_t = s_obj.get("acc_t", 0)
+                char_start = s_obj.get("start", 0)
+
+                if cid == my_id and char_start > 0:
+                    char_acc_t += (now - char_start)
+
+                total_acc_t += char_acc_t
+
+                if s_obj.get("last_kill_time", 0) > latest_kill:
+                    latest_kill = s_obj.get("last_kill_time", 0)
+
             if found_any:
+                agg_stats.update(self.session_stats.totals(owned_ids))
                 agg_stats["acc_t"] = total_acc_t
                 agg_stats["start"] = now # Set start to now so overlay_window.py only adds (now - now) = 0 to acc_t
                 agg_stats["last_kill_time"] = latest_kill
@@ -789,23 +807,21 @@ class DiorClientGUI:
         # Fallback to character session
         if my_id:
             stats_obj = self.session_stats.get(my_id)
-            if isinstance(stats_obj, dict) and len(stats_obj) > 0:
+            if stats_obj is not None:
                 return stats_obj, False
 
         return {}, True
 
-    def _ensure_session_stats_entry(self, cid, name=None):
+    def _ensure_session_stats_entry(self, cid, name=None, start=None):
         """Ensure an active character always has a concrete stats object (not debug placeholder)."""
         cid = str(cid or "").strip()
         if not cid:
             return {}
 
         existing = self.session_stats.get(cid)
-        if isinstance(existing, dict) and len(existing) > 0:
+        if existing is not None:
             if name and (not existing.get("name") or existing.get("name") == "Searching..."):
                 existing["name"] = name
-            if "last_seen_base" not in existing:
-                existing["last_seen_base"] = ""
             return existing
 
         resolved_name = name
@@ -819,23 +835,13 @@ class DiorClientGUI:
         if not resolved_name:
             resolved_name = "Searching..."
 
-        now = time.time()
         base_world = str(getattr(self, "current_world_id", "0") or "0")
-        obj = {
-            "id": cid,
-            "name": resolved_name,
-            "faction": "NSO",
-            "k": 0, "d": 0, "a": 0, "hs": 0, "hsrkill": 0,
-            "dhs": 0, "dhs_eligible": 0,
-            "revives_received": 0,
-            "start": now,
-            "acc_t": 0,
-            "last_kill_time": now,
-            "world_id": base_world,
-            "last_seen_base": ""
-        }
-        self.session_stats[cid] = obj
-        return obj
+        if start is None:
+            start = self.session_clock.now()
+        return self.session_stats.create(
+            cid, name=resolved_name, faction="NSO", world_id=base_world,
+            start=start, last_kill_time=start,
+        )
 
     def update_stats_position_safe(self):
         """Calculates the position of the Stats widget safely and consistently."""
@@ -925,6 +931,13 @@ class DiorClientGUI:
             # Usually handled by immediate signals, but for the Save button:
             self.config["main_background_path"] = data["main_background_path"]
 
+        # Save player DB retention
+        if "db_retention_days" in data:
+            days = max(0, int(data["db_retention_days"]))
+            self.config["db_retention_days"] = days
+            if getattr(self, "db_maintenance", None):
+                self.db_maintenance.retention_days = days
+
         # Save Discord Presence setting
         if "discord_presence_active" in data:
             desired = bool(data["discord_presence_active"])
@@ -1854,6 +1867,7 @@ class DiorClientGUI:
         self.safe_connect(self.settings_win.signals.clear_bg_requested, self.clear_background_file)
         if hasattr(self.settings_win.signals, "check_updates_requested"):
             self.safe_connect(self.settings_win.signals.check_updates_requested, self.check_for_updates_qt)
+        self.safe_connect(self.settings_win.signals.compact_db_requested, self.compact_database)
 
         # IMPORTANT: Connect the save signal!
         self.safe_connect(self.settings_win.signals.save_requested, self.update_main_config_from_settings)
@@ -2264,9 +2278,7 @@ class DiorClientGUI:
         error_msg = ""
 
         try:
-            url = f"https://census.daybreakgames.com/{self.s_id}/get/ps2:v2/character/?name.first_lower={name.lower()}"
-            response = requests.get(url, timeout=15)
-            r = response.json()
+            r = self.census_rest.get("character", {"name.first_lower": name.lower()})
 
             if r.get('returned', 0) > 0:
                 c_list = r['character_list'][0]
@@ -2280,6 +2292,8 @@ class DiorClientGUI:
 
                 # Dictionary Update (RAM)
                 self.char_data[real_name] = cid
+                if getattr(self, "census", None):
+                    self.census.on_characters_changed()
                 success = True
             else:
                 error_msg = f"Character '{name}' not found."
@@ -2321,9 +2335,11 @@ class DiorClientGUI:
         if name in self.char_data:
             try:
                 # --- DB OPERATION (NEW) ---
-                self.db.remove_my_char(name)
+                self.db.remove_my_char(self.char_data[name])
 
                 del self.char_data[name]
+                if getattr(self, "census", None):
+                    self.census.on_characters_changed()
                 self.add_log(f"SYS: {name} deleted.")
 
                 # GUI Update
@@ -2346,6 +2362,8 @@ class DiorClientGUI:
         self.current_character_id = cid
         self.last_tracked_id = cid
         self.current_selected_char_name = name
+        if getattr(self, "census", None):
+            self.census.refresh_tracked_characters()
         if cid:
             # Force immediate repaint so active-session data (if present) is shown right away.
             self.stats_last_refresh_time = 0
@@ -2354,15 +2372,21 @@ class DiorClientGUI:
             self.update_discord_presence()
 
         self.add_log(f"SYS: Tracking active for: {name}")
+        if cid and getattr(self, "stats_journal", None):
+            try:
+                week = self.stats_journal.summary(cid, days=7, kd_mode_revive=self.kd_mode_revive)
+                if week["seconds"] > 0:
+                    self.add_log(f"HISTORY: {name} last 7 days: {week['k']} kills, KD {week['kd']:.2f}, "
+                                 f"KPM {week['kpm']:.2f} over {week['seconds'] / 3600:.1f}h")
+            except Exception as e:
+                print(f"History Summary Error: {e}")
 
         # --- OPTIONAL: Server-Switch logic (if present) ---
         try:
-            conn = sqlite3.connect(DB_PATH)
-            res = conn.execute("SELECT world_id FROM player_cache WHERE character_id=?", (cid,)).fetchone()
-            conn.close()
+            world_id = self.db.get_player_world(cid)
 
-            if res and res[0]:
-                new_world_id = str(res[0])
+            if world_id:
+                new_world_id = str(world_id)
                 # Only switch if different
                 if new_world_id != str(self.current_world_id):
                     s_name = self.get_server_name_by_id(new_world_id)
@@ -4286,8 +4310,9 @@ class DiorClientGUI:
         self.config["world_id"] = world_id
         self.save_config()
         
-        # No websocket restart needed - we monitor all servers globally.
-        # This function just updates the visual filter ID.
+        # No websocket restart needed - the subscription is updated in place.
+        if getattr(self, "census", None):
+            self.census.refresh_subscription()
 
     def ps2_process_monitor(self):
         """Monitors process and uses signals."""
@@ -4469,28 +4494,6 @@ class DiorClientGUI:
             # Send update command to overlay
             self.overlay_win.update_crosshair(full_path, size_val, should_show)
 
-    def load_item_db(self, filepath):
-        """Loads the weapon database from assets folder"""
-        self.item_db = {}
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                next(f)  # Skip: Item ID, Item Category, Is Vehicle Weapon...
-                for line in f:
-                    parts = line.strip().split(",")
-                    if len(parts) >= 6:
-                        item_id = parts[0]
-                        item_name = parts[3]
-                        weapon_class = parts[1]  # 'none', 'max', 'infantry', 'vehicle'
-
-                        # Save so you can easily access it later
-                        self.item_db[item_id] = {
-                            "name": item_name,
-                            "type": weapon_class
-                        }
-            print(f"Database loaded: {len(self.item_db)} items found.")
-        except Exception as e:
-            print(f"Error loading item DB: {e}")
-
     def load_config(self):
         """
         Loads configuration with intelligent backup strategy.
@@ -4531,11 +4534,29 @@ class DiorClientGUI:
             "overlay_dedupe_window_ms": 120,
             "overlay_transient_max_pending": 2048,
             "overlay_ws_batching_v2": False,
+            "overlay_ws_compact": True,
+            "overlay_ws_msgpack": False,
+            "overlay_ws_deflate": True,
             "overlay_trace_export": False,
             "event_pipeline_v2": True,
             "js_scheduler_v2": True,
             "overlay_backend": "legacy",
             "tauri_overlay_autostart": False,
+            "census_global_subscription": False,
+            "census_decode_pool": "thread",
+            "census_decode_workers": 0,
+            "census_ingest_max_pending": 5000,
+            "census_ingest_policy": "shed_oldest",
+            "census_lag_alert_s": 10,
+            "census_perf_log": False,
+            "census_record": False,
+            "census_record_max_mb": 64,
+            "census_record_files": 5,
+            "player_cache_size": 20000,
+            "player_cache_warm": 5000,
+            "db_retention_days": 90,
+            "db_maintenance_interval_min": 60,
+            "stats_journal_interval_s": 5,
             "crosshair": {"file": "crosshair.png", "size": 32, "active": True, "shadow": False},
             "events": {},
             "streak": {"img": "KS_Counter.png", "active": True},
@@ -4709,55 +4730,22 @@ class DiorClientGUI:
         if hasattr(self.dash_window, 'graph'):
             self.dash_window.graph.update_history(total_players, faction_data)
 
-        # 3. PREPARE PLAYER LIST
-        active_ids = self.active_players.keys()
-        now = time.time()
-        prepared_players = []
-
-        for p_id, p in self.session_stats.items():
-            # Only consider players still marked as 'active'
-            if not isinstance(p, dict) or p_id not in active_ids:
-                continue
-
-            # --- SERVER FILTER ---
-            if str(p.get("world_id", "0")) != current_wid:
-                continue
-
-            # --- NAME FIX ---
-            p_name = p.get("name")
-            if p_name in ["Unknown", "Searching...", None]:
-                p_name = self.name_cache.get(p_id, f"ID: {p_id[-4:]}")
-
-            # --- KPM LOGIC ---
-            p_start = p.get("start", now)
-            active_min = max((now - p_start) / 60, 0.5)
-
-            # --- KD CALCULATION (Real vs Revive) ---
-            raw_deaths = p.get("d", 0)
-            revives = p.get("revives_received", 0)
+        # 3. PREPARE PLAYER LIST (only players still marked as 'active' on this server)
+        # Filtering, KD (Real vs Revive), KPM minutes and the kill sort run over
+        # the stats columns. IMPORTANT: 'd' already holds the effective deaths so
+        # dashboard (table + graph) shows correct values without logic changes there.
+        prepared_players = self.session_stats.leaderboard(
+            current_wid, self.active_players, kd_mode_revive=self.kd_mode_revive,
+            now=self.session_clock.now(),
+        )
 
-            if self.kd_mode_revive:
-                # Revive Mode: Deaths reduced by revives (min 0)
-                eff_deaths = max(0, raw_deaths - revives)
-            else:
-                # Real Mode: All deaths count
-                eff_deaths = raw_deaths
-
-            # Assemble package
-            # IMPORTANT: We send 'eff_deaths' as 'd' so dashboard (table + graph)
-            # automatically shows correct values without needing logic changes there.
-            prepared_players.append({
-                "name": p_name,
-                "fac": p.get("faction", "NSO"),  # NSO is okay here so you see who it is
-                "k": p.get("k", 0),
-                "d": eff_deaths,
-                "a": p.get("a", 0),
-                "active_min": active_min
-            })
-
-        # 4. SORT & SEND
-        prepared_players.sort(key=lambda x: x['k'], reverse=True)
+        # --- NAME FIX ---
+        for p in prepared_players:
+            p_id = p.pop("id")
+            if p["name"] in ["Unknown", "Searching...", None]:
+                p["name"] = self.name_cache.get(p_id, f"ID: {p_id[-4:]}")
 
+        # 4. SEND
         self.dash_controller.signals.update_top_list.emit(prepared_players)
         self.dash_controller.signals.update_db_count.emit(self.db_player_count)
 
@@ -4780,7 +4768,7 @@ class DiorClientGUI:
         preserved_active_session = None
         if active_char_id:
             candidate = self.session_stats.get(active_char_id)
-            if isinstance(candidate, dict) and len(candidate) > 0:
+            if candidate is not None:
                 preserved_active_session = dict(candidate)
 
         # 1. Update variables
@@ -4791,6 +4779,10 @@ class DiorClientGUI:
         self.config["world_id"] = self.current_world_id
         self.save_config()
 
+        # Move the Census subscription to the new world (incremental re-subscribe).
+        if getattr(self, "census", None):
+            self.census.refresh_subscription()
+
         # 3. Update label
         if hasattr(self, 'lbl_server_title'):
              # Tkinter .config() removed, using setText for PyQt
@@ -4800,8 +4792,10 @@ class DiorClientGUI:
                  pass # Might be wrong type or already deleted
 
         # 4. DATA RESET (So new server starts at 0)
+        if getattr(self, "stats_journal", None):
+            self.stats_journal.flush()  # Journal the old store's last seconds first
         self.pop_history = [0] * 100
-        self.session_stats = {}
+        self.session_stats = SessionStatsStore()
         if preserved_active_session and active_char_id:
             preserved_active_session["world_id"] = self.current_world_id
             self.session_stats[active_char_id] = preserved_active_session
@@ -4841,6 +4835,10 @@ class DiorClientGUI:
         """
         Saves the configuration to config.json AND config_backup.json.
         """
+        # Killfeed styles are cached by the Census worker; rebuild on next use.
+        if getattr(self, "census", None):
+            self.census.invalidate_killfeed_style()
+
         try:
             # 1. Get path
             fallback_base = getattr(self, "user_data_dir", get_user_data_dir())
@@ -7230,7 +7228,7 @@ log "DONE"
             return
 
         stats_obj = self.session_stats.get(char_id)
-        if not isinstance(stats_obj, dict) or not stats_obj:
+        if stats_obj is None:
             self.clear_discord_presence()
             return
 
@@ -7259,6 +7257,21 @@ log "DONE"
         manager = getattr(self, "discord_presence", None)
         if manager is not None:
             manager.close()
+        census = getattr(self, "census", None)
+        if census is not None:
+            census.stop_recording()
+        resolver = getattr(self, "name_resolver", None)
+        if resolver is not None:
+            resolver.stop()
+        journal = getattr(self, "stats_journal", None)
+        if journal is not None:
+            journal.stop()
+        maintenance = getattr(self, "db_maintenance", None)
+        if maintenance is not None:
+            maintenance.stop()
+        db = getattr(self, "db", None)
+        if db is not None:
+            db.close()
 
     def check_mouse_leave(self):
         x, y = self.root.winfo_pointerxy()
@@ -7324,80 +7337,35 @@ log "DONE"
 
 
 
-    def cache_worker(self):
-        while True:
-            ids = []
-            try:
-                # Collect IDs from queue (waits max 5 seconds for new IDs)
-                while len(ids) < 30:
-                    ids.append(self.id_queue.get(timeout=5))
-            except Empty:
-                pass
+    def _store_resolved_names(self, rows):
+        """NameResolver callback: queues a resolved batch for the DB writer thread."""
+        self.db.upsert_players(rows).add_done_callback(self._on_players_stored)
 
-            if ids:
-                try:
-                    # Query Census with all details (including outfit!)
-                    url = (f"https://census.daybreakgames.com/{self.s_id}/get/ps2:v2/character/"
-                           f"?character_id={','.join(ids)}"
-                           f"&c:show=character_id,name.first,faction_id,battle_rank"
-                           f"&c:resolve=outfit")
-
-                    # First check if response is valid
-                    response = requests.get(url, timeout=15)
-                    if response.status_code == 200:
-                        try:
-                            r = response.json()
-                            if 'character_list' in r:
-                                conn = sqlite3.connect(DB_PATH)
-                                cursor = conn.cursor()
-
-                                # Ensure RAM cache exists
-                                if not hasattr(self, 'outfit_cache'):
-                                    self.outfit_cache = {}
-
-                                for char in r['character_list']:
-                                    cid = char['character_id']
-                                    name = char['name']['first']
-                                    fid = char.get('faction_id', 0)
-                                    rank = char.get('battle_rank', {}).get('value', 0)
-
-                                    # Get outfit tag (alias)
-                                    tag = char.get('outfit', {}).get('alias', "")
-
-                                    # 1. Save in database (Permanent)
-                                    cursor.execute('''INSERT OR REPLACE INTO player_cache 
-                                                      (character_id, name, faction_id, battle_rank, outfit_tag) 
-                                                      VALUES (?, ?, ?, ?, ?)''',
-                                                   (cid, name, fid, rank, tag))
-
-                                    # 2. IMPORTANT: Update in RAM
-                                    # So Census listener finds the tag IMMEDIATELY
-                                    self.name_cache[cid] = name
-                                    self.outfit_cache[cid] = tag
-
-                                conn.commit()
-                                conn.close()
-
-                                # Update GUI counter
-                                if hasattr(self, 'cache_label') and self.cache_label.winfo_exists():
-                                    try:
-                                        conn = sqlite3.connect(DB_PATH)
-                                        count = conn.execute("SELECT COUNT(*) FROM player_cache").fetchone()[0]
-                                        conn.close()
-
-                                        QTimer.singleShot(0, lambda c=count: self.cache_label.config(
-                                            text=f"Characters in db: {c}"))
-
-                                        self.update_db_count_cache()
-                                    except Exception as e:
-                                        print(f"DEBUG: Cache Label Update skipped: {e}")
-                        except ValueError:
-                            self.add_log("SYS: Census API sent invalid JSON (Server busy?)")
-                    else:
-                        self.add_log(f"SYS: Census API Error {response.status_code}")
+    def _on_players_stored(self, fut):
+        try:
+            fut.result()
+        except Exception as e:
+            self.add_log(f"DB-ERROR (Cache): {e}")
+        self.update_db_count_cache()
 
-                except Exception as e:
-                    self.add_log(f"DB-ERROR (Cache): {e}")
+    def _on_db_stats(self, stats):
+        """DatabaseMaintenance callback (worker thread): forwards stats to the settings page."""
+        self.db_player_count = stats.get("players", self.db_player_count)
+        if hasattr(self, "settings_win"):
+            self.settings_win.signals.db_stats_updated.emit(stats)
+
+    def compact_database(self):
+        """Settings button: expiry + full VACUUM in the background."""
+        def worker():
+            try:
+                self.db_maintenance.compact()
+            except Exception as e:
+                self.add_log(f"DB-ERROR (Compact): {e}")
+                self.db_maintenance.publish_stats()
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _name_resolver_error(self, error):
+        self.add_log(f"SYS: Census name lookup failed: {error}")
 
 
     def add_log(self, text):
@@ -7546,8 +7514,18 @@ log "DONE"
             try:
                 # 1. ERSTE API ABFRAGE (Basis-Daten & History)
                 # IMPORTANT: No 'weapon_stat_by_faction' here as it exceeds limit!
-                url = f"https://census.daybreakgames.com/{self.s_id}/get/ps2:v2/character/?name.first_lower={name.lower()}&c:resolve=world,outfit,stat_history"
-                r = requests.get(url, timeout=30).json()
+                rest = self.census_rest
+                # Known player: query by ID (indexed on Census' side) instead of by name.
+                known_id = self.db.find_player_id(name)
+                lookup = {"character_id": known_id} if known_id else {"name.first_lower": name.lower()}
+                r = rest.get("character", dict(lookup, **{"c:resolve": "world,outfit,stat_history"}), timeout=30)
+                if known_id:
+                    found = (r.get('character_list') or [{}])[0].get('name', {}).get('first_lower')
+                    if found != name.lower():  # Renamed since we cached it
+                        r = rest.get("character", {
+                            "name.first_lower": name.lower(),
+                            "c:resolve": "world,outfit,stat_history",
+                        }, timeout=30)
 
                 if not r.get('character_list'):
                     self.add_log(f"DEBUG: Character {name} not found.")
@@ -7610,14 +7588,12 @@ log "DONE"
 
                 # --- STEP 3: SECOND API QUERY (WEAPONS) ---
                 # 1. Fetch Faction Stats (Kills, Vehicle Kills)
-                url_wep = f"https://census.daybreakgames.com/{self.s_id}/get/ps2:v2/characters_weapon_stat_by_faction?character_id={char_id}&c:limit=5000"
-                r_wep = requests.get(url_wep, timeout=30).json()
-                w_stats_list = r_wep.get('characters_weapon_stat_by_faction_list', [])
-
-                # 2. Fetch Global Stats (Time, Shots, Hits, Headshots)
-                url_global = f"https://census.daybreakgames.com/{self.s_id}/get/ps2:v2/characters_weapon_stat?character_id={char_id}&c:limit=5000"
-                r_global_w = requests.get(url_global, timeout=30).json()
-                w_global_list = r_global_w.get('characters_weapon_stat_list', [])
+                # 2. Fetch Global Stats (Time, Shots, Hits, Headshots) - both requests in parallel
+                weapon_query = {"character_id": char_id, "c:limit": 5000}
+                f_wep = rest.get_async("characters_weapon_stat_by_faction", weapon_query, timeout=30)
+                f_global = rest.get_async("characters_weapon_stat", weapon_query, timeout=30)
+                w_stats_list = f_wep.result().get('characters_weapon_stat_by_faction_list', [])
+                w_global_list = f_global.result().get('characters_weapon_stat_list', [])
 
                 weapon_list = []
                 temp_w = {}
@@ -7689,6 +7665,9 @@ log "DONE"
         threading.Thread(target=worker, daemon=True).start()
 
 if __name__ == "__main__":
+    # Required for the optional Census process decode pool in frozen builds.
+    import multiprocessing
+    multiprocessing.freeze_support()
     try:
 
         app = QApplication(sys.argv)
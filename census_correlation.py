@@ -0,0 +1,88 @@
+from collections import deque
+
+
+class GunnerKillIndex:
+    """
+    Correlates "kill by gunner" XP with the Death event it belongs to.
+
+    The owner's XP names the victim (other_id) while the Death event carries
+    the details (headshot, weapon, gunner as attacker), and the two can
+    arrive in either order. Recent deaths sit in a fixed-size ring buffer
+    with a dict from victim ID to the newest unmatched death; XP that
+    arrives first waits in `pending` until its death shows up or `sweep()`
+    expires it. Everything runs on the apply thread, so there is no locking
+    and no timer per event.
+    """
+
+    def __init__(self, window_s=3.0, max_deaths=512):
+        self.window_s = float(window_s)
+        self._ring = deque(maxlen=max(1, int(max_deaths)))
+        self._by_victim = {}
+        self.pending = {}  # victim_id -> (exp_ts, deadline)
+        self._next_deadline = None
+        self.matched = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._ring)
+
+    def add_death(self, p, ts):
+        """Indexes a Death payload. Returns its pending XP timestamp if that XP was waiting for it."""
+        victim_id = p.get("character_id")
+        if not victim_id or victim_id == "0":
+            return None
+
+        waiting = self.pending.get(victim_id)
+        if waiting is not None and abs(ts - waiting[0]) <= self.window_s:
+            del self.pending[victim_id]
+            self.matched += 1
+            return waiting[0]
+
+        ring = self._ring
+        if len(ring) == ring.maxlen:
+            old_ts, old_victim, old_p = ring[0]
+            entry = self._by_victim.get(old_victim)
+            if entry is not None and entry[1] is old_p:
+                del self._by_victim[old_victim]
+        entry = (ts, p)
+        ring.append((ts, victim_id, p))
+        self._by_victim[victim_id] = entry
+        return None
+
+    def expect(self, victim_id, exp_ts):
+        """
+        Called for gunner-kill XP. Returns the matching Death payload if it
+        already arrived; otherwise registers the XP as pending and returns None.
+        """
+        if not victim_id or victim_id == "0":
+            return None
+        entry = self._by_victim.get(victim_id)
+        if entry is not None and abs(entry[0] - exp_ts) <= self.window_s:
+            del self._by_victim[victim_id]
+            self.matched += 1
+            return entry[1]
+
+        deadline = exp_ts + self.window_s
+        self.pending[victim_id] = (exp_ts, deadline)
+        if self._next_deadline is None or deadline < self._next_deadline:
+            self._next_deadline = deadline
+        return None
+
+    def next_deadline(self):
+        return self._next_deadline if self.pending else None
+
+    def sweep(self, now):
+        """Expires pending XP older than the window. Returns the expired victim IDs."""
+        if not self.pending or self._next_deadline is None or now < self._next_deadline:
+            return []
+        expired = []
+        next_deadline = None
+        for victim_id, (_exp_ts, deadline) in list(self.pending.items()):
+            if deadline <= now:
+                del self.pending[victim_id]
+                expired.append(victim_id)
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        self._next_deadline = next_deadline
+        self.expired += len(expired)
+        return expired
@@ -0,0 +1,78 @@
+from collections import deque
+
+
+def census_event_key(p):
+    """
+    Compact identity of a Census payload for duplicate detection.
+
+    Census repeats events across push endpoints (and replays some after a
+    reconnect); these fields are the ones that differ between genuinely
+    distinct events of the same type in the same second.
+    """
+    e_name = p.get("event_name")
+    ts = p.get("timestamp")
+    if e_name == "GainExperience":
+        return hash(("X", ts, p.get("character_id"), p.get("experience_id"), p.get("other_id")))
+    if e_name == "Death":
+        return hash(("D", ts, p.get("character_id"), p.get("attacker_character_id"), p.get("attacker_weapon_id")))
+    if e_name == "MetagameEvent":
+        return hash(("M", ts, p.get("world_id"), p.get("metagame_event_id"), p.get("metagame_event_state_name")))
+    if e_name in ("PlayerFacilityCapture", "PlayerFacilityDefend"):
+        return hash((e_name, ts, p.get("character_id"), p.get("facility_id"), p.get("world_id"), p.get("zone_id")))
+    return hash((e_name, ts, p.get("character_id", "0"), p.get("attacker_character_id", "0")))
+
+
+class TimeWindowDedupe:
+    """
+    Duplicate filter with a time-based window over payload timestamps.
+
+    Keys stay remembered for `window_s` seconds of event time (measured
+    against the newest timestamp seen, so a burst can no longer shrink the
+    window), with `max_entries` as a hard memory cap. Insert, lookup and
+    eviction are all O(1) amortized.
+    """
+
+    def __init__(self, window_s=30, max_entries=65536):
+        self.window_s = int(window_s)
+        self.max_entries = max(1, int(max_entries))
+        self._order = deque()  # (ts, key) in insertion order
+        self._seen = {}
+        self._watermark = 0
+        self.duplicates = 0
+        self.evicted_by_cap = 0
+
+    def __len__(self):
+        return len(self._seen)
+
+    def clear(self):
+        self._order.clear()
+        self._seen.clear()
+        self._watermark = 0
+
+    def seen(self, key, ts):
+        """Returns True if `key` is a duplicate; otherwise remembers it."""
+        if key in self._seen:
+            self.duplicates += 1
+            return True
+
+        try:
+            ts = int(ts)
+        except (TypeError, ValueError):
+            ts = self._watermark
+        if ts > self._watermark:
+            self._watermark = ts
+
+        self._seen[key] = ts
+        self._order.append((ts, key))
+
+        order = self._order
+        cutoff = self._watermark - self.window_s
+        while order and order[0][0] < cutoff:
+            del self._seen[order.popleft()[1]]
+        while len(order) > self.max_entries:
+            del self._seen[order.popleft()[1]]
+            self.evicted_by_cap += 1
+        return False
+
+    def seen_payload(self, p):
+        return self.seen(census_event_key(p), p.get("timestamp"))
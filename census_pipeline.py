@@ -0,0 +1,197 @@
+import json
+import queue
+import threading
+from collections import deque
+
+try:
+    import orjson
+except ImportError:  # Optional fast path
+    orjson = None
+
+
+# Payload fields that name a character taking part in the event.
+INVOLVED_CHARACTER_FIELDS = ("character_id", "attacker_character_id", "other_id")
+
+
+def _json_loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def decode_census_frames(frames):
+    """
+    Decode stage: raw websocket frames -> Census payload dicts.
+
+    Runs inside the decode pool (thread or process), so it must stay a
+    module-level function with no access to worker state. Frames without a
+    payload (heartbeats, subscription acks, service state) are dropped here.
+    """
+    payloads = []
+    for raw in frames:
+        try:
+            data = _json_loads(raw)
+        except Exception:
+            continue
+        if not isinstance(data, dict):
+            continue
+        p = data.get("payload")
+        if isinstance(p, dict):
+            payloads.append(p)
+    return payloads
+
+
+def classify_payload(p, worlds, tracked_ids):
+    """
+    Classify/filter stage: True if the apply stage needs this event.
+
+    Events from other worlds are only kept when they involve one of our
+    tracked characters (login on another server, late-join detection).
+    """
+    if not worlds:
+        return True
+    world_id = str(p.get("world_id", "") or "")
+    if not world_id or world_id in worlds:
+        return True
+    if tracked_ids:
+        for key in INVOLVED_CHARACTER_FIELDS:
+            if p.get(key) in tracked_ids:
+                return True
+    return False
+
+
+class StageStats:
+    """Timing counters for one pipeline stage (milliseconds)."""
+
+    __slots__ = ("name", "batches", "events", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self, name):
+        self.name = name
+        self.batches = 0
+        self.events = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, elapsed_ms, events=1):
+        self.batches += 1
+        self.events += int(events)
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def snapshot(self):
+        per_event = self.total_ms / self.events if self.events else 0.0
+        return {
+            "batches": self.batches,
+            "events": self.events,
+            "avg_ms_per_event": round(per_event, 4),
+            "last_ms": round(self.last_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class CensusIngestQueue:
+    """
+    Bounded, thread-safe hand-off between the classify and apply stages.
+
+    Items are either protected (they involve one of our tracked characters and
+    are never dropped, even past the cap) or global-stats-only. Global items
+    that carry a coalesce key replace a still-pending item with the same key.
+    When the queue is full, global items are shed according to the policy:
+      - "shed_oldest": drop the oldest pending global item to make room
+      - "shed_newest": drop the incoming global item
+    Items come out in arrival order across both classes.
+    """
+
+    POLICIES = ("shed_oldest", "shed_newest")
+
+    def __init__(self, max_pending=5000, policy="shed_oldest"):
+        self._cond = threading.Condition()
+        self._protected = deque()
+        self._global = deque()
+        self._by_key = {}
+        self._seq = 0
+        self.configure(max_pending, policy)
+        self.counters = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "max_depth": 0,
+        }
+
+    def configure(self, max_pending=None, policy=None):
+        if max_pending is not None:
+            try:
+                cap = int(max_pending)
+            except Exception:
+                cap = 5000
+            self.max_pending = max(100, cap)
+        if policy is not None:
+            policy = str(policy or "").strip().lower()
+            self.policy = policy if policy in self.POLICIES else "shed_oldest"
+
+    def qsize(self):
+        return len(self._protected) + len(self._global)
+
+    def put(self, item, protected=False, coalesce_key=None):
+        """Returns False if the item was dropped."""
+        with self._cond:
+            if coalesce_key is not None and not protected:
+                entry = self._by_key.get(coalesce_key)
+                if entry is not None:
+                    entry[1] = item
+                    self.counters["coalesced"] += 1
+                    return True
+
+            if not protected and self.qsize() >= self.max_pending:
+                if self.policy == "shed_oldest" and self._global:
+                    self._forget(self._global.popleft())
+                    self.counters["dropped"] += 1
+                else:
+                    self.counters["dropped"] += 1
+                    return False
+
+            self._seq += 1
+            entry = [self._seq, item, coalesce_key]
+            if protected:
+                self._protected.append(entry)
+            else:
+                self._global.append(entry)
+                if coalesce_key is not None:
+                    self._by_key[coalesce_key] = entry
+
+            self.counters["enqueued"] += 1
+            depth = self.qsize()
+            if depth > self.counters["max_depth"]:
+                self.counters["max_depth"] = depth
+            self._cond.notify()
+            return True
+
+    def get(self, timeout=None):
+        """Blocks until an item is available. Raises queue.Empty on timeout."""
+        with self._cond:
+            if not self._protected and not self._global:
+                self._cond.wait_for(self.qsize, timeout=timeout)
+                if not self._protected and not self._global:
+                    raise queue.Empty
+            if not self._global or (self._protected and self._protected[0][0] < self._global[0][0]):
+                entry = self._protected.popleft()
+            else:
+                entry = self._global.popleft()
+                self._forget(entry)
+            return entry[1]
+
+    def _forget(self, entry):
+        key = entry[2]
+        if key is not None and self._by_key.get(key) is entry:
+            del self._by_key[key]
+
+    def snapshot(self):
+        with self._cond:
+            snap = dict(self.counters)
+            snap["depth"] = self.qsize()
+            snap["max_pending"] = self.max_pending
+            snap["policy"] = self.policy
+            return snap
@@ -0,0 +1,146 @@
+import glob
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+
+RECORDING_PREFIX = "census_"
+RECORDING_SUFFIX = ".jsonl.gz"
+
+
+def recording_files(directory):
+    """Recording files in `directory`, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, f"{RECORDING_PREFIX}*{RECORDING_SUFFIX}")))
+
+
+def iter_recording(paths):
+    """
+    Yields (arrival_ts, frame) from one or more recording files (or
+    directories of them) in order. Truncated tails (app killed mid-write)
+    end the file quietly.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(recording_files(path))
+        else:
+            files.append(path)
+
+    for path in files:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ts, frame = json.loads(line)
+                    except Exception:
+                        continue
+                    yield float(ts), frame
+        except (EOFError, OSError):
+            continue
+
+
+class CensusRecorder:
+    """
+    Writes raw Census websocket frames with their arrival time to rolling,
+    gzip-compressed JSONL files (`[arrival_ts, frame]` per line).
+
+    `record()` is called from the websocket listener and only enqueues;
+    compression and disk I/O happen on a background writer thread. A new
+    file is started once the current one holds `max_bytes` of raw frames,
+    and only the newest `max_files` files are kept.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, max_files=5):
+        self.directory = directory
+        self.max_bytes = max(1024, int(max_bytes))
+        self.max_files = max(1, int(max_files))
+        self.frames = 0
+        self.path = None
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._written = 0
+        self._seq = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="Census-Recorder", daemon=True)
+            self._thread.start()
+        return self
+
+    def record(self, frame, arrival_ts=None):
+        self._queue.put((time.time() if arrival_ts is None else arrival_ts, frame))
+
+    def close(self, timeout=5.0):
+        """Flushes pending frames and closes the current file."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(item)
+                # Drain whatever else is ready before the next blocking get.
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._close_file()
+                        return
+                    self._write(item)
+                self._file.flush()
+            except Exception as e:
+                print(f"ERR: Census recorder: {e}")
+        self._close_file()
+
+    def _write(self, item):
+        ts, frame = item
+        if isinstance(frame, bytes):
+            frame = frame.decode("utf-8", "replace")
+        if self._file is None or self._written >= self.max_bytes:
+            self._rotate()
+        line = json.dumps([round(ts, 3), frame]) + "\n"
+        self._file.write(line)
+        self._written += len(line)
+        self.frames += 1
+
+    def _rotate(self):
+        self._close_file()
+        # Timestamp + zero-padded sequence so names sort in recording order.
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        while True:
+            self._seq += 1
+            path = os.path.join(self.directory, f"{RECORDING_PREFIX}{stamp}_{self._seq:04d}{RECORDING_SUFFIX}")
+            if not os.path.exists(path):
+                break
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=5)
+        self._written = 0
+        self.path = path
+
+        files = recording_files(self.directory)
+        for old in files[:-self.max_files]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
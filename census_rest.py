@@ -0,0 +1,184 @@
+import asyncio
+import concurrent.futures
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+CENSUS_BASE_URL = "https://census.daybreakgames.com"
+
+# Seconds a successful response stays cached, per collection. Only static
+# game data is cached by default: per-character collections (stats,
+# directive progress) must be fresh when the user refreshes after a fight,
+# so they only share identical in-flight requests. Collections not listed
+# are not cached.
+DEFAULT_TTLS = {
+    "directive_tree": 3600,
+}
+
+
+class CensusRestError(Exception):
+    """Census REST request failed (network, HTTP status or error payload)."""
+
+
+def build_query(query):
+    """
+    Census query string from a dict or a ready string. Values are not
+    URL-encoded: Census join/terms syntax (`^`, `:`, parentheses) is passed
+    through as written, like the hand-built URLs it replaces.
+    """
+    if isinstance(query, dict):
+        return "&".join(f"{k}={v}" for k, v in query.items())
+    return str(query or "").lstrip("?")
+
+
+class CensusRestClient:
+    """
+    Shared Census REST client.
+
+    - one pooled keep-alive requests.Session for all callers
+    - identical in-flight queries are coalesced into a single HTTP request
+    - successful responses are cached per collection (`ttls`); every caller
+      gets its own copy, so callers may modify what they receive
+    - `get()` blocks; `get_async()` returns a concurrent.futures.Future run on
+      a small worker pool; `fetch()` awaits the same from asyncio code
+
+    Use `get_census_client(service_id)` instead of constructing one per call
+    site so pooling and caching are actually shared.
+    """
+
+    def __init__(self, service_id, timeout=15, max_workers=4, ttls=None, max_cache=512, session=None):
+        self.service_id = service_id
+        self.timeout = timeout
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_cache = max(1, int(max_cache))
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(4, max_workers * 2))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Census-REST")
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+
+    def url(self, collection, query=""):
+        qs = build_query(query)
+        base = f"{CENSUS_BASE_URL}/{self.service_id}/get/ps2:v2/{collection}/"
+        return f"{base}?{qs}" if qs else base
+
+    # --- Entry points ------------------------------------------------------
+    def get(self, collection, query="", ttl=None, timeout=None):
+        """Blocking GET. Returns the decoded JSON dict or raises CensusRestError."""
+        url = self.url(collection, query)
+        ttl = self.ttls.get(collection, 0) if ttl is None else ttl
+
+        with self._lock:
+            cached = self._cache_get(url)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return copy.deepcopy(cached)
+            fut = self._inflight.get(url)
+            owner = fut is None
+            if owner:
+                fut = concurrent.futures.Future()
+                self._inflight[url] = fut
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return copy.deepcopy(fut.result())
+
+        try:
+            data = self._request(url, timeout or self.timeout)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(url, None)
+                self.stats["errors"] += 1
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(url, None)
+            if ttl and ttl > 0:
+                self._cache_put(url, data, ttl)
+        fut.set_result(data)
+        # The stored / shared object stays untouched; the owner gets a copy too.
+        return copy.deepcopy(data)
+
+    def get_async(self, collection, query="", ttl=None, timeout=None):
+        """Non-blocking GET on the client's worker pool. Returns a Future."""
+        return self._pool.submit(self.get, collection, query, ttl, timeout)
+
+    async def fetch(self, collection, query="", ttl=None, timeout=None):
+        """Awaitable GET for asyncio code (runs on the worker pool, not the loop)."""
+        return await asyncio.wrap_future(self.get_async(collection, query, ttl, timeout))
+
+    def invalidate(self, collection=None):
+        """Drops cached responses (all, or one collection)."""
+        with self._lock:
+            if collection is None:
+                self._cache.clear()
+                return
+            marker = f"/get/ps2:v2/{collection}/"
+            for url in [u for u in self._cache if marker in u]:
+                del self._cache[url]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+    # --- Internals ---------------------------------------------------------
+    def _request(self, url, timeout):
+        self.stats["requests"] += 1
+        try:
+            response = self.session.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            raise CensusRestError(str(e)) from e
+        if response.status_code != 200:
+            raise CensusRestError(f"HTTP {response.status_code}")
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise CensusRestError(f"Invalid JSON: {e}") from e
+        if not isinstance(data, dict):
+            raise CensusRestError("Unexpected response")
+        if "error" in data or "errorCode" in data:
+            raise CensusRestError(str(data.get("error") or data.get("errorCode")))
+        return data
+
+    def _cache_get(self, url):
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        expires, data = entry
+        if expires < time.monotonic():
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return data
+
+    def _cache_put(self, url, data, ttl):
+        self._cache[url] = (time.monotonic() + ttl, data)
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_census_client(service_id):
+    """Process-wide shared client for a service ID."""
+    with _clients_lock:
+        client = _clients.get(service_id)
+        if client is None:
+            client = CensusRestClient(service_id)
+            _clients[service_id] = client
+        return client
@@ -0,0 +1,136 @@
+SUBSCRIBED_EVENT_NAMES = (
+    "Death",
+    "GainExperience",
+    "PlayerLogin",
+    "PlayerLogout",
+    "MetagameEvent",
+    "PlayerFacilityCapture",
+    "PlayerFacilityDefend",
+)
+
+# Census still reports merged servers under their legacy world IDs
+# (17 -> Osprey, 13 -> Wainwright), so both must be subscribed.
+WORLD_ALIASES = {
+    "1": ("1", "17"),
+    "10": ("10", "13"),
+}
+
+
+def _clean_id(value):
+    value = str(value or "").strip()
+    if not value or value == "0":
+        return ""
+    return value
+
+
+def expand_world_ids(world_id):
+    wid = _clean_id(world_id)
+    if not wid:
+        return set()
+    return set(WORLD_ALIASES.get(wid, (wid,)))
+
+
+class CensusSubscriptionManager:
+    """
+    Tracks what the push socket is subscribed to and plans the
+    subscribe/clearSubscribe messages needed to reach a new target.
+
+    The filtered subscription is "active world OR tracked characters"
+    (Census' default, logicalAndCharactersWithWorlds=false): we receive
+    every event on the dashboard world plus our own characters anywhere,
+    which keeps auto-tracking and auto server switch working.
+    """
+
+    def __init__(self, event_names=SUBSCRIBED_EVENT_NAMES):
+        self.event_names = list(event_names)
+        self.reset()
+
+    def reset(self):
+        """Forget the current state (e.g. after a reconnect)."""
+        self.worlds = set()
+        self.characters = set()
+        self.global_mode = False
+        self.subscribed = False
+
+    def describe(self):
+        if self.global_mode:
+            return "GLOBAL MONITORING ACTIVE (All Servers)"
+        worlds = ",".join(sorted(self.worlds)) or "-"
+        return f"FILTERED MONITORING ACTIVE (Worlds: {worlds}, Characters: {len(self.characters)})"
+
+    def _subscribe_msg(self, worlds=None, characters=None):
+        msg = {
+            "service": "event",
+            "action": "subscribe",
+            "eventNames": list(self.event_names),
+            "logicalAndCharactersWithWorlds": False,
+        }
+        if worlds:
+            msg["worlds"] = sorted(worlds)
+        if characters:
+            msg["characters"] = sorted(characters)
+        return msg
+
+    def _clear_msg(self, worlds=None, characters=None):
+        msg = {"service": "event", "action": "clearSubscribe"}
+        if worlds:
+            msg["worlds"] = sorted(worlds)
+        if characters:
+            msg["characters"] = sorted(characters)
+        return msg
+
+    def plan(self, world_id, character_ids, global_mode=False):
+        """
+        Returns the list of messages to send and assumes they will be sent.
+        An empty list means the socket is already subscribed as requested.
+        """
+        global_mode = bool(global_mode)
+        if global_mode:
+            if self.subscribed and self.global_mode:
+                return []
+            msgs = []
+            if self.subscribed:
+                msgs.append({"service": "event", "action": "clearSubscribe", "all": "true"})
+            msgs.append({
+                "service": "event",
+                "action": "subscribe",
+                "characters": ["all"],
+                "worlds": ["all"],
+                "eventNames": list(self.event_names),
+            })
+            self.worlds = set()
+            self.characters = set()
+            self.global_mode = True
+            self.subscribed = True
+            return msgs
+
+        want_worlds = expand_world_ids(world_id)
+        want_chars = {cid for cid in (_clean_id(c) for c in (character_ids or ())) if cid}
+
+        msgs = []
+        if self.subscribed and self.global_mode:
+            # Leaving the firehose: drop everything and start over.
+            msgs.append({"service": "event", "action": "clearSubscribe", "all": "true"})
+            self.reset()
+
+        if not self.subscribed:
+            if want_worlds or want_chars:
+                msgs.append(self._subscribe_msg(want_worlds, want_chars))
+                self.subscribed = True
+            self.worlds = want_worlds
+            self.characters = want_chars
+            return msgs
+
+        drop_worlds = self.worlds - want_worlds
+        drop_chars = self.characters - want_chars
+        add_worlds = want_worlds - self.worlds
+        add_chars = want_chars - self.characters
+
+        if drop_worlds or drop_chars:
+            msgs.append(self._clear_msg(drop_worlds, drop_chars))
+        if add_worlds or add_chars:
+            msgs.append(self._subscribe_msg(add_worlds, add_chars))
+
+        self.worlds = want_worlds
+        self.characters = want_chars
+        return msgs
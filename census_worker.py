@@ -1,14 +1,26 @@
 import asyncio
+import concurrent.futures
 import json
+import queue
 import time
 import threading
 import os
+from collections import namedtuple
+from types import MappingProxyType
 
 import websockets
-import requests  # Important for faction check during login
 
 # --- FIX: Import central path logic ---
-from dior_utils import get_asset_path
+from dior_utils import BASE_DIR, get_asset_path
+from census_pipeline import (
+    INVOLVED_CHARACTER_FIELDS, CensusIngestQueue, StageStats, classify_payload, decode_census_frames, orjson
+)
+from census_correlation import GunnerKillIndex
+from census_dedupe import TimeWindowDedupe
+from census_rest import get_census_client
+from census_recorder import CensusRecorder
+from census_subscriptions import CensusSubscriptionManager, expand_world_ids
+from session_clock import SessionClock
 
 # --- CONSTANTS & MAPPINGS ---
 
@@ -57,22 +69,127 @@ PS2_EXP_DETECTION = {
     "Gunner Kill": ["373", "314", "146", "148", "149", "150", "154", "155", "515", "681"]
 }
 
+# XP IDs that change someone's dashboard stats (everything else only marks a player as active).
+ASSIST_EXP_IDS = frozenset({"2", "3", "371", "372"})
+REVIVE_EXP_IDS = frozenset({"7", "53"})
+ROADKILL_VICTIM_EXP_ID = "26"
+
+FACTION_TAGS = {"1": "VS", "2": "NC", "3": "TR"}
+
+# How long a killfeed entry may wait for the name resolver before showing the fallback.
+KILLFEED_NAME_WAIT_S = 0.5
+
+LOADOUT_CLASS_EVENTS = {
+    "infil": "Kill Infil",
+    "la": "Kill Light Assault",
+    "medic": "Kill Medic",
+    "engi": "Kill Engineer",
+    "heavy": "Kill Heavy",
+    "max": "Kill MAX",
+}
+LOADOUT_VOICE_TRIGGERS = {"max": "kill_max", "infil": "kill_infil"}
+
+STREAK_EVENTS = {
+    12: "Squad Wiper", 24: "Double Squad Wipe",
+    36: "Squad Lead's Nightmare", 48: "One Man Platoon"
+}
+MULTI_KILL_EVENTS = {
+    2: "Double Kill", 3: "Multi Kill", 4: "Mega Kill",
+    5: "Ultra Kill", 6: "Monster Kill", 7: "Ludacris Kill",
+    9: "Holy Shit"
+}
+
+# Per experience ID, everything _handle_experience needs to know (one dict lookup per event).
+ExpRule = namedtuple("ExpRule", "assist revive roadkill support_event gunner_vehicle destroyed_vehicle")
+NO_EXP_RULE = ExpRule(False, False, False, None, None, None)
+
+KillfeedStyle = namedtuple("KillfeedStyle", "base shadowed hs_icon_html")
+
+
+def compile_exp_rules(gunner_map, destruction_map):
+    support = {}
+    for event_name, id_list in PS2_EXP_DETECTION.items():
+        for exp_id in id_list:
+            # First category wins, same as the old ordered scan.
+            support.setdefault(exp_id, event_name)
+
+    all_ids = set(support) | set(gunner_map) | set(destruction_map)
+    all_ids |= ASSIST_EXP_IDS | REVIVE_EXP_IDS | {ROADKILL_VICTIM_EXP_ID}
+    rules = {}
+    for exp_id in all_ids:
+        is_revive = exp_id in REVIVE_EXP_IDS
+        rules[exp_id] = ExpRule(
+            assist=exp_id in ASSIST_EXP_IDS,
+            revive=is_revive,
+            roadkill=exp_id == ROADKILL_VICTIM_EXP_ID,
+            # Revives are counted as "Revive Given", never as the generic support event.
+            support_event=None if is_revive else support.get(exp_id),
+            gunner_vehicle=gunner_map.get(exp_id),
+            destroyed_vehicle=destruction_map.get(exp_id),
+        )
+    return rules
+
+
+def compile_loadout_rules():
+    """loadout_id -> (class event, voice trigger or None)."""
+    rules = {}
+    for class_key, loadout_ids in LOADOUT_MAP.items():
+        for loadout_id in loadout_ids:
+            rules[loadout_id] = (LOADOUT_CLASS_EVENTS[class_key], LOADOUT_VOICE_TRIGGERS.get(class_key))
+    return rules
+
+
+def census_perf_log_path():
+    return os.path.join(BASE_DIR, "census_perf.log")
+
+
+def census_recording_dir():
+    return os.path.join(BASE_DIR, "census_recordings")
+
 
 class CensusWorker:
-    def __init__(self, controller, service_id):
+    def __init__(self, controller, service_id, uri=None):
         self.c = controller
         self.s_id = service_id
+        # Push endpoint; overridable so tools can point the worker at a local replay server.
+        self.uri = uri or f"wss://push.planetside2.com/streaming?environment=ps2&service-id={service_id}"
         self.loop = None
         self.websocket = None
-        self.msg_queue = None  # Buffer for incoming messages
-        self.event_cache = set()
-        self.event_history = []
-        self.recent_deaths = []
-        self.recent_deaths_max = 100
-        self.gunner_match_delay = 0.2
-        self.recent_deaths_lock = threading.Lock()
-        self.recent_deaths_lock = threading.Lock()
+        self.recorder = None  # Optional raw frame recorder (census_record)
+        self.rest = get_census_client(service_id)  # Shared pooled REST client
+        self.msg_queue = None  # Buffer for incoming raw frames (decode stage input)
+        self.apply_queue = CensusIngestQueue(
+            max_pending=self.c.config.get("census_ingest_max_pending", 5000),
+            policy=self.c.config.get("census_ingest_policy", "shed_oldest"),
+        )  # Decoded, classified payloads (apply stage input)
+        self.raw_max_pending = 20000
+        self.raw_dropped = 0
+        self.lag_last_s = 0.0
+        self.lag_max_s = 0.0
+        self._last_perf_emit = 0.0
+        self._last_lag_alert = 0.0
+        self._last_reported_drops = 0
+        self._decode_inflight = None
+        self._decode_pool = None
+        self._decode_workers = 1
+        self.decode_batch_max = 64
+        self.stage_stats = {name: StageStats(name) for name in ("decode", "classify", "apply")}
+        self.filtered_total = 0
+        self.subscriptions = CensusSubscriptionManager()
+        self.dedupe = TimeWindowDedupe(window_s=30, max_entries=65536)
+        # Recent deaths <-> gunner-kill XP correlation (apply thread only).
+        self.gunner_kills = GunnerKillIndex(window_s=3.0, max_deaths=512)
         self.vehicle_gunner_kill_map, self.vehicle_destruction_map = self._load_vehicle_kill_maps()
+        # Hot-path lookup tables, compiled once.
+        self.exp_rules = MappingProxyType(
+            compile_exp_rules(self.vehicle_gunner_kill_map, self.vehicle_destruction_map)
+        )
+        self.loadout_rules = MappingProxyType(compile_loadout_rules())
+        self.tracked_ids = frozenset()
+        self.refresh_tracked_characters()
+        # Event-time clock shared with the GUI (session time / KPM).
+        self.clock = getattr(controller, "session_clock", None) or SessionClock()
+        self._kf_style = None
         self.facility_map = self._load_facility_map()
 
         # --- SUPPORT TRACKING (MOVED HERE) ---
@@ -149,23 +266,112 @@ class CensusWorker:
         return facility_map
 
     def start(self):
+        self._decode_pool = self._build_decode_pool()
+        if self.c.config.get("census_record", False):
+            self.start_recording()
+
+        # Apply stage: owns all state mutation and overlay side effects on its own
+        # thread, so a slow handler can never stall websocket reads.
+        threading.Thread(target=self.processor, name="Census-Apply", daemon=True).start()
+
         def run_loop():
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             self.loop = loop
             
-            # Create the queue inside the loop's thread
+            # Create the queues inside the loop's thread
             self.msg_queue = asyncio.Queue()
+            self._decode_inflight = asyncio.Queue(maxsize=self._decode_workers * 2)
             
-            # Start the processor as a background task
-            loop.create_task(self.processor())
+            # Start the decode/classify stages as background tasks
+            loop.create_task(self.decoder())
+            loop.create_task(self.decode_collector())
             
             # Run the listener as the main task
             loop.run_until_complete(self.listener())
 
-        t = threading.Thread(target=run_loop, daemon=True)
+        t = threading.Thread(target=run_loop, name="Census-Ingest", daemon=True)
         t.start()
 
+    def start_recording(self, directory=None):
+        """Starts writing raw push frames to rolling compressed files."""
+        if self.recorder is None:
+            cfg = self.c.config
+            self.recorder = CensusRecorder(
+                directory or census_recording_dir(),
+                max_bytes=int(cfg.get("census_record_max_mb", 64) or 64) * 1024 * 1024,
+                max_files=cfg.get("census_record_files", 5) or 5,
+            ).start()
+            self.c.add_log(f"SYS: Recording Census frames to {self.recorder.directory}")
+        return self.recorder
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def _build_decode_pool(self):
+        mode = str(self.c.config.get("census_decode_pool", "thread") or "thread").strip().lower()
+        try:
+            workers = int(self.c.config.get("census_decode_workers", 0) or 0)
+        except Exception:
+            workers = 0
+        if mode == "process":
+            self._decode_workers = max(1, min(4, workers or (os.cpu_count() or 2) // 2))
+            try:
+                pool = concurrent.futures.ProcessPoolExecutor(max_workers=self._decode_workers)
+                self.c.add_log(f"SYS: Census decode pool: {self._decode_workers} process(es)")
+                return pool
+            except Exception as e:
+                self.c.add_log(f"ERR: Process decode pool unavailable ({e}), using threads.")
+        self._decode_workers = max(1, min(4, workers or 1))
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._decode_workers, thread_name_prefix="Census-Decode"
+        )
+
+    def refresh_tracked_characters(self):
+        """Rebuilds the tracked character ID set; call whenever char_data changes."""
+        ids = set(str(cid) for cid in list(getattr(self.c, "char_data", {}).values()) if cid)
+        current = str(getattr(self.c, "current_character_id", "") or "")
+        if current:
+            ids.add(current)
+        self.tracked_ids = frozenset(ids)
+        return self.tracked_ids
+
+    def on_characters_changed(self):
+        """Thread-safe hook for character list changes (tracked set + subscription)."""
+        self.refresh_tracked_characters()
+        self.refresh_subscription()
+
+    def invalidate_killfeed_style(self):
+        """Called on config changes; killfeed styles are rebuilt on next use."""
+        self._kf_style = None
+
+    def _killfeed_style(self):
+        style = self._kf_style
+        if style is None:
+            kf_cfg_raw = self.c.config.get("killfeed", {})
+            kf_cfg = kf_cfg_raw if isinstance(kf_cfg_raw, dict) else {}
+            kf_font = kf_cfg.get("font_size", 19)
+
+            hs_icon_html = ""
+            hs_icon = kf_cfg.get("hs_icon", "Headshot.png")
+            hs_path = get_asset_path(hs_icon).replace("\\", "/")
+            if os.path.exists(hs_path):
+                hs_size = kf_cfg.get("hs_icon_size", 19)
+                hs_icon_html = f'<img src="{hs_path}" width="{hs_size}" height="{hs_size}" style="vertical-align: middle;">&nbsp;'
+
+            style = KillfeedStyle(
+                base=f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; margin-bottom: 2px; text-align: right;",
+                shadowed=(
+                    f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; "
+                    "text-shadow: 1px 1px 2px #000; margin-bottom: 2px; text-align: right;"
+                ),
+                hs_icon_html=hs_icon_html,
+            )
+            self._kf_style = style
+        return style
+
     # --- HELPER: EVENT SUBSET TRIGGER ---
     def _trigger_subset_event(self, parent_event, specific_event):
         """
@@ -215,64 +421,54 @@ class CensusWorker:
             # For events without counter (e.g., Base Capture) just trigger
             self.c.trigger_overlay_event(category)
 
-    def _get_stat_obj(self, cid, tid, world_id):
+    def _get_stat_obj(self, cid, tid, world_id, ts):
+        """Stats view for `cid`; `ts` is the event time of the payload being applied."""
         # 1. Determine the faction of the CURRENT event
-        current_faction_name = {"1": "VS", "2": "NC", "3": "TR"}.get(str(tid), "NSO")
-
-        if cid not in self.c.session_stats:
-            # NEW ENTRY
-            self.c.session_stats[cid] = {
-                "id": cid,
-                "name": self.c.name_cache.get(cid, "Searching..."),
-                "faction": current_faction_name,  # Set faction based on event
-                "k": 0, "d": 0, "a": 0, "hs": 0, "hsrkill": 0,
-                "dhs": 0, "dhs_eligible": 0, # Death Headshot Tracking
-                "revives_received": 0,
-                "start": time.time(),
-                "acc_t": 0, # Accumulated time in seconds
-                "last_kill_time": time.time(),
-                "world_id": str(world_id),
-                "last_seen_base": ""
-            }
-        else:
-            # EXISTING ENTRY
-            obj = self.c.session_stats[cid]
-            # Resume if paused
-            if obj.get("start", 0) == 0:
-                obj["start"] = time.time()
-                self.c.add_log(f"TIMER: Session resumed for {obj.get('name')}")
-
-            if obj["faction"] == "NSO" and current_faction_name != "NSO":
-                obj["faction"] = current_faction_name
-            if "last_seen_base" not in obj:
-                obj["last_seen_base"] = ""
-
-        return self.c.session_stats[cid]
+        current_faction_name = FACTION_TAGS.get(str(tid), "NSO")
+
+        obj = self.c.session_stats.get(cid)
+        if obj is None:
+            # NEW ENTRY (faction set based on event)
+            return self.c.session_stats.create(
+                cid,
+                name=self.c.name_cache.get(cid, "Searching..."),
+                faction=current_faction_name,
+                world_id=str(world_id),
+                start=ts,
+                last_kill_time=ts,
+            )
+
+        # EXISTING ENTRY
+        # Resume if paused (or widen the interval for a late event)
+        if self.clock.open_interval(obj, ts):
+            self.c.add_log(f"TIMER: Session resumed for {obj['name']}")
+
+        if obj["faction"] == "NSO" and current_faction_name != "NSO":
+            obj["faction"] = current_faction_name
+        return obj
 
     async def listener(self):
         """Websocket listener that only puts raw messages into the queue."""
-        uri = f"wss://push.planetside2.com/streaming?environment=ps2&service-id={self.s_id}"
-
         while True:
             try:
-                async with websockets.connect(uri, ping_interval=20, ping_timeout=20, close_timeout=10) as websocket:
+                async with websockets.connect(self.uri, ping_interval=20, ping_timeout=20, close_timeout=10) as websocket:
                     self.websocket = websocket
 
-                    # SUBSCRIBE
-                    msg = {
-                        "service": "event", "action": "subscribe",
-                        "characters": ["all"], "worlds": ["all"],
-                        "eventNames": [
-                            "Death", "GainExperience", "PlayerLogin", "PlayerLogout", "MetagameEvent",
-                            "PlayerFacilityCapture", "PlayerFacilityDefend"
-                        ]
-                    }
-                    await websocket.send(json.dumps(msg))
-                    self.c.add_log("Websocket: GLOBAL MONITORING ACTIVE (All Servers)")
+                    # SUBSCRIBE (fresh socket -> full subscription)
+                    self.subscriptions.reset()
+                    await self._sync_subscription()
+                    self.c.add_log(f"Websocket: {self.subscriptions.describe()}")
 
                     async for message in websocket:
+                        recorder = self.recorder
+                        if recorder is not None:
+                            recorder.record(message)
+
                         # Add message to queue without processing
-                        self.msg_queue.put_nowait(message)
+                        if self.msg_queue.qsize() >= self.raw_max_pending and not self._frame_involves_tracked(message):
+                            self.raw_dropped += 1
+                        else:
+                            self.msg_queue.put_nowait(message)
 
                         if getattr(self.c, "needs_reconnect", False):
                             self.c.needs_reconnect = False
@@ -282,166 +478,308 @@ class CensusWorker:
             except Exception as e:
                 self.c.add_log(f"Websocket Reconnect: {e}")
                 await asyncio.sleep(5)
+            finally:
+                self.websocket = None
+
+    def _frame_involves_tracked(self, message):
+        """Cheap pre-decode check used only when the raw buffer is full."""
+        if not isinstance(message, str):
+            return False
+        return any(f'"{cid}"' in message for cid in self.tracked_ids)
+
+    def _ingest_class(self, p, tracked):
+        """Returns (protected, coalesce_key) for the bounded apply queue."""
+        for key in INVOLVED_CHARACTER_FIELDS:
+            if p.get(key) in tracked:
+                return True, None
+        if p.get("event_name") == "GainExperience":
+            exp_id = p.get("experience_id")
+            if exp_id not in ASSIST_EXP_IDS and exp_id not in REVIVE_EXP_IDS:
+                # Presence-only XP for another player: only the newest one matters.
+                return False, ("presence", p.get("character_id"))
+        return False, None
+
+    async def _sync_subscription(self):
+        """Sends the subscribe/clearSubscribe delta for the active world and tracked characters."""
+        websocket = self.websocket
+        if websocket is None:
+            return
+        msgs = self.subscriptions.plan(
+            getattr(self.c, "current_world_id", ""),
+            self.tracked_ids,
+            global_mode=bool(self.c.config.get("census_global_subscription", False)),
+        )
+        for msg in msgs:
+            await websocket.send(json.dumps(msg))
+
+    def refresh_subscription(self):
+        """Thread-safe: re-subscribe after a server switch or character list change."""
+        if not self.loop or not self.websocket:
+            return
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._sync_subscription(), self.loop)
+        except Exception:
+            return
 
-    async def processor(self):
-        """Async worker that processes messages from the queue using current logic."""
+        def _done(f):
+            try:
+                f.result()
+            except Exception as e:
+                self.c.add_log(f"Websocket: Subscription update failed: {e}")
+            else:
+                self.c.add_log(f"Websocket: {self.subscriptions.describe()}")
+
+        future.add_done_callback(_done)
+
+    async def decoder(self):
+        """Decode stage: batches raw frames from msg_queue into the decode pool."""
+        loop = asyncio.get_running_loop()
         while True:
-            message = await self.msg_queue.get()
+            frames = [await self.msg_queue.get()]
+            while len(frames) < self.decode_batch_max:
+                try:
+                    frames.append(self.msg_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            for _ in frames:
+                self.msg_queue.task_done()
+            future = loop.run_in_executor(self._decode_pool, decode_census_frames, frames)
+            # Bounded in-flight batches keep order and apply backpressure to this stage.
+            await self._decode_inflight.put((future, len(frames), time.perf_counter()))
+
+    async def decode_collector(self):
+        """Classify/filter stage: awaits decoded batches in order and hands kept events to the apply stage."""
+        while True:
+            future, n_frames, t_submit = await self._decode_inflight.get()
             try:
-                data = json.loads(message)
-                if "payload" in data:
-                    p = data["payload"]
-                    e_name = p.get("event_name")
-                    payload_world = str(p.get("world_id", "0"))
-                    # --- COMPATIBILITY LAYER ---
-                    if payload_world == "17": payload_world = "1"
-                    if payload_world == "13": payload_world = "10"
-
-                    # DUPLICATE FILTER (Improved)
-                    if e_name == "GainExperience":
-                        uid = f"EXP_{p.get('timestamp')}_{p.get('character_id')}_{p.get('experience_id')}_{p.get('other_id')}"
-                    elif e_name == "Death":
-                        uid = f"DTH_{p.get('timestamp')}_{p.get('character_id')}_{p.get('attacker_character_id')}_{p.get('attacker_weapon_id')}"
-                    elif e_name == "MetagameEvent":
-                        uid = f"MTG_{p.get('timestamp')}_{p.get('world_id')}_{p.get('metagame_event_id')}_{p.get('metagame_event_state_name')}"
-                    elif e_name in ("PlayerFacilityCapture", "PlayerFacilityDefend"):
-                        uid = (
-                            f"FAC_{e_name}_{p.get('timestamp')}_{p.get('character_id')}_{p.get('facility_id')}"
-                            f"_{p.get('world_id')}_{p.get('zone_id')}"
-                        )
-                    else:
-                        uid = f"{e_name}_{p.get('timestamp')}_{p.get('character_id', '0')}_{p.get('attacker_character_id', '0')}"
-
-                    if uid in self.event_cache:
-                        self.msg_queue.task_done()
-                        continue
-                    self.event_cache.add(uid)
-                    self.event_history.append(uid)
-                    if len(self.event_history) > 1000:  # Increased to 1000 for better safety
-                        self.event_cache.discard(self.event_history.pop(0))
-
-                    # Local helper for stat objects (adapted to use method)
-                    def get_stat_obj(cid, tid):
-                        return self._get_stat_obj(cid, tid, p.get("world_id", "0"))
-
-                    # 1. LOGIN / LOGOUT
-                    if e_name == "PlayerLogin":
-                        c_id = p.get("character_id")
-                        for name, saved_id in self.c.char_data.items():
-                            if saved_id == c_id:
-                                # RESET logic if character actually changed
-                                if self.c.last_tracked_id and self.c.last_tracked_id != c_id:
-                                    self.c.reset_streak_state()
-                                
-                                self.c.current_character_id = c_id
-                                self.c.last_tracked_id = c_id
-                                self.c.current_selected_char_name = name
-                                if hasattr(self.c, "_ensure_session_stats_entry"):
-                                    self.c._ensure_session_stats_entry(c_id, name=name)
-                                from PyQt6.QtCore import QMetaObject, Qt, Q_ARG
-                                if hasattr(self.c, 'ovl_config_win'):
-                                    QMetaObject.invokeMethod(self.c.ovl_config_win.char_combo, "setCurrentText",
-                                                             Qt.ConnectionType.QueuedConnection, Q_ARG(str, name))
-                                if payload_world != "0" and payload_world != str(self.c.current_world_id):
-                                    s_name = self.c.get_server_name_by_id(payload_world)
-                                    self.c.switch_server(s_name, payload_world)
-
-                                # Resume or Start Timer
-                                if c_id in self.c.session_stats:
-                                    s_obj = self.c.session_stats[c_id]
-                                    if s_obj.get("start", 0) == 0:
-                                        s_obj["start"] = time.time()
-                                        self.c.add_log(f"TIMER: Resumed session for {name}")
-                                else:
-                                    # Start NEW session immediately on login
-                                    self._get_stat_obj(c_id, "0", payload_world)
-                                    self.c.add_log(f"TIMER: Session started for {name} (at Login)")
-
-                                if hasattr(self.c, "update_discord_presence"):
-                                    self.c.update_discord_presence()
-
-                                def trigger_login_event(cid_val):
-                                    try:
-                                        u = f"https://census.daybreakgames.com/{self.s_id}/get/ps2:v2/character/?character_id={cid_val}&c:show=faction_id"
-                                        r = requests.get(u, timeout=15).json()
-                                        f_id = "0"
-                                        if r.get("returned", 0) > 0:
-                                            f_id = r["character_list"][0].get("faction_id", "0")
-                                        f_tag = {"1": "VS", "2": "NC", "3": "TR"}.get(str(f_id), "NSO")
-                                        self.c.trigger_overlay_event(f"Login {f_tag}")
-                                        self.c.add_log(f"AUTO-TRACK: {name} logged in ({f_tag}).")
-                                    except: pass
-                                threading.Thread(target=trigger_login_event, args=(c_id,), daemon=True).start()
-                                break
-                    elif e_name == "PlayerLogout":
-                        cid = p.get("character_id")
-                        current_cid = str(getattr(self.c, "current_character_id", "") or "")
-                        last_tracked = str(getattr(self.c, "last_tracked_id", "") or "")
-                        is_active_logout = bool(cid) and (cid == current_cid or cid == last_tracked)
-                        
-                        # Fix: Remove from active counting immediately
-                        if cid in self.c.active_players:
-                            del self.c.active_players[cid]
-                        if cid == current_cid:
-                            # Pause Timer
-                            if cid in self.c.session_stats:
-                                s_obj = self.c.session_stats[cid]
-                                if s_obj.get("start", 0) > 0:
-                                    elapsed = time.time() - s_obj["start"]
-                                    s_obj["acc_t"] = s_obj.get("acc_t", 0) + elapsed
-                                    s_obj["start"] = 0 # Paused
-                                    self.c.add_log(f"TIMER: Session paused. Accumulated: {int(s_obj['acc_t'])}s")
-                            
-                            self.c.current_character_id = ""
-                            self.c.add_log("AUTO-TRACK: Logged out.")
-                        if is_active_logout and hasattr(self.c, "clear_discord_presence"):
-                            self.c.clear_discord_presence()
-
-                    # 2. SERVER FILTER / PLAYER TRACKING (only track XP events and only the active side, other can be ignored)
-                    track_id = p.get("character_id")   # or p.get("attacker_character_id")
-                    if track_id and track_id != "0" and e_name == "GainExperience":
-                        tid = p.get("team_id") # or p.get("attacker_team_id")
-                        f_name = {"1": "VS", "2": "NC", "3": "TR"}.get(str(tid), "NSO")
-                        w_id = str(p.get("world_id", "0"))
-                        self.c.active_players[track_id] = (time.time(), f_name, w_id)
-                        if track_id not in self.c.name_cache:
-                            self.c.id_queue.put(track_id)
-
-                    # 3. EVENT PROCESSING (Dispatch)
-                    if e_name == "Death":
-                        self._handle_death(p, p.get("world_id", "0"))
-                        self._store_recent_death(p, p.get("world_id", "0"))
-                    elif e_name == "GainExperience":
-                        self._handle_experience(p, get_stat_obj)
-                    elif e_name == "MetagameEvent":
-                        self._handle_metagame(p)
-                    elif e_name in ("PlayerFacilityCapture", "PlayerFacilityDefend"):
-                        self._handle_facility_event(p)
+                payloads = await future
+            except Exception as e:
+                self.c.add_log(f"Decode Error: {e}")
+                payloads = []
+            t_decoded = time.perf_counter()
+            self.stage_stats["decode"].record((t_decoded - t_submit) * 1000.0, n_frames)
+
+            worlds = expand_world_ids(getattr(self.c, "current_world_id", ""))
+            tracked = self.tracked_ids
+            kept = 0
+            for p in payloads:
+                if classify_payload(p, worlds, tracked):
+                    protected, coalesce_key = self._ingest_class(p, tracked)
+                    self.apply_queue.put(p, protected=protected, coalesce_key=coalesce_key)
+                    kept += 1
+            self.filtered_total += len(payloads) - kept
+            self.stage_stats["classify"].record((time.perf_counter() - t_decoded) * 1000.0, len(payloads))
+
+    def get_pipeline_stats(self):
+        """Per-stage queue depths, drop counters, lag and timings (safe to call from any thread)."""
+        return {
+            "raw_depth": self.msg_queue.qsize() if self.msg_queue else 0,
+            "raw_dropped": self.raw_dropped,
+            "decode_inflight": self._decode_inflight.qsize() if self._decode_inflight else 0,
+            "apply": self.apply_queue.snapshot(),
+            "filtered_total": self.filtered_total,
+            "lag_last_s": round(self.lag_last_s, 1),
+            "lag_max_s": round(self.lag_max_s, 1),
+            "decode_workers": self._decode_workers,
+            "decoder": "orjson" if orjson is not None else "json",
+            "stages": {name: st.snapshot() for name, st in self.stage_stats.items()},
+        }
+
+    def _record_lag(self, p):
+        try:
+            lag = time.time() - int(p.get("timestamp", 0))
+        except Exception:
+            return
+        if lag < 0 or lag > 86400:
+            return
+        self.lag_last_s = lag
+        if lag > self.lag_max_s:
+            self.lag_max_s = lag
+
+    def _emit_perf_surface(self):
+        """Every 10s: lag alert, drop report and (optionally) a census_perf.log row."""
+        now = time.time()
+        if now - self._last_perf_emit < 10:
+            return
+        self._last_perf_emit = now
+        st = self.get_pipeline_stats()
 
+        try:
+            lag_alert_s = float(self.c.config.get("census_lag_alert_s", 10))
+        except Exception:
+            lag_alert_s = 10.0
+        if self.lag_last_s >= lag_alert_s and (now - self._last_lag_alert) >= 30:
+            self._last_lag_alert = now
+            self.c.add_log(
+                f"CENSUS LAG: Ingest is {self.lag_last_s:.0f}s behind "
+                f"(apply backlog {st['apply']['depth']}, raw {st['raw_depth']})"
+            )
+
+        drops = st["apply"]["dropped"] + st["raw_dropped"]
+        if drops > self._last_reported_drops:
+            self.c.add_log(
+                f"CENSUS PIPELINE: shed {drops - self._last_reported_drops} global events "
+                f"(total {drops}, coalesced {st['apply']['coalesced']}, max depth {st['apply']['max_depth']})"
+            )
+            self._last_reported_drops = drops
+
+        if self.c.config.get("census_perf_log", False):
+            try:
+                row = dict(st)
+                row["ts_iso"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                with open(census_perf_log_path(), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row, ensure_ascii=True) + "\n")
+            except Exception:
+                pass
+
+    def processor(self):
+        """Apply stage: blocking loop on the Census-Apply thread; the only place that mutates state."""
+        while True:
+            try:
+                p = self.apply_queue.get(timeout=self._apply_wait_timeout())
+            except queue.Empty:
+                self._sweep_gunner_kills()
+                self._emit_perf_surface()
+                continue
+            t0 = time.perf_counter()
+            try:
+                self._apply_payload(p)
             except Exception as e:
                 self.c.add_log(f"Processor Error: {e}")
+            self.stage_stats["apply"].record((time.perf_counter() - t0) * 1000.0)
+            self._record_lag(p)
+            self._sweep_gunner_kills()
+            self._emit_perf_surface()
+
+    def _apply_wait_timeout(self):
+        """Queue wait for the apply loop: wake up for the next gunner-kill expiry, at most every 10 s."""
+        deadline = self.gunner_kills.next_deadline()
+        if deadline is None:
+            return 10
+        return min(10.0, max(0.05, deadline - self.clock.now()))
+
+    def _sweep_gunner_kills(self):
+        if not self.gunner_kills.pending:
+            return
+        for victim_id in self.gunner_kills.sweep(self.clock.now()):
+            # No Death event showed up in time: plain killfeed entry from the XP alone.
+            self._emit_gunner_killfeed_from_victim(victim_id)
+
+    def _apply_payload(self, p):
+        e_name = p.get("event_name")
+        payload_world = str(p.get("world_id", "0"))
+        # --- COMPATIBILITY LAYER ---
+        if payload_world == "17": payload_world = "1"
+        if payload_world == "13": payload_world = "10"
+
+        # DUPLICATE FILTER (time window over payload timestamps)
+        if self.dedupe.seen_payload(p):
+            return
 
-            self.msg_queue.task_done()
+        # Event time drives session time/KPM, so lag and replays don't skew them.
+        ev_ts = self.clock.event_time(p)
 
-    def _store_recent_death(self, p, world_id):
-        ts = 0
-        try:
-            ts = int(p.get("timestamp", "0"))
-        except:
-            ts = 0
-        with self.recent_deaths_lock:
-            self.recent_deaths.append({
-                "payload": p,
-                "world_id": world_id,
-                "timestamp": ts,
-                "gunner_matched": False
-            })
-            if len(self.recent_deaths) > self.recent_deaths_max:
-                self.recent_deaths = self.recent_deaths[-self.recent_deaths_max:]
-
-    def _handle_death(self, p, world_id):
+        # Local helper for stat objects (adapted to use method)
+        def get_stat_obj(cid, tid):
+            return self._get_stat_obj(cid, tid, p.get("world_id", "0"), ev_ts)
+
+        # 1. LOGIN / LOGOUT
+        if e_name == "PlayerLogin":
+            c_id = p.get("character_id")
+            for name, saved_id in self.c.char_data.items():
+                if saved_id == c_id:
+                    # RESET logic if character actually changed
+                    if self.c.last_tracked_id and self.c.last_tracked_id != c_id:
+                        self.c.reset_streak_state()
+
+                    self.c.current_character_id = c_id
+                    self.c.last_tracked_id = c_id
+                    self.c.current_selected_char_name = name
+                    if hasattr(self.c, "_ensure_session_stats_entry"):
+                        self.c._ensure_session_stats_entry(c_id, name=name, start=ev_ts)
+                    if hasattr(self.c, 'ovl_config_win'):
+                        from PyQt6.QtCore import QMetaObject, Qt, Q_ARG
+                        QMetaObject.invokeMethod(self.c.ovl_config_win.char_combo, "setCurrentText",
+                                                 Qt.ConnectionType.QueuedConnection, Q_ARG(str, name))
+                    if payload_world != "0" and payload_world != str(self.c.current_world_id):
+                        s_name = self.c.get_server_name_by_id(payload_world)
+                        self.c.switch_server(s_name, payload_world)
+
+                    # Resume or Start Timer
+                    if c_id in self.c.session_stats:
+                        s_obj = self.c.session_stats[c_id]
+                        if self.clock.open_interval(s_obj, ev_ts):
+                            self.c.add_log(f"TIMER: Resumed session for {name}")
+                    else:
+                        # Start NEW session immediately on login
+                        self._get_stat_obj(c_id, "0", payload_world, ev_ts)
+                        self.c.add_log(f"TIMER: Session started for {name} (at Login)")
+
+                    if hasattr(self.c, "update_discord_presence"):
+                        self.c.update_discord_presence()
+
+                    # Faction lookup runs on the REST client's pool; the apply stage never waits on it.
+                    def trigger_login_event(fut, name=name):
+                        try:
+                            r = fut.result()
+                            f_id = "0"
+                            if r.get("returned", 0) > 0:
+                                f_id = r["character_list"][0].get("faction_id", "0")
+                            f_tag = FACTION_TAGS.get(str(f_id), "NSO")
+                            self.c.trigger_overlay_event(f"Login {f_tag}")
+                            self.c.add_log(f"AUTO-TRACK: {name} logged in ({f_tag}).")
+                        except: pass
+                    self.rest.get_async(
+                        "character", {"character_id": c_id, "c:show": "faction_id"}
+                    ).add_done_callback(trigger_login_event)
+                    break
+        elif e_name == "PlayerLogout":
+            cid = p.get("character_id")
+            current_cid = str(getattr(self.c, "current_character_id", "") or "")
+            last_tracked = str(getattr(self.c, "last_tracked_id", "") or "")
+            is_active_logout = bool(cid) and (cid == current_cid or cid == last_tracked)
+
+            # Fix: Remove from active counting immediately
+            if cid in self.c.active_players:
+                del self.c.active_players[cid]
+            if cid == current_cid:
+                # Pause Timer
+                if cid in self.c.session_stats:
+                    s_obj = self.c.session_stats[cid]
+                    if s_obj.get("start", 0) > 0:
+                        self.clock.close_interval(s_obj, ev_ts)  # Paused
+                        self.c.add_log(f"TIMER: Session paused. Accumulated: {int(s_obj['acc_t'])}s")
+
+                self.c.current_character_id = ""
+                self.c.add_log("AUTO-TRACK: Logged out.")
+            if is_active_logout and hasattr(self.c, "clear_discord_presence"):
+                self.c.clear_discord_presence()
+
+        # 2. SERVER FILTER / PLAYER TRACKING (only track XP events and only the active side, other can be ignored)
+        track_id = p.get("character_id")   # or p.get("attacker_character_id")
+        if track_id and track_id != "0" and e_name == "GainExperience":
+            tid = p.get("team_id") # or p.get("attacker_team_id")
+            f_name = FACTION_TAGS.get(str(tid), "NSO")
+            w_id = str(p.get("world_id", "0"))
+            self.c.active_players[track_id] = (time.time(), f_name, w_id)
+            if track_id not in self.c.name_cache:
+                self._request_name(track_id)
+
+        # 3. EVENT PROCESSING (Dispatch)
+        if e_name == "Death":
+            self._handle_death(p, p.get("world_id", "0"), ev_ts)
+            if self.gunner_kills.add_death(p, ev_ts) is not None:
+                self._emit_gunner_killfeed(p)
+        elif e_name == "GainExperience":
+            self._handle_experience(p, get_stat_obj)
+        elif e_name == "MetagameEvent":
+            self._handle_metagame(p)
+        elif e_name in ("PlayerFacilityCapture", "PlayerFacilityDefend"):
+            self._handle_facility_event(p, ev_ts)
+
+    def _handle_death(self, p, world_id, ev_ts):
         def get_stat_obj(cid, tid):
-            return self._get_stat_obj(cid, tid, world_id)
+            return self._get_stat_obj(cid, tid, world_id, ev_ts)
 
         killer_id = p.get("attacker_character_id")
         victim_id = p.get("character_id")
@@ -464,7 +802,7 @@ class CensusWorker:
             if killer_id and killer_id != "0" and killer_id != victim_id:
                 k_obj = get_stat_obj(killer_id, p.get("attacker_team_id"))
                 k_obj["k"] += 1
-                k_obj["last_kill_time"] = time.time()
+                k_obj["last_kill_time"] = ev_ts
 
                 if is_hs_weapon:
                     k_obj["hsrkill"] += 1
@@ -480,294 +818,251 @@ class CensusWorker:
         # -------------------------------------------------
         # 2. MY EVENTS (Overlay)
         # -------------------------------------------------
-        if my_id:
-            # Icon preparation
-            icon_html = ""
-            if is_hs:
-                hs_icon = self.c.config.get("killfeed", {}).get("hs_icon", "Headshot.png")
-                hs_path = get_asset_path(hs_icon).replace("\\", "/")
-                if os.path.exists(hs_path):
-                    # NEW: HS Icon Size from Config
-                    hs_size = self.c.config.get("killfeed", {}).get("hs_icon_size", 19)
-                    icon_html = f'<img src="{hs_path}" width="{hs_size}" height="{hs_size}" style="vertical-align: middle;">&nbsp;'
-
-            w_info = self.c.item_db.get(weapon_id, {})
-            category = w_info.get("type", "Unknown")
-            
-            # NEW: Font Size from Config (Robust)
-            kf_cfg_raw = self.c.config.get("killfeed", {})
-            kf_cfg = kf_cfg_raw if isinstance(kf_cfg_raw, dict) else {}
-            kf_font = kf_cfg.get("font_size", 19)
-            base_style = f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; margin-bottom: 2px; text-align: right;"
-
-            # === A) I KILLED ===
-            if killer_id == my_id and victim_id != my_id:
-                curr_time = time.time()
-                # Spam protection (Sometimes API sends twice)
-                if getattr(self.c, "last_victim_id", None) == victim_id and (
-                        curr_time - getattr(self.c, "last_victim_time", 0)) < 0.5:
-                    return
-                self.c.last_victim_id = victim_id
-                self.c.last_victim_time = curr_time
-
-                v_name = self.c.name_cache.get(victim_id, "Unknown")
-                raw_tag = getattr(self.c, "outfit_cache", {}).get(victim_id, "")
-                v_tag = f"[{raw_tag}] " if raw_tag else ""
-
-                # --- CASE 1: TEAMKILL (I kill teammate) ---
-                if is_tk:
-                    self.c.trigger_auto_voice("tk")
-                    self.c.trigger_overlay_event("Team Kill")
-
-                    # Special feed entry
-                    msg = f"""<div style="{base_style}">
-                            <span style="color: #ffaa00;">⚠️ TEAMKILL </span>
-                            <span style="color: #888;">{v_tag}</span><span style="color: #ffffff;">{v_name}</span> 
-                            </div>"""
-
-                    if self.c.config.get("killfeed", {}).get("active", True):
-                        if self.c.overlay_win: self.c.overlay_win.signals.killfeed_entry.emit(msg)
+        # Fast path: everything below only concerns the active character.
+        if not my_id or (killer_id != my_id and victim_id != my_id):
+            return
 
-                    # IMPORTANT: Return here so no streak/multi-kill logic runs!
-                    return
+        kf_style = self._killfeed_style()
+        icon_html = kf_style.hs_icon_html if is_hs else ""
+
+        w_info = self.c.item_db.get(weapon_id, {})
+        category = w_info.get("type", "Unknown")
+        base_style = kf_style.base
+
+        # === A) I KILLED ===
+        if killer_id == my_id and victim_id != my_id:
+            curr_time = time.time()
+            # Spam protection (Sometimes API sends twice)
+            if getattr(self.c, "last_victim_id", None) == victim_id and (
+                    curr_time - getattr(self.c, "last_victim_time", 0)) < 0.5:
+                return
+            self.c.last_victim_id = victim_id
+            self.c.last_victim_time = curr_time
+
+            # --- CASE 1: TEAMKILL (I kill teammate) ---
+            if is_tk:
+                self.c.trigger_auto_voice("tk")
+                self.c.trigger_overlay_event("Team Kill")
+
+                # Special feed entry
+                if self.c.config.get("killfeed", {}).get("active", True):
+                    self._emit_named_killfeed(victim_id, lambda v_name, v_tag: f"""<div style="{base_style}">
+                        <span style="color: #ffaa00;">⚠️ TEAMKILL </span>
+                        <span style="color: #888;">{v_tag}</span><span style="color: #ffffff;">{v_name}</span> 
+                        </div>""")
+
+                # IMPORTANT: Return here so no streak/multi-kill logic runs!
+                return
+
+                # --- CASE 2: NORMAL KILL (Enemy) ---
+            else:
+                # Streak Logic
+                if self.c.config.get("streak", {}).get("active", True):
+                    # --- NEW: RESPAWN CHECK ---
+                    # If we were dead and NOT revived -> Respawn -> Reset!
+                    # EXCEPTION: Teamkills (is_tk_death)
+                    if self.c.is_dead and not self.c.was_revived and not getattr(self.c, "is_tk_death", False):
+                        self.c.add_log("STREAK: Respawn detected (New Kill). Resetting.")
+                        self.c.killstreak_count = 0
+                        self.c.streak_factions = []
+                        self.c.streak_slot_map = []
+                        # Reset Support Streak
+                        for k in self.support_streaks:
+                            self.support_streaks[k] = 0
+                    
+                    # Clear TK flag, we just successfully killed (back alive)
+                    self.c.is_tk_death = False
 
-                    # --- CASE 2: NORMAL KILL (Enemy) ---
-                else:
-                    # Streak Logic
-                    if self.c.config.get("streak", {}).get("active", True):
-                        # --- NEW: RESPAWN CHECK ---
-                        # If we were dead and NOT revived -> Respawn -> Reset!
-                        # EXCEPTION: Teamkills (is_tk_death)
-                        if self.c.is_dead and not self.c.was_revived and not getattr(self.c, "is_tk_death", False):
-                            self.c.add_log("STREAK: Respawn detected (New Kill). Resetting.")
-                            self.c.killstreak_count = 0
-                            self.c.streak_factions = []
-                            self.c.streak_slot_map = []
-                            # Reset Support Streak
-                            for k in self.support_streaks:
-                                self.support_streaks[k] = 0
-                        
-                        # Clear TK flag, we just successfully killed (back alive)
-                        self.c.is_tk_death = False
-
-                        if self.c.killstreak_count == 0:
-                            self.c.killstreak_count = 1
-                            self.c.streak_factions = []
-                            self.c.streak_slot_map = []
-                        else:
-                            self.c.killstreak_count += 1
-
-                        v_team = p.get("team_id")
-                        v_fac = {"1": "VS", "2": "NC", "3": "TR"}.get(str(v_team), "NSO")
-                        self.c.streak_factions.append(v_fac)
-                        self.c.streak_slot_map.append(self.c._get_random_slot())
-                        self.c.is_dead = False
-                        self.c.was_revived = False
-                        self.c.update_streak_display()
-
-                    # Multi Kill Logic
-                    if curr_time - getattr(self.c, "last_kill_time", 0) <= self.c.streak_timeout:
-                        self.c.kill_counter += 1
-                    else:
-                        self.c.kill_counter = 1
-                    self.c.last_kill_time = curr_time
-
-                    # EVENT DETERMINATION (QUEUE LOGIC START)
-                    base_events = []
-                    weapon_name = w_info.get("name", "Unknown")
-
-                    if weapon_id in PS2_DETECTION["SPECIAL_IDS"]:
-                        base_events.append(PS2_DETECTION["SPECIAL_IDS"][weapon_id])
-                    elif category in PS2_DETECTION["CATEGORIES"]:
-                        base_events.append(PS2_DETECTION["CATEGORIES"][category])
-                    elif weapon_name in PS2_DETECTION["NAMES"]:
-                        base_events.append(PS2_DETECTION["NAMES"][weapon_name])
-
-                    if is_hs and "Headshot" not in base_events:
-                        base_events.append("Headshot")
-
-                    # Streak Events
-                    streak_event = None
-                    streak_map = {
-                        12: "Squad Wiper", 24: "Double Squad Wipe",
-                        36: "Squad Lead's Nightmare", 48: "One Man Platoon"
-                    }
-                    if self.c.killstreak_count in streak_map:
-                        streak_event = streak_map[self.c.killstreak_count]
-
-                    # Multi Events
-                    multi_event = None
-                    if self.c.kill_counter > 1:
-                        multi_map = {
-                            2: "Double Kill", 3: "Multi Kill", 4: "Mega Kill",
-                            5: "Ultra Kill", 6: "Monster Kill", 7: "Ludacris Kill",
-                            9: "Holy Shit"
-                        }
-                        if self.c.kill_counter in multi_map:
-                            multi_event = multi_map[self.c.kill_counter]
-
-                    # QUEUE ON OR OFF?
-                    is_queue_active = self.c.config.get("event_queue_active", True)
-
-                    # Trigger hitmarker first
-                    if is_hs:
-                        self.c.trigger_overlay_event("Headshot Hitmarker")
+                    if self.c.killstreak_count == 0:
+                        self.c.killstreak_count = 1
+                        self.c.streak_factions = []
+                        self.c.streak_slot_map = []
                     else:
-                        self.c.trigger_overlay_event("Hitmarker")
+                        self.c.killstreak_count += 1
+
+                    v_team = p.get("team_id")
+                    v_fac = FACTION_TAGS.get(str(v_team), "NSO")
+                    self.c.streak_factions.append(v_fac)
+                    self.c.streak_slot_map.append(self.c._get_random_slot())
+                    self.c.is_dead = False
+                    self.c.was_revived = False
+                    self.c.update_streak_display()
+
+                # Multi Kill Logic
+                if curr_time - getattr(self.c, "last_kill_time", 0) <= self.c.streak_timeout:
+                    self.c.kill_counter += 1
+                else:
+                    self.c.kill_counter = 1
+                self.c.last_kill_time = curr_time
 
-                    if is_queue_active:
-                        for evt in base_events: self.c.trigger_overlay_event(evt)
-                        if multi_event: self.c.trigger_overlay_event(multi_event)
-                        if streak_event: self.c.trigger_overlay_event(streak_event)
-                    else:
-                        # Queue disabled: Still trigger ALL, but they play in parallel now!
-                        for evt in base_events: self.c.trigger_overlay_event(evt)
-                        if multi_event: self.c.trigger_overlay_event(multi_event)
-                        if streak_event: self.c.trigger_overlay_event(streak_event)
+                # EVENT DETERMINATION (QUEUE LOGIC START)
+                base_events = []
+                weapon_name = w_info.get("name", "Unknown")
 
+                if weapon_id in PS2_DETECTION["SPECIAL_IDS"]:
+                    base_events.append(PS2_DETECTION["SPECIAL_IDS"][weapon_id])
+                elif category in PS2_DETECTION["CATEGORIES"]:
+                    base_events.append(PS2_DETECTION["CATEGORIES"][category])
+                elif weapon_name in PS2_DETECTION["NAMES"]:
+                    base_events.append(PS2_DETECTION["NAMES"][weapon_name])
 
+                if is_hs and "Headshot" not in base_events:
+                    base_events.append("Headshot")
 
-                    # Build Killfeed message (Normal)
-                    s_vic = self.c.session_stats.get(victim_id, {})
-                    try:
-                        # Calculate real KD (respecting Revive Mode)
-                        raw_d = s_vic.get('d', 1)
-                        if self.c.kd_mode_revive:
-                            raw_d = max(0, raw_d - s_vic.get('revives_received', 0))
-                        kd_str = f"{(s_vic.get('k', 0) / max(1, raw_d)):.1f}"
-                    except:
-                        kd_str = "0.0"
+                # Streak Events
+                streak_event = STREAK_EVENTS.get(self.c.killstreak_count)
 
-                    msg = f"""<div style="{base_style}">
-                            {icon_html}<span style="color: #888;">{v_tag}</span><span style="color: #ffffff;">{v_name}</span> 
-                            <span style="color: #aaaaaa; font-size: 0.85em;"> ({kd_str})</span></div>"""
+                # Multi Events
+                multi_event = None
+                if self.c.kill_counter > 1:
+                    multi_event = MULTI_KILL_EVENTS.get(self.c.kill_counter)
 
-                    if self.c.config.get("killfeed", {}).get("active", True):
-                        if self.c.overlay_win: self.c.overlay_win.signals.killfeed_entry.emit(msg)
-
-                    # Voice & Class Event Checks
-                    v_load = p.get("character_loadout_id")
-                    kd_val = float(kd_str)
-
-                    # 1. CLASS DETECTION (Overlay Event)
-                    class_event_name = "Kill"  # Default
-                    detected_class = None
-
-                    if v_load in LOADOUT_MAP["infil"]:   detected_class = "Kill Infil"
-                    elif v_load in LOADOUT_MAP["la"]:    detected_class = "Kill Light Assault"
-                    elif v_load in LOADOUT_MAP["medic"]: detected_class = "Kill Medic"
-                    elif v_load in LOADOUT_MAP["engi"]:  detected_class = "Kill Engineer"
-                    elif v_load in LOADOUT_MAP["heavy"]: detected_class = "Kill Heavy"
-                    elif v_load in LOADOUT_MAP["max"]:   detected_class = "Kill MAX"
-
-                    # 2. SUBSET LOGIC: Check if specific event is configured
-                    if detected_class:
-                        self._trigger_subset_event("Kill", detected_class)
-                    else:
-                        self.c.trigger_overlay_event("Kill")
+                # QUEUE ON OR OFF?
+                is_queue_active = self.c.config.get("event_queue_active", True)
 
-                    # 4. VOICE MACROS (Keep existing logic + add others if needed later)
-                    if v_load in LOADOUT_MAP["max"]:
-                        self.c.trigger_auto_voice("kill_max")
-                    if v_load in LOADOUT_MAP["infil"]:
-                        self.c.trigger_auto_voice("kill_infil")
-                    
-                    if kd_val >= 2.0:
-                        self.c.trigger_auto_voice("kill_high_kd")
-                    elif is_hs:
-                        self.c.trigger_auto_voice("kill_hs")
-
-            # === B) I WAS KILLED (VICTIM) ===
-            elif victim_id == my_id:
-                # --- UPDATE: SET DEAD STATE ---
-                self.is_dead_state = True
-
-                # --- 1. CHECK DOUBLE DEATH (FIX FOR PERSISTENT STREAK) ---
-                # If we are already marked as "dead" (i.e., not revived)
-                # and die again, it was a respawn without kill/XP -> Streak is GONE.
-                if self.c.is_dead and not self.c.was_revived:
-                     self.c.add_log("STREAK: Double Death recognized (No Revive in between) -> Force Reset.")
-                     self.c.killstreak_count = 0
-                     self.c.streak_factions = []
-                     self.c.streak_slot_map = []
-                     # Reset Support Streak
-                     for k in self.support_streaks:
-                         self.support_streaks[k] = 0
-
-                # --- 2. SAVE STATUS (BACKUP) ---
-                if self.c.killstreak_count > 0:
-                    self.c.saved_streak = self.c.killstreak_count
-                    self.c.saved_factions = getattr(self.c, 'streak_factions', [])
-                    self.c.saved_slots = getattr(self.c, 'streak_slot_map', [])
+                # Trigger hitmarker first
+                if is_hs:
+                    self.c.trigger_overlay_event("Headshot Hitmarker")
                 else:
-                    self.c.saved_streak = 0
-                    self.c.saved_factions = []
-                    self.c.saved_slots = []
-
-                # --- 3. RESET DECISION ---
-                if is_tk:
-                    # CASE A: TEAMKILL -> NO RESET!
-                    self.c.add_log("STREAK: Teamkill recognized - keep streak!")
-                    self.c.is_tk_death = True
-                    # We do NOT set the counter to 0.
-                    # We do NOT empty the lists.
-                    # The streak remains visible in the overlay.
-                    
-                    self.c.trigger_overlay_event("Team Kill Victim")
+                    self.c.trigger_overlay_event("Hitmarker")
 
+                if is_queue_active:
+                    for evt in base_events: self.c.trigger_overlay_event(evt)
+                    if multi_event: self.c.trigger_overlay_event(multi_event)
+                    if streak_event: self.c.trigger_overlay_event(streak_event)
                 else:
-                    # CASE B: NORMAL DEATH / SUICIDE
-                    self.c.is_tk_death = False
-                    self.c.add_log("DEBUG: Handling Death -> Hiding Streak.")
-                    self.c.hide_streak_display()
-
-                    if killer_id == my_id:
-                        self.c.trigger_overlay_event("Suicide")
-                    else:
-                        # --- NEW: Headshot Death Check ---
-                        if is_hs:
-                            self._trigger_subset_event("Death", "Headshot Death")
-                        else:
-                            self.c.trigger_overlay_event("Death")
+                    # Queue disabled: Still trigger ALL, but they play in parallel now!
+                    for evt in base_events: self.c.trigger_overlay_event(evt)
+                    if multi_event: self.c.trigger_overlay_event(multi_event)
+                    if streak_event: self.c.trigger_overlay_event(streak_event)
+
+
+
+                # Build Killfeed message (Normal)
+                s_vic = self.c.session_stats.get(victim_id, {})
+                try:
+                    # Calculate real KD (respecting Revive Mode)
+                    raw_d = s_vic.get('d', 1)
+                    if self.c.kd_mode_revive:
+                        raw_d = max(0, raw_d - s_vic.get('revives_received', 0))
+                    kd_str = f"{(s_vic.get('k', 0) / max(1, raw_d)):.1f}"
+                except:
+                    kd_str = "0.0"
+
+                if self.c.config.get("killfeed", {}).get("active", True):
+                    self._emit_named_killfeed(victim_id, lambda v_name, v_tag: f"""<div style="{base_style}">
+                        {icon_html}<span style="color: #888;">{v_tag}</span><span style="color: #ffffff;">{v_name}</span> 
+                        <span style="color: #aaaaaa; font-size: 0.85em;"> ({kd_str})</span></div>""")
+
+                # Voice & Class Event Checks
+                v_load = p.get("character_loadout_id")
+                kd_val = float(kd_str)
+
+                # 1. CLASS DETECTION (Overlay Event) + 2. SUBSET LOGIC
+                loadout_rule = self.loadout_rules.get(v_load)
+                if loadout_rule:
+                    class_event, voice_trigger = loadout_rule
+                    self._trigger_subset_event("Kill", class_event)
+                else:
+                    voice_trigger = None
+                    self.c.trigger_overlay_event("Kill")
 
-                # --- 3. UPDATE STATUS ---
-                self.c.is_dead = True
-                self.c.was_revived = False
-                self.c.add_log(f"DEBUG: Death State Set. Streak Count: {self.c.killstreak_count}")
-                self.c.update_streak_display()
+                # 4. VOICE MACROS (Keep existing logic + add others if needed later)
+                if voice_trigger:
+                    self.c.trigger_auto_voice(voice_trigger)
+                
+                if kd_val >= 2.0:
+                    self.c.trigger_auto_voice("kill_high_kd")
+                elif is_hs:
+                    self.c.trigger_auto_voice("kill_hs")
+
+        # === B) I WAS KILLED (VICTIM) ===
+        elif victim_id == my_id:
+            # --- UPDATE: SET DEAD STATE ---
+            self.is_dead_state = True
+
+            # --- 1. CHECK DOUBLE DEATH (FIX FOR PERSISTENT STREAK) ---
+            # If we are already marked as "dead" (i.e., not revived)
+            # and die again, it was a respawn without kill/XP -> Streak is GONE.
+            if self.c.is_dead and not self.c.was_revived:
+                 self.c.add_log("STREAK: Double Death recognized (No Revive in between) -> Force Reset.")
+                 self.c.killstreak_count = 0
+                 self.c.streak_factions = []
+                 self.c.streak_slot_map = []
+                 # Reset Support Streak
+                 for k in self.support_streaks:
+                     self.support_streaks[k] = 0
+
+            # --- 2. SAVE STATUS (BACKUP) ---
+            if self.c.killstreak_count > 0:
+                self.c.saved_streak = self.c.killstreak_count
+                self.c.saved_factions = getattr(self.c, 'streak_factions', [])
+                self.c.saved_slots = getattr(self.c, 'streak_slot_map', [])
+            else:
+                self.c.saved_streak = 0
+                self.c.saved_factions = []
+                self.c.saved_slots = []
+
+            # --- 3. RESET DECISION ---
+            if is_tk:
+                # CASE A: TEAMKILL -> NO RESET!
+                self.c.add_log("STREAK: Teamkill recognized - keep streak!")
+                self.c.is_tk_death = True
+                # We do NOT set the counter to 0.
+                # We do NOT empty the lists.
+                # The streak remains visible in the overlay.
+                
+                self.c.trigger_overlay_event("Team Kill Victim")
 
-                # --- 4. KILLFEED INFO ---
-                if killer_id and killer_id != "0":
-                    k_name = self.c.name_cache.get(killer_id, "Unknown")
-                    raw_tag = getattr(self.c, "outfit_cache", {}).get(killer_id, "")
-                    k_tag = f"[{raw_tag}] " if raw_tag else ""
-
-                    # Get killer's KD
-                    k_vic = self.c.session_stats.get(killer_id, {})
-                    try:
-                        raw_k_d = k_vic.get('d', 1)
-                        if self.c.kd_mode_revive:
-                            raw_k_d = max(0, raw_k_d - k_vic.get('revives_received', 0))
-                        
-                        k_kd = f"{(k_vic.get('k', 0) / max(1, raw_k_d)):.1f}"
-                    except:
-                        k_kd = "0.0"
+            else:
+                # CASE B: NORMAL DEATH / SUICIDE
+                self.c.is_tk_death = False
+                self.c.add_log("DEBUG: Handling Death -> Hiding Streak.")
+                self.c.hide_streak_display()
 
+                if killer_id == my_id:
+                    self.c.trigger_overlay_event("Suicide")
+                else:
+                    # --- NEW: Headshot Death Check ---
+                    if is_hs:
+                        self._trigger_subset_event("Death", "Headshot Death")
+                    else:
+                        self.c.trigger_overlay_event("Death")
+
+            # --- 3. UPDATE STATUS ---
+            self.c.is_dead = True
+            self.c.was_revived = False
+            self.c.add_log(f"DEBUG: Death State Set. Streak Count: {self.c.killstreak_count}")
+            self.c.update_streak_display()
+
+            # --- 4. KILLFEED INFO ---
+            if killer_id and killer_id != "0":
+                # Get killer's KD
+                k_vic = self.c.session_stats.get(killer_id, {})
+                try:
+                    raw_k_d = k_vic.get('d', 1)
+                    if self.c.kd_mode_revive:
+                        raw_k_d = max(0, raw_k_d - k_vic.get('revives_received', 0))
                     
+                    k_kd = f"{(k_vic.get('k', 0) / max(1, raw_k_d)):.1f}"
+                except:
+                    k_kd = "0.0"
 
-                    # TEAMKILL DISPLAY CHECK
-                    if is_tk:
-                        msg = f"""<div style="{base_style}">
-                                            <span style="color: #ffaa00;">⚠️ TK BY </span>
-                                            <span style="color: #888;">{k_tag}</span><span style="color: #ffffff;">{k_name}</span>
-                                            </div>"""
-                    else:
-                        msg = f"""<div style="{base_style}">
-                                            {icon_html}<span style="color: #888;">{k_tag}</span><span style="color: #ff4444;">{k_name}</span>
-                                            <span style="color: #aaa; font-size: 0.85em;"> ({k_kd})</span></div>"""
+                
 
-                    if self.c.config.get("killfeed", {}).get("active", True):
-                        if self.c.overlay_win: self.c.overlay_win.signals.killfeed_entry.emit(msg)
+                # TEAMKILL DISPLAY CHECK
+                if is_tk:
+                    render = lambda k_name, k_tag: f"""<div style="{base_style}">
+                                        <span style="color: #ffaa00;">⚠️ TK BY </span>
+                                        <span style="color: #888;">{k_tag}</span><span style="color: #ffffff;">{k_name}</span>
+                                        </div>"""
+                else:
+                    render = lambda k_name, k_tag: f"""<div style="{base_style}">
+                                        {icon_html}<span style="color: #888;">{k_tag}</span><span style="color: #ff4444;">{k_name}</span>
+                                        <span style="color: #aaa; font-size: 0.85em;"> ({k_kd})</span></div>"""
+
+                if self.c.config.get("killfeed", {}).get("active", True):
+                    self._emit_named_killfeed(killer_id, render)
 
     def _handle_experience(self, p, get_stat_obj):
         exp_id = str(p.get("experience_id", "0"))
@@ -776,12 +1071,11 @@ class CensusWorker:
 
         # --- FEATURE: LATE START ACTIVATION (Auto-Detect Character) ---
         # Robust check: If incoming XP belongs to ANY of my characters, auto-switch to it!
-        char_in_db = char_id in self.c.char_data.values()
-        if char_in_db and char_id != self.c.current_character_id:
+        if char_id in self.tracked_ids and char_id != self.c.current_character_id:
             for name, saved_id in self.c.char_data.items():
                 if saved_id == char_id:
                     t_id = p.get("team_id", "0")
-                    f_tag = {"1": "VS", "2": "NC", "3": "TR"}.get(str(t_id), "NSO")
+                    f_tag = FACTION_TAGS.get(str(t_id), "NSO")
 
                     # RESET logic if character actually changed
                     if self.c.last_tracked_id and self.c.last_tracked_id != char_id:
@@ -791,11 +1085,11 @@ class CensusWorker:
                     self.c.last_tracked_id = char_id
                     self.c.current_selected_char_name = name
                     if hasattr(self.c, "_ensure_session_stats_entry"):
-                        self.c._ensure_session_stats_entry(char_id, name=name)
+                        self.c._ensure_session_stats_entry(char_id, name=name, start=self.clock.event_time(p))
 
                     # Update GUI dropdown safely
-                    from PyQt6.QtCore import QMetaObject, Qt, Q_ARG
                     if hasattr(self.c, 'ovl_config_win'):
+                        from PyQt6.QtCore import QMetaObject, Qt, Q_ARG
                         QMetaObject.invokeMethod(self.c.ovl_config_win.char_combo, "setCurrentText",
                                                  Qt.ConnectionType.QueuedConnection,
                                                  Q_ARG(str, name))
@@ -809,8 +1103,7 @@ class CensusWorker:
                     # Resume Timer if in session stats
                     if char_id in self.c.session_stats:
                         s_obj = self.c.session_stats[char_id]
-                        if s_obj.get("start", 0) == 0:
-                            s_obj["start"] = time.time()
+                        if self.clock.open_interval(s_obj, self.clock.event_time(p)):
                             self.c.add_log(f"TIMER: Resumed session for {name} (Late Join)")
 
                     self.c.trigger_overlay_event(f"Login {f_tag}")
@@ -820,25 +1113,28 @@ class CensusWorker:
         my_id = self.c.current_character_id
 
         # --- FROM HERE: NORMAL XP LOGIC ---
-        if exp_id in ["2", "3", "371", "372"]:
+        rule = self.exp_rules.get(exp_id, NO_EXP_RULE)
+        if rule.assist:
             a_obj = get_stat_obj(char_id, p.get("team_id"))
             a_obj["a"] += 1
             if my_id and char_id == my_id:
                 self.c.trigger_overlay_event("Assist")
-        if exp_id in ["7", "53"]:
+        if rule.revive:
             r_obj = get_stat_obj(other_id, p.get("team_id"))
             # INSTEAD of subtracting deaths, we increment revives
             # if r_obj["d"] > 0: r_obj["d"] -= 1
             r_obj["revives_received"] = r_obj.get("revives_received", 0) + 1
 
-
+        # Fast path: the rest only concerns the active character.
+        if not my_id or (char_id != my_id and other_id != my_id):
+            return
 
         # A) EVENTS THAT HAPPEN TO ME
         if my_id and other_id == my_id:
-            if exp_id == "26":
+            if rule.roadkill:
                 self.c.trigger_overlay_event("Get RoadKilled")
 
-            if exp_id in ["7", "53"]:
+            if rule.revive:
                 self.c.was_revived = True
                 self.c.is_dead = False
                 self.is_dead_state = False
@@ -852,18 +1148,13 @@ class CensusWorker:
                 self.c.trigger_auto_voice("revived")
 
                 if self.c.config.get("killfeed", {}).get("show_revives", True):
-                    m_name = self.c.name_cache.get(char_id, "Medic")
-
-                    # NEW: Font Size from Config (Robust)
-                    kf_cfg_raw = self.c.config.get("killfeed", {})
-                    kf_cfg = kf_cfg_raw if isinstance(kf_cfg_raw, dict) else {}
-                    kf_font = kf_cfg.get("font_size", 19)
-                    base_style = f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; margin-bottom: 2px; text-align: right;"
-
-                    msg = f'<div style="{base_style}"><span style="color: #00ff00;">✚ REVIVED BY </span>{m_name}</div>'
+                    base_style = self._killfeed_style().base
 
                     if self.c.config.get("killfeed", {}).get("active", True):
-                        if self.c.overlay_win: self.c.overlay_win.signals.killfeed_entry.emit(msg)
+                        self._emit_named_killfeed(
+                            char_id,
+                            lambda m_name, _tag: f'<div style="{base_style}"><span style="color: #00ff00;">✚ REVIVED BY </span>{m_name}</div>',
+                            fallback="Medic")
 
         # B) EVENTS THAT I DO
         if my_id and char_id == my_id:
@@ -890,81 +1181,68 @@ class CensusWorker:
             # Instead of firing directly, we forward it to _process_stat_event.
 
             # 1. GUNNER KILLS (Gunner Seat)
-            if exp_id in self.vehicle_gunner_kill_map:
-                v_name = self.vehicle_gunner_kill_map[exp_id]
+            if rule.gunner_vehicle:
+                v_name = rule.gunner_vehicle
                 self._trigger_subset_event("Gunner Vehicle Destruction", f"Gunner Kill {v_name}")
                 self._emit_gunner_vehicle_killfeed(v_name)
 
             # 2. VEHICLE DESTRUCTION (Driver/Solo)
-            if exp_id in self.vehicle_destruction_map:
-                v_name = self.vehicle_destruction_map[exp_id]
+            if rule.destroyed_vehicle:
+                v_name = rule.destroyed_vehicle
                 self._trigger_subset_event("Vehicle Destruction", f"Kill {v_name}")
                 self._emit_vehicle_killfeed(v_name)
 
-            if exp_id in ["7", "53"]:
+            if rule.revive:
                 # Increment & trigger Revive Given
                 self._process_stat_event("Revive Given")
-            else:
-                # Check all other support events (Heal, Resupply, etc.) from the list
-                for event_name, id_list in PS2_EXP_DETECTION.items():
-                    if exp_id in id_list:
-                        self._process_stat_event(event_name)
-                        if event_name == "Gunner Kill":
-                            self._emit_gunner_killfeed_from_victim(p.get("other_id"))
-                        break
-
-    def _try_add_gunner_killfeed(self, gunner_id, exp_ts, retries=0):
+            elif rule.support_event:
+                # All other support events (Heal, Resupply, etc.)
+                self._process_stat_event(rule.support_event)
+                if rule.support_event == "Gunner Kill":
+                    self._correlate_gunner_kill(p.get("other_id"), self.clock.event_time(p))
+
+    def _correlate_gunner_kill(self, victim_id, exp_ts):
         """
-        Recursively tries to find the gunner kill.
+        Gunner-kill XP names the victim; the Death event (may arrive before or
+        after it) adds headshot and KD. Unmatched XP falls back to a plain
+        entry when the index sweep expires it.
         """
-        if not gunner_id or gunner_id == "0":
-            return
-
-        match_entry = None
-
-        # 1. ATTEMPT: Search in existing deaths
-        with self.recent_deaths_lock:
-            for entry in self.recent_deaths:
-                d_p = entry["payload"]
+        death = self.gunner_kills.expect(victim_id, exp_ts)
+        if death is not None:
+            self._emit_gunner_killfeed(death)
 
-                # Ignore already processed
-                if entry.get("gunner_matched"):
-                    continue
+    def _request_name(self, cid):
+        resolver = getattr(self.c, "name_resolver", None)
+        if resolver is not None:
+            resolver.request(cid)
 
-                # LOGIC: The attacker in the death event must be our gunner
-                if d_p.get("attacker_character_id") == gunner_id:
-                    # Optional: Time check (Kill should be close to the XP event, +/- 10 sec)
-                    # Often not necessary here, as recent_deaths is short anyway.
-
-                    entry["gunner_matched"] = True
-                    match_entry = entry
-                    break
-
-        # 2. SUCCESS
-        if match_entry:
-            self.c.add_log(f"DEBUG: Gunner kill found! (Retries left: {retries})")
-            self._emit_gunner_killfeed(match_entry["payload"])
+    def _emit_named_killfeed(self, cid, render, fallback="Unknown"):
+        """
+        Emits `render(name, tag_html)` to the killfeed. If the name is not
+        cached yet, the entry waits up to KILLFEED_NAME_WAIT_S for the name
+        resolver (emitting from its thread) before falling back.
+        """
+        overlay = self.c.overlay_win
+        if not overlay:
             return
 
-        # 3. FAILURE -> RETRY OR ABORT
-        if retries > 0:
-            # Not there yet? Wait 0.5 seconds and try again (recursion)
-            # We use threading.Timer to avoid blocking the main loop
-            threading.Timer(
-                0.5,
-                self._try_add_gunner_killfeed,
-                args=(gunner_id, exp_ts, retries - 1)
-            ).start()
+        def emit(name):
+            raw_tag = getattr(self.c, "outfit_cache", {}).get(cid, "")
+            tag = f"[{raw_tag}] " if raw_tag else ""
+            overlay.signals.killfeed_entry.emit(render(name or fallback, tag))
+
+        name = self.c.name_cache.get(cid)
+        resolver = getattr(self.c, "name_resolver", None)
+        if name is not None or resolver is None or not cid or cid == "0":
+            emit(name)
         else:
-            # Still no matching death after 5 seconds (10 * 0.5)
-            # This happens if the gunner e.g. only destroyed a vehicle (no death event for occupants)
-            # or the death event was lost.
-            self.c.add_log(f"DEBUG: Gunner Kill Time-Out. ID: {gunner_id}")
-            pass
+            resolver.when_resolved(cid, emit, KILLFEED_NAME_WAIT_S)
 
     def _emit_gunner_killfeed(self, p):
         if not self.c.config.get("killfeed", {}).get("active", True):
             return
+        if not self.c.config.get("killfeed", {}).get("show_gunner", True):
+            return
         if not self.c.overlay_win:
             return
 
@@ -975,25 +1253,9 @@ class CensusWorker:
         is_hs = (p.get("is_headshot") == "1")
 
 
-        icon_html = ""
-        if is_hs:
-            hs_icon = self.c.config.get("killfeed", {}).get("hs_icon", "Headshot.png")
-            hs_path = get_asset_path(hs_icon).replace("\\", "/")
-            if os.path.exists(hs_path):
-                hs_size = self.c.config.get("killfeed", {}).get("hs_icon_size", 19)
-                icon_html = f'<img src="{hs_path}" width="{hs_size}" height="{hs_size}" style="vertical-align: middle;">&nbsp;'
-
-        kf_cfg_raw = self.c.config.get("killfeed", {})
-        kf_cfg = kf_cfg_raw if isinstance(kf_cfg_raw, dict) else {}
-        kf_font = kf_cfg.get("font_size", 19)
-        base_style = (
-            f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; "
-            "text-shadow: 1px 1px 2px #000; margin-bottom: 2px; text-align: right;"
-        )
-
-        v_name = self.c.name_cache.get(victim_id, "Unknown")
-        raw_tag = getattr(self.c, "outfit_cache", {}).get(victim_id, "")
-        v_tag = f"[{raw_tag}] " if raw_tag else ""
+        kf_style = self._killfeed_style()
+        icon_html = kf_style.hs_icon_html if is_hs else ""
+        base_style = kf_style.shadowed
 
         s_vic = self.c.session_stats.get(victim_id, {})
         try:
@@ -1005,12 +1267,10 @@ class CensusWorker:
             kd_str = "0.0"
 
 
-        msg = f"""<div style="{base_style}">
+        self._emit_named_killfeed(victim_id, lambda v_name, v_tag: f"""<div style="{base_style}">
                 <span style="color: #ff8c00;">GUNNER </span>
                 {icon_html}<span style="color: #888;">{v_tag}</span><span style="color: #ffffff;">{v_name}</span>
-                <span style="color: #aaaaaa; font-size: 0.85em;"> ({kd_str})</span></div>"""
-
-        self.c.overlay_win.signals.killfeed_entry.emit(msg)
+                <span style="color: #aaaaaa; font-size: 0.85em;"> ({kd_str})</span></div>""")
 
     def _emit_gunner_killfeed_from_victim(self, victim_id):
         if not self.c.config.get("killfeed", {}).get("active", True):
@@ -1022,24 +1282,12 @@ class CensusWorker:
         if not victim_id or victim_id == "0":
             return
 
-        kf_cfg_raw = self.c.config.get("killfeed", {})
-        kf_cfg = kf_cfg_raw if isinstance(kf_cfg_raw, dict) else {}
-        kf_font = kf_cfg.get("font_size", 19)
-        base_style = (
-            f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; "
-            "text-shadow: 1px 1px 2px #000; margin-bottom: 2px; text-align: right;"
-        )
+        base_style = self._killfeed_style().shadowed
 
-        v_name = self.c.name_cache.get(victim_id, "Unknown")
-        raw_tag = getattr(self.c, "outfit_cache", {}).get(victim_id, "")
-        v_tag = f"[{raw_tag}] " if raw_tag else ""
-
-        msg = f"""<div style="{base_style}">
+        self._emit_named_killfeed(victim_id, lambda v_name, v_tag: f"""<div style="{base_style}">
                 <span style="color: #ff8c00;">GUNNER KILL </span>
                 <span style="color: #888;">{v_tag}</span><span style="color: #ffffff;">{v_name}</span>
-                </div>"""
-
-        self.c.overlay_win.signals.killfeed_entry.emit(msg)
+                </div>""")
 
     def _emit_gunner_vehicle_killfeed(self, vehicle_name):
         if not self.c.config.get("killfeed", {}).get("active", True):
@@ -1051,13 +1299,7 @@ class CensusWorker:
         if not vehicle_name:
             return
 
-        kf_cfg_raw = self.c.config.get("killfeed", {})
-        kf_cfg = kf_cfg_raw if isinstance(kf_cfg_raw, dict) else {}
-        kf_font = kf_cfg.get("font_size", 19)
-        base_style = (
-            f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; "
-            "text-shadow: 1px 1px 2px #000; margin-bottom: 2px; text-align: right;"
-        )
+        base_style = self._killfeed_style().shadowed
 
         msg = f"""<div style="{base_style}">
                 <span style="color: #ff8c00;">GUNNER KILL </span>
@@ -1076,13 +1318,7 @@ class CensusWorker:
         if not vehicle_name:
             return
 
-        kf_cfg_raw = self.c.config.get("killfeed", {})
-        kf_cfg = kf_cfg_raw if isinstance(kf_cfg_raw, dict) else {}
-        kf_font = kf_cfg.get("font_size", 19)
-        base_style = (
-            f"font-family: 'Black Ops One', sans-serif; font-size: {kf_font}px; "
-            "text-shadow: 1px 1px 2px #000; margin-bottom: 2px; text-align: right;"
-        )
+        base_style = self._killfeed_style().shadowed
 
         msg = f"""<div style="{base_style}">
                 <span style="color: #ff8c00;">VEHICLE DESTROYED </span>
@@ -1091,7 +1327,7 @@ class CensusWorker:
 
         self.c.overlay_win.signals.killfeed_entry.emit(msg)
 
-    def _handle_facility_event(self, p):
+    def _handle_facility_event(self, p, ev_ts):
         char_id = str(p.get("character_id", "")).strip()
         facility_id = str(p.get("facility_id", "")).strip()
 
@@ -1104,13 +1340,13 @@ class CensusWorker:
         if world_id == "13":
             world_id = "10"
 
-        s_obj = self._get_stat_obj(char_id, "0", world_id)
+        s_obj = self._get_stat_obj(char_id, "0", world_id, ev_ts)
         s_obj["world_id"] = world_id
         s_obj["last_seen_base"] = self.facility_map.get(facility_id, f"Facility {facility_id}")
 
 
         if char_id not in self.c.name_cache:
-            self.c.id_queue.put(char_id)
+            self._request_name(char_id)
 
         if char_id == str(getattr(self.c, "current_character_id", "") or ""):
             if hasattr(self.c, "update_discord_presence"):
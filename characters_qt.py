@@ -7,6 +7,10 @@ from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                              QSplitter, QTreeWidget, QTreeWidgetItem, QScrollArea, QProgressBar)
 from PyQt6.QtCore import Qt, pyqtSignal, QObject, pyqtSlot
 
+from census_rest import get_census_client
+from faction_classifier import get_faction_classifier
+from item_catalog import get_item_catalog, normalize_item_name
+
 
 # --- SIGNALS ---
 class CharacterSignals(QObject):
@@ -426,11 +430,9 @@ class CharacterWidget(QWidget):
         self.current_char_id = char_id
         # Use dynamic s_id from controller if available, fallback to env or example
         s_id = getattr(self.controller, "s_id", None) or os.getenv("CENSUS_S_ID", "s:example")
-        url = f"https://census.daybreakgames.com/{s_id}/get/ps2:v2/characters_directive_tree?character_id={char_id}&c:limit=500&c:join=directive_tree^on:directive_tree_id^to:directive_tree_id^inject_at:tree(directive_tree_category^on:directive_tree_category_id^to:directive_tree_category_id^inject_at:category)"
+        query = f"character_id={char_id}&c:limit=500&c:join=directive_tree^on:directive_tree_id^to:directive_tree_id^inject_at:tree(directive_tree_category^on:directive_tree_category_id^to:directive_tree_category_id^inject_at:category)"
         try:
-            import requests
-            r = requests.get(url, timeout=30)
-            data = r.json()
+            data = get_census_client(s_id).get("characters_directive_tree", query, timeout=30)
             
             # Update on main thread
             from PyQt6.QtCore import QMetaObject, Qt, Q_ARG
@@ -519,17 +521,20 @@ class CharacterWidget(QWidget):
 
         # 1. Fetch static tree structure
         # FIXED: Routed the objectives join through objective_set_to_objective so we actually receive param1 and param5.
-        url_tree = f"https://census.daybreakgames.com/{s_id}/get/ps2:v2/directive_tree?directive_tree_id={tree_id}&c:lang=en&c:join=directive_tier^on:directive_tree_id^to:directive_tree_id^list:1^inject_at:tiers(directive^on:directive_tier_id^to:directive_tier_id^terms:directive_tree_id={tree_id}^list:1^inject_at:directives(objective_set_to_objective^on:objective_set_id^to:objective_set_id^list:1^inject_at:objective_set_to_objective(objective^on:objective_group_id^to:objective_group_id^list:1^inject_at:objectives)))"
+        q_tree = f"directive_tree_id={tree_id}&c:lang=en&c:join=directive_tier^on:directive_tree_id^to:directive_tree_id^list:1^inject_at:tiers(directive^on:directive_tier_id^to:directive_tier_id^terms:directive_tree_id={tree_id}^list:1^inject_at:directives(objective_set_to_objective^on:objective_set_id^to:objective_set_id^list:1^inject_at:objective_set_to_objective(objective^on:objective_group_id^to:objective_group_id^list:1^inject_at:objectives)))"
         
         # 2. Fetch character progress for this tree
-        url_char = f"https://census.daybreakgames.com/{s_id}/get/ps2:v2/characters_directive?character_id={char_id}&directive_tree_id={tree_id}&c:limit=500"
-        url_char_obj = f"https://census.daybreakgames.com/{s_id}/get/ps2:v2/characters_directive_objective?character_id={char_id}&directive_tree_id={tree_id}&c:limit=500"
+        q_char = f"character_id={char_id}&directive_tree_id={tree_id}&c:limit=500"
         
         try:
-            import requests
-            r_tree = requests.get(url_tree, timeout=30).json()
-            r_char = requests.get(url_char, timeout=30).json()
-            r_char_obj = requests.get(url_char_obj, timeout=30).json()
+            # The three queries are independent: run them in parallel on the shared client.
+            rest = get_census_client(s_id)
+            f_tree = rest.get_async("directive_tree", q_tree, timeout=30)
+            f_char = rest.get_async("characters_directive", q_char, timeout=30)
+            f_char_obj = rest.get_async("characters_directive_objective", q_char, timeout=30)
+            r_tree = f_tree.result()
+            r_char = f_char.result()
+            r_char_obj = f_char_obj.result()
             
             tree_data = r_tree.get("directive_tree_list", [{}])[0]
             char_directives = {d["directive_id"]: d for d in r_char.get("characters_directive_list", [])}
@@ -576,123 +581,18 @@ class CharacterWidget(QWidget):
         title = QLabel(f"<span style='font-size: 18px; color: #00f2ff; font-weight: bold;'>{tree_name}</span>")
         self.dir_details_layout.addWidget(title)
         
-        # Load Faction Filter Data once (name-based matching is more stable than item IDs)
-        faction_map_size = 0
-        faction_name_map = {}
-        
-        def normalize_filter_name(name):
-            if not name:
-                return ""
-            # Keep alnum chars, normalize separators/casing for loose CSV matches
-            cleaned = "".join(ch if ch.isalnum() else " " for ch in str(name).upper())
-            return " ".join(cleaned.split())
-        
-        def lookup_factions_by_name(name):
-            norm = normalize_filter_name(name)
-            if not norm:
-                return set()
-            
-            exact = faction_name_map.get(norm)
-            if exact:
-                return set(exact)
-            
-            # Fallback: allow substring matches for minor naming format differences
-            for csv_name_norm, factions in faction_name_map.items():
-                if len(csv_name_norm) < 4:
-                    continue
-                if csv_name_norm in norm or norm in csv_name_norm:
-                    return set(factions)
-            return set()
+        # Faction filter: name-based matching is more stable than item IDs. The
+        # classifier is built once over the term lists and sanction-list.csv names.
+        classifier = get_faction_classifier()
+        infer_faction_from_name = classifier.infer
+        lookup_factions_by_name = classifier.factions
+        faction_map_size = len(get_item_catalog().faction_names())
+        if get_item_catalog().source is None:
+            self.add_log("WRN: sanction-list.csv could not be loaded; CSV faction filter inactive.")
 
-        try:
-            from dior_utils import get_asset_path
-            import csv
-            csv_path = get_asset_path("sanction-list.csv")
-            if os.path.exists(csv_path):
-                # Use utf-8-sig to handle potential BOM
-                with open(csv_path, 'r', encoding='utf-8-sig') as f:
-                    reader = csv.DictReader(f)
-                    fields = [fn.strip() for fn in (reader.fieldnames or [])]
-                    
-                    # Robust key matching (ignore case/spaces)
-                    fac_key = next((f for f in fields if f.lower().replace(" ", "") == "factionid"), "Faction ID")
-                    name_key = next((f for f in fields if f.lower().replace(" ", "") == "itemname"), "Item Name")
-                    
-                    for row in reader:
-                        # Clean the row keys and values
-                        clean_row = {str(k).strip(): str(v).strip() for k, v in row.items() if k}
-                        f_id = clean_row.get(fac_key, "")
-                        i_name = clean_row.get(name_key, "")
-                        
-                        if i_name and f_id:
-                            norm_name = normalize_filter_name(i_name)
-                            if norm_name:
-                                faction_name_map.setdefault(norm_name, set()).add(f_id)
-                    
-                    faction_map_size = len(faction_name_map)
-                    if faction_map_size == 0:
-                         self.add_log(f"WRN: CSV loaded but 0 items mapped. Keys searched: {name_key}, {fac_key}. Found: {fields}")
-                    else:
-                        print(f"DEBUG: Found keys - Name:{name_key}, Fac:{fac_key}. Sample: {list(faction_name_map.keys())[:3]}")
-            else:
-                self.add_log(f"WRN: sanction-list.csv not found at {csv_path}")
-        except Exception as e:
-            print(f"Failed to load sanction-list.csv for faction filtering: {e}")
-            self.add_log(f"ERR: Faction list load error: {e}")
-            
         char_faction = str(payload.get("char_faction", "0"))
         print(f"DEBUG: update_tree_details_ui using Char Faction: {char_faction}")
         
-        def infer_faction_from_name(name):
-            """Primary filter for directives since names are reliable"""
-            n = name.upper()
-            
-            # Special variants (Survivor/Networked/Unique Empire Picks)
-            if "NS-W" in n or "NSX-W" in n or "XOXO" in n: return "1" # VS
-            if "NS-G" in n or "NSX-G" in n or "NS-C" in n: return "2" # NC
-            if "NS-M" in n or "NSX-M" in n or "NS-B" in n: return "3" # TR
-
-            nso_terms = [
-                "AR-", "SR-", "CB-", "XMG-", "PMG-", "BAR-", "SG-", "XGG-", "NP-"
-            ]
-            vs_terms = [
-                "PULSAR", "ORION", "SOLSTICE", "BEAMER", "LASHER", "SCYTHE", "MAGRIDER", "SIRIUS", "ZENITH", "PHASESHIFT", 
-                "VX", "VA", "VE", "SPYKER", "CERBERUS", "HV-45", "H-V45", "TERMINUS", "CORVUS", "ERIDANI", "SKORPIOS", "CANIS", "HORIZON", "LACERTA", 
-                "PPA", "SARON", "PROTON", "APHELION", "STARFALL", "EQUINOX", "SVA-88", "FLARE", "URSA", "COBALT", "OBELISK",
-                "GHOST", "PARALLAX", "XM98", "PHANTOM", "SPECTRE", "NYX", "NEMESIS", "HADES", "POLARIS", "QUASAR", "COSMOS", "NEBULA", "BLUESHIFT", "MANTIS",
-                "SERPENT", "PROMINENCE", "NOVA", "THANATOS", "DEIMOS", "SPIKER", "MANTICORE", "V10", "LANCER", "VS-", " VS ", "EIDOLON", "ECLIPSE", "SUPERNOVA"
-            ]
-            nc_terms = [
-                "GAUSS", "MERCENARY", "MAG-SHOT", "VANGUARD", "REAVER", "NC6", "GD-", "AF-", "LA-", "AC-", " AC ", "EM1", "EM6", "ANCHOR", "JACKHAMMER",
-                "REBEL", "DESPERADO", "GR-22", "CARNAGE", "REAPER", "BANDIT", "CYCLONE", "TEMPEST", "GLADIUS", "PROMISE", "BISHOP",
-                "ENFORCER", "CANISTER", "MJOLNIR", "PHOENIX", "SPARROW", "RAVEN", "CYLINDER", "RAILJACK", "SAW", "BLUEPRINT", "COVENANT",
-                "WARDEN", "VANDAL", "LONGSHOT", "BOLT DRIVER", "SAS-R", "GLADIATOR", "MERC", "MAULER", "TRAWLER", "TITAN", "ENFORCER", "FALCON",
-                "A-TROSS", "SHRIKE", "SWEEPER", "BRUISER", "MAG-SCATTER", "IMPETUS", "LA80", "NC-", " NC ", "TESSERACT"
-            ]
-            tr_terms = [
-                "CYCLER", "CARV", "REPEATER", "PROWLER", "MOSQUITO", "T1", "T9", "TX", "SABR", "TRAC", "JAGUAR", "LYNX", "TMG",
-                "INQUISITOR", "EMPEROR", "T1B", "TAR", "TORQ-9", "ARMISTICE", "SHURIKEN", "JACKAL", "DRAGOON",
-                "VULCAN", "MARAUDER", "GATEKEEPER", "STRIKER", "POUNDERS", "FRACTURES", "MSW-R", "BULL", "RHINO", "ARBALEST", "MINIGUN",
-                "99SV", "M77-B", "RAMS .50M", "TSAR-42", "TRAP-M1", "CLAYMORE", "VULCAN", "GATEKEEPER", "POUNDERS", "STRIKER", "ONAGER",
-                "NIGHTHAWK", "HAYMAKER", "BARRAGE", "BLACKJACK", "SKEP", "HAILSTORM", "M77-B", "TR-", " TR ", "LC", "HC"
-            ]
-            
-            # Check for exact faction tags first
-            if "(VS)" in n: return "1"
-            if "(NC)" in n: return "2"
-            if "(TR)" in n: return "3"
-            
-            # Prefix/Term scan
-            for t in nso_terms:
-                if t in n: return "4"
-            for t in vs_terms:
-                if t in n: return "1"
-            for t in nc_terms:
-                if t in n: return "2"
-            for t in tr_terms:
-                if t in n: return "3"
-            return None
-
         if faction_map_size > 0:
             self.add_log(f"LOG: Loaded {faction_map_size} weapons for faction filtering. Char Faction: {char_faction}")
         else:
@@ -866,7 +766,7 @@ class CharacterWidget(QWidget):
 
                 # Census can return multiple faction-qualified variants with different directive_ids
                 # but identical visible names (e.g., Exceptional weapon entries). Collapse by name.
-                d_name_key = normalize_filter_name(d_name)
+                d_name_key = normalize_item_name(d_name)
                 if d_name_key and d_name_key in seen_directive_names:
                     if valid_directives < 20:
                         print(f"TRACE: Skipping duplicate directive name '{d_name}' in tier {tier_id}")
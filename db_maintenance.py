@@ -0,0 +1,91 @@
+import threading
+import time
+
+
+class DatabaseMaintenance:
+    """
+    Background upkeep for ps2_master.db.
+
+    Every `touch_interval_s` the IDs the player cache served are written
+    back as last_seen. Every `interval_s` players not seen for
+    `retention_days` are deleted (own characters never are), up to
+    `vacuum_pages` free pages are returned to the OS with an incremental
+    vacuum, and fresh size/row stats go to `on_stats(stats)`.
+    """
+
+    def __init__(self, db, player_cache=None, retention_days=90, interval_s=3600, touch_interval_s=60,
+                 vacuum_pages=2000, on_stats=None, log=print, clock=time.time):
+        self.db = db
+        self.player_cache = player_cache
+        self.retention_days = retention_days
+        self.interval_s = max(1.0, float(interval_s))
+        self.touch_interval_s = max(1.0, float(touch_interval_s))
+        self.vacuum_pages = vacuum_pages
+        self.on_stats = on_stats
+        self.log = log
+        self.clock = clock
+        self.last_run = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # run_once / compact never overlap
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="DB-Maintenance", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush_seen()
+
+    def flush_seen(self):
+        if self.player_cache is None:
+            return 0
+        seen = self.player_cache.drain_seen()
+        if seen:
+            self.db.touch_players(seen, self.clock())
+        return len(seen)
+
+    def run_once(self):
+        """Touch, expire, incremental vacuum. Returns the stats dict."""
+        with self._lock:
+            self.flush_seen()
+            expired = self.db.expire_players(self.retention_days, self.clock())
+            if expired:
+                self.log(f"DB: Expired {expired} players not seen for {self.retention_days} days.")
+            self.db.incremental_vacuum(self.vacuum_pages).result()
+            self.last_run = self.clock()
+            return self.publish_stats()
+
+    def compact(self):
+        """One-shot compaction (expiry + full VACUUM). Returns (stats_before, stats_after)."""
+        with self._lock:
+            before = self.db.db_stats()
+            self.flush_seen()
+            self.db.expire_players(self.retention_days, self.clock())
+            self.db.compact()
+            after = self.publish_stats()
+        self.log(f"DB: Compacted {before['size_bytes'] / 1048576:.1f} MB -> {after['size_bytes'] / 1048576:.1f} MB.")
+        return before, after
+
+    def publish_stats(self):
+        stats = self.db.db_stats()
+        if self.on_stats:
+            self.on_stats(stats)
+        return stats
+
+    def _run(self):
+        next_run = time.monotonic() + min(self.interval_s, 300.0)  # First pass shortly after startup
+        while not self._stop.wait(self.touch_interval_s):
+            try:
+                self.flush_seen()
+                if time.monotonic() >= next_run:
+                    self.run_once()
+                    next_run = time.monotonic() + self.interval_s
+            except Exception as e:
+                self.log(f"DB-ERROR (Maintenance): {e}")
@@ -0,0 +1,130 @@
+"""
+Schema migrations for ps2_master.db, tracked in `PRAGMA user_version`.
+
+Each migration upgrades the schema from version N-1 to N. `migrate()` runs
+every pending one on the caller's connection and is meant to be called
+inside a single transaction (DatabaseHandler does this on the DB writer at
+startup), so a failure leaves the file at its previous version. Never edit
+a released migration; append a new one.
+"""
+
+# Final player_cache layout. character_id is an INTEGER PRIMARY KEY (the
+# rowid itself): Census IDs fit in 63 bits, and an integer key is about half
+# the size of the 19-digit TEXT key, in the table and in every index.
+PLAYER_CACHE_SCHEMA = '''CREATE TABLE IF NOT EXISTS {table}
+                          (character_id INTEGER PRIMARY KEY, name TEXT, name_lower TEXT,
+                           faction_id INTEGER, world_id INTEGER, outfit_tag TEXT,
+                           battle_rank INTEGER, created_date TEXT, last_login TEXT,
+                           kills INTEGER, deaths INTEGER, score INTEGER, playtime INTEGER,
+                           m30_kills INTEGER, m30_deaths INTEGER, m30_score INTEGER, m30_time INTEGER,
+                           last_seen INTEGER)'''
+
+# Columns copied as-is when player_cache is rebuilt (character_id and the
+# integer columns are converted explicitly).
+_PLAYER_TEXT_COLUMNS = ("name", "outfit_tag", "created_date", "last_login")
+_PLAYER_INT_COLUMNS = ("faction_id", "world_id", "battle_rank", "kills", "deaths", "score", "playtime",
+                       "m30_kills", "m30_deaths", "m30_score", "m30_time")
+
+
+def _columns(cursor, table):
+    return {row[1]: (row[2] or "").upper() for row in cursor.execute(f"PRAGMA table_info({table})")}
+
+
+def _v1_base_tables(cursor):
+    """The original (TEXT-keyed) tables, for databases created before versioning."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS player_cache
+                      (character_id TEXT PRIMARY KEY, name TEXT, name_lower TEXT,
+                       faction_id INTEGER, world_id INTEGER, outfit_tag TEXT,
+                       battle_rank INTEGER, created_date TEXT, last_login TEXT,
+                       kills INTEGER, deaths INTEGER, score INTEGER, playtime INTEGER,
+                       m30_kills INTEGER, m30_deaths INTEGER, m30_score INTEGER, m30_time INTEGER)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS my_chars
+                      (character_id TEXT PRIMARY KEY, name TEXT)''')
+
+
+def _v2_typed_player_cache(cursor):
+    """Integer character IDs, integer stat columns, name_lower filled, last_seen added."""
+    columns = _columns(cursor, "player_cache")
+    if columns.get("character_id") == "INTEGER":
+        # Already rebuilt by an unversioned build; only make sure last_seen exists.
+        if "last_seen" not in columns:
+            cursor.execute("ALTER TABLE player_cache ADD COLUMN last_seen INTEGER")
+        return
+
+    has_last_seen = "last_seen" in columns
+    select = ["CAST(character_id AS INTEGER)"]
+    select += list(_PLAYER_TEXT_COLUMNS)
+    select.append("COALESCE(name_lower, lower(name))")
+    select += [f"CAST({col} AS INTEGER)" for col in _PLAYER_INT_COLUMNS]
+    select.append("last_seen" if has_last_seen else "NULL")
+    target = (["character_id"] + list(_PLAYER_TEXT_COLUMNS) + ["name_lower"]
+              + list(_PLAYER_INT_COLUMNS) + ["last_seen"])
+
+    cursor.execute(PLAYER_CACHE_SCHEMA.format(table="player_cache_new"))
+    cursor.execute(f"""INSERT OR IGNORE INTO player_cache_new ({", ".join(target)})
+                       SELECT {", ".join(select)} FROM player_cache
+                       WHERE character_id != '' AND character_id NOT GLOB '*[^0-9]*'""")
+    cursor.execute("DROP TABLE player_cache")
+    cursor.execute("ALTER TABLE player_cache_new RENAME TO player_cache")
+
+
+def _v3_my_chars_by_id(cursor):
+    """my_chars keyed by integer character ID (rows are deleted by ID, not by name)."""
+    if _columns(cursor, "my_chars").get("character_id") == "INTEGER":
+        return
+    cursor.execute('''CREATE TABLE my_chars_new
+                      (character_id INTEGER PRIMARY KEY, name TEXT NOT NULL)''')
+    cursor.execute("""INSERT OR IGNORE INTO my_chars_new (character_id, name)
+                      SELECT CAST(character_id AS INTEGER), name FROM my_chars
+                      WHERE name IS NOT NULL AND character_id != '' AND character_id NOT GLOB '*[^0-9]*'""")
+    cursor.execute("DROP TABLE my_chars")
+    cursor.execute("ALTER TABLE my_chars_new RENAME TO my_chars")
+
+
+def _v4_indexes(cursor):
+    """
+    Indexes for the lookups the app does. Secondary indexes carry the rowid
+    (= character_id), so name_lower -> ID is answered from the index alone.
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_player_cache_name_lower")
+    cursor.execute("DROP INDEX IF EXISTS idx_player_cache_last_seen")
+    cursor.execute("CREATE INDEX idx_player_cache_name_lower ON player_cache(name_lower)")
+    cursor.execute("CREATE INDEX idx_player_cache_last_seen ON player_cache(last_seen)")
+    cursor.execute("CREATE INDEX idx_player_cache_world_faction ON player_cache(world_id, faction_id)")
+    cursor.execute("CREATE INDEX idx_my_chars_name ON my_chars(name)")
+    cursor.execute("ANALYZE")
+
+
+def _v5_session_journal(cursor):
+    """Per-character session stat deltas written by SessionJournal."""
+    cursor.execute('''CREATE TABLE session_journal
+                      (character_id INTEGER NOT NULL, ts INTEGER NOT NULL,
+                       kills INTEGER NOT NULL DEFAULT 0, deaths INTEGER NOT NULL DEFAULT 0,
+                       headshots INTEGER NOT NULL DEFAULT 0, assists INTEGER NOT NULL DEFAULT 0,
+                       revives INTEGER NOT NULL DEFAULT 0, seconds REAL NOT NULL DEFAULT 0)''')
+    cursor.execute("CREATE INDEX idx_session_journal_char_ts ON session_journal(character_id, ts)")
+
+
+MIGRATIONS = (
+    _v1_base_tables,
+    _v2_typed_player_cache,
+    _v3_my_chars_by_id,
+    _v4_indexes,
+    _v5_session_journal,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(cursor):
+    return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(cursor):
+    """Runs the pending migrations. Returns (old_version, new_version)."""
+    current = schema_version(cursor)
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if version > current:
+            migration(cursor)
+    if SCHEMA_VERSION > current:
+        cursor.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return current, max(current, SCHEMA_VERSION)
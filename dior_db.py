@@ -1,69 +1,415 @@
+import concurrent.futures
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 
+from db_migrations import migrate
 from dior_utils import DB_PATH
 
 
+# Per-connection tuning. WAL lets readers run while the writer commits;
+# synchronous=NORMAL is durable across app crashes in WAL mode (only an OS
+# crash can lose the last commits), which is fine for a lookup cache.
+WRITER_PRAGMAS = (
+    # Only takes effect on a new file or after a full VACUUM (see compact()).
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",  # KiB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+READER_PRAGMAS = (
+    "PRAGMA cache_size=-4000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Upsert keeps columns the caller does not know about (world_id, stats, ...)
+# instead of wiping them like INSERT OR REPLACE did.
+PLAYER_UPSERT_SQL = '''INSERT INTO player_cache
+                       (character_id, name, name_lower, faction_id, battle_rank, outfit_tag, last_seen)
+                       VALUES (?, ?, lower(?), ?, ?, ?, strftime('%s', 'now'))
+                       ON CONFLICT(character_id) DO UPDATE SET
+                           name=excluded.name, name_lower=excluded.name_lower,
+                           faction_id=excluded.faction_id, battle_rank=excluded.battle_rank,
+                           outfit_tag=excluded.outfit_tag, last_seen=excluded.last_seen'''
+
+
+def db_character_id(cid):
+    """Census character ID (str) -> integer key, or None if it is not numeric."""
+    try:
+        return int(cid)
+    except (TypeError, ValueError):
+        return None
+
+
+class SQLitePool:
+    """
+    One long-lived writer connection owned by a writer thread, plus a small
+    pool of read-only connections.
+
+    Writes are submitted as callables `fn(conn)` (or via `execute` /
+    `executemany`) and return a concurrent.futures.Future. Jobs that are
+    queued together are committed in a single transaction; jobs submitted
+    with `transaction=False` (VACUUM, checkpoints) run on their own. An
+    `on_commit(result)` callback runs on the writer thread once the job's
+    changes are committed, and not at all if they are rolled back; in-memory
+    mirrors of table state are updated there. Reads
+    borrow a pooled connection with `reader()` / `query()` and may run on
+    any thread.
+    """
+
+    def __init__(self, path, readers=2, setup=None):
+        self.path = path
+        self._jobs = queue.SimpleQueue()
+        self._readers = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(max(1, int(readers)))
+        self._all_readers = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="DB-Writer", daemon=True)
+        self._thread.start()
+        # Schema / WAL switch must be done before the first reader opens.
+        self.submit(setup or (lambda conn: None)).result()
+
+    # --- Writes ------------------------------------------------------------
+    def submit(self, fn, transaction=True, on_commit=None):
+        """Runs `fn(conn)` on the writer thread (inside a transaction by default). Returns a Future."""
+        fut = concurrent.futures.Future()
+        if self._closed:
+            fut.set_exception(RuntimeError("database is closed"))
+            return fut
+        self._jobs.put((fn, fut, transaction, on_commit))
+        return fut
+
+    def execute(self, sql, params=()):
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def executemany(self, sql, rows):
+        rows = list(rows)
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    # --- Reads -------------------------------------------------------------
+    @contextmanager
+    def reader(self):
+        self._reader_slots.acquire()
+        try:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = self._open_reader()
+            try:
+                yield conn
+            finally:
+                self._readers.put(conn)
+        finally:
+            self._reader_slots.release()
+
+    def query(self, sql, params=()):
+        with self.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self.reader() as conn:
+            cursor = conn.execute(sql, params)
+            try:
+                return cursor.fetchone()
+            finally:
+                # An unfinished statement would pin its read snapshot (stale
+                # reads, blocked WAL checkpoints) until the cursor is reused.
+                cursor.close()
+
+    def close(self, timeout=5.0):
+        """Finishes queued writes, then closes every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._jobs.put(None)
+        self._thread.join(timeout)
+        with self._readers_lock:
+            for conn in self._all_readers:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all_readers.clear()
+
+    # --- Internals ---------------------------------------------------------
+    def _open_reader(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        for pragma in READER_PRAGMAS:
+            conn.execute(pragma)
+        with self._readers_lock:
+            self._all_readers.append(conn)
+        return conn
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        for pragma in WRITER_PRAGMAS:
+            conn.execute(pragma)
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                batch = [job]
+                stop = False
+                while True:
+                    try:
+                        job = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stop = True
+                        break
+                    batch.append(job)
+                # Consecutive transactional jobs share one commit.
+                group = []
+                for job in batch:
+                    if job[2]:
+                        group.append(job)
+                        continue
+                    if group:
+                        self._run_batch(conn, group)
+                        group = []
+                    self._run_single(conn, job)
+                if group:
+                    self._run_batch(conn, group)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _run_single(self, conn, job):
+        fn, fut, _transaction, on_commit = job
+        try:
+            result = fn(conn)
+            if on_commit:
+                on_commit(result)
+            fut.set_result(result)
+        except Exception as e:
+            fut.set_exception(e)
+
+    def _run_batch(self, conn, batch):
+        results = []
+        conn.execute("BEGIN")
+        for fn, fut, _transaction, on_commit in batch:
+            conn.execute("SAVEPOINT job")
+            try:
+                results.append((fut, True, fn(conn), on_commit))
+                conn.execute("RELEASE job")
+            except Exception as e:
+                # Undo only this job; the rest of the batch still commits.
+                conn.execute("ROLLBACK TO job")
+                conn.execute("RELEASE job")
+                results.append((fut, False, e, None))
+        try:
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            results = [(fut, False, e, None) for fut, _ok, _val, _cb in results]
+        for fut, ok, value, on_commit in results:
+            if ok and on_commit:
+                try:
+                    on_commit(value)
+                except Exception as e:
+                    ok, value = False, e
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
+
+
 class DatabaseHandler:
     def __init__(self, db_name=None):
         self.db_name = db_name or DB_PATH
-        self.init_db()
+        self._player_count = 0
+        self.schema_version = 0
+        self.pool = SQLitePool(self.db_name, setup=self._init_db)
 
-    def init_db(self):
-        conn = sqlite3.connect(self.db_name)
+    def _init_db(self, conn):
         cursor = conn.cursor()
-        # Cache Table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS player_cache 
-                          (character_id TEXT PRIMARY KEY, name TEXT, name_lower TEXT, 
-                           faction_id INTEGER, world_id INTEGER, outfit_tag TEXT, 
-                           battle_rank INTEGER, created_date TEXT, last_login TEXT, 
-                           kills INTEGER, deaths INTEGER, score INTEGER, playtime INTEGER,
-                           m30_kills INTEGER, m30_deaths INTEGER, m30_score INTEGER, m30_time INTEGER)''')
-        # My Characters Table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS my_chars 
-                          (character_id TEXT PRIMARY KEY, name TEXT)''')
-        conn.commit()
-        conn.close()
+        # All pending schema migrations run in this one startup transaction.
+        old_version, self.schema_version = migrate(cursor)
+        if old_version != self.schema_version:
+            print(f"DB: Schema migrated v{old_version} -> v{self.schema_version}")
+        # Counted once here; afterwards adjusted after each commit (see _count_players).
+        self._player_count = cursor.execute("SELECT COUNT(*) FROM player_cache").fetchone()[0]
+
+    def close(self):
+        self.pool.close()
+
+    def player_count(self):
+        """Rows in player_cache, without a COUNT(*) query."""
+        return self._player_count
+
+    def _count_players(self, delta):
+        # on_commit callback: rolled-back upserts / deletes never reach the counter.
+        self._player_count += delta
 
     def load_my_chars(self):
         """Loads own characters for the dropdown."""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, character_id FROM my_chars")
-        data = {row[0]: row[1] for row in cursor.fetchall()}
-        conn.close()
-        return data
+        rows = self.pool.query("SELECT name, character_id FROM my_chars")
+        return {row[0]: str(row[1]) for row in rows}
 
-    def load_player_cache(self):
-        """Loads the name cache for the killfeed."""
-        try:
-            conn = sqlite3.connect(self.db_name)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT character_id, name, outfit_tag FROM player_cache")
-            rows = cursor.fetchall()
-            conn.close()
+    def lookup_player(self, cid):
+        """(name, outfit_tag) for one character ID, or None. Primary-key lookup."""
+        key = db_character_id(cid)
+        if key is None:
+            return None
+        return self.pool.query_one("SELECT name, outfit_tag FROM player_cache WHERE character_id=?", (key,))
 
-            # Returns two dictionaries: Names and Outfits
-            names = {row['character_id']: row['name'] for row in rows}
-            outfits = {row['character_id']: row['outfit_tag'] for row in rows}
-            return names, outfits
+    def load_recent_players(self, limit):
+        """[(character_id, name, outfit_tag)] for the most recently seen players, newest first."""
+        try:
+            rows = self.pool.query('''SELECT character_id, name, outfit_tag FROM player_cache
+                                      WHERE name IS NOT NULL ORDER BY last_seen DESC LIMIT ?''', (int(limit),))
+            return [(str(row[0]), row[1], row[2]) for row in rows]
         except Exception as e:
             print(f"DB Error: {e}")
-            return {}, {}
+            return []
+
+    def find_player_id(self, name):
+        """Character ID for an exact (case-insensitive) name, via the name_lower index."""
+        row = self.pool.query_one("SELECT character_id FROM player_cache WHERE name_lower=? LIMIT 1",
+                                  (str(name).lower(),))
+        return str(row[0]) if row else None
+
+    def get_player_world(self, cid):
+        key = db_character_id(cid)
+        if key is None:
+            return None
+        row = self.pool.query_one("SELECT world_id FROM player_cache WHERE character_id=?", (key,))
+        return row[0] if row else None
+
+    def upsert_players(self, rows):
+        """
+        Queues a batch of (character_id, name, faction_id, battle_rank,
+        outfit_tag) rows for the writer. Returns a Future with the number of
+        newly added players.
+        """
+        rows = list(rows)
+        return self.pool.submit(lambda conn: self._upsert_players(conn, rows), on_commit=self._count_players)
+
+    def _upsert_players(self, conn, rows):
+        rows = [(db_character_id(row[0]),) + tuple(row[1:]) for row in rows]
+        rows = [row for row in rows if row[0] is not None]
+        if not rows:
+            return 0
+        ids = list({row[0] for row in rows})
+        existing = 0
+        # Primary-key lookups, chunked below SQLite's host parameter limit.
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            existing += conn.execute(
+                f"SELECT COUNT(*) FROM player_cache WHERE character_id IN ({marks})", chunk).fetchone()[0]
+        conn.executemany(PLAYER_UPSERT_SQL,
+                         [(cid, name, name, fid, rank, tag) for cid, name, fid, rank, tag in rows])
+        return len(ids) - existing
+
+    # --- Retention / maintenance -------------------------------------------
+    def touch_players(self, cids, ts):
+        """Queues a last_seen update for players seen in events. Returns a Future."""
+        rows = [(int(ts), key) for key in map(db_character_id, cids) if key is not None]
+        return self.pool.executemany("UPDATE player_cache SET last_seen=? WHERE character_id=?", rows)
+
+    def expire_players(self, max_age_days, now, chunk=5000):
+        """
+        Deletes players not seen for `max_age_days` (never own characters),
+        `chunk` rows per transaction so readers and other writes interleave.
+        Rows without last_seen (from before it existed) get `now` as a grace
+        start instead of being deleted outright. Returns the number deleted.
+        """
+        if max_age_days <= 0:
+            return 0
+        cutoff = int(now - max_age_days * 86400)
+        self.pool.execute("UPDATE player_cache SET last_seen=? WHERE last_seen IS NULL", (int(now),)).result()
+        total = 0
+        while True:
+            deleted = self.pool.submit(lambda conn: self._expire_chunk(conn, cutoff, chunk),
+                                       on_commit=lambda n: self._count_players(-n)).result()
+            total += deleted
+            if deleted < chunk:
+                return total
+
+    def _expire_chunk(self, conn, cutoff, chunk):
+        deleted = conn.execute('''DELETE FROM player_cache WHERE character_id IN (
+                                    SELECT character_id FROM player_cache
+                                    WHERE last_seen < ?
+                                      AND character_id NOT IN (SELECT character_id FROM my_chars)
+                                    LIMIT ?)''', (cutoff, chunk)).rowcount
+        return deleted
+
+    def incremental_vacuum(self, pages=2000):
+        """Returns up to `pages` free pages to the OS (needs auto_vacuum=INCREMENTAL). Returns a Future."""
+        def run(conn):
+            # executescript steps the pragma to completion; a plain execute()
+            # stops after its first step and frees a single page.
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        return self.pool.submit(run, transaction=False)
+
+    def compact(self):
+        """
+        One-shot full compaction: switches the file to incremental
+        auto-vacuum, rebuilds it with VACUUM and truncates the WAL. Blocks
+        until done; writes queued meanwhile wait for it.
+        """
+        def run(conn):
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA optimize")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        self.pool.submit(run, transaction=False).result()
+
+    def db_stats(self):
+        """Size and row counts for the settings page."""
+        size = 0
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                size += os.path.getsize(self.db_name + suffix)
+            except OSError:
+                pass
+        page_size = self.pool.query_one("PRAGMA page_size")[0]
+        freelist = self.pool.query_one("PRAGMA freelist_count")[0]
+        return {
+            "size_bytes": size,
+            "free_bytes": page_size * freelist,
+            "players": self._player_count,
+            "my_chars": self.pool.query_one("SELECT COUNT(*) FROM my_chars")[0],
+            "auto_vacuum": self.pool.query_one("PRAGMA auto_vacuum")[0] == 2,
+        }
+
+    # --- Session journal -----------------------------------------------------
+    def append_journal(self, rows):
+        """
+        Queues session stat deltas (character_id, ts, kills, deaths,
+        headshots, assists, revives, seconds) for the writer. Returns a Future.
+        """
+        rows = [(db_character_id(row[0]),) + tuple(row[1:]) for row in rows]
+        return self.pool.executemany(
+            '''INSERT INTO session_journal (character_id, ts, kills, deaths, headshots, assists, revives, seconds)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', [row for row in rows if row[0] is not None])
+
+    def journal_totals(self, cid, since):
+        """Summed journal deltas for one character since `since` (unix seconds)."""
+        row = self.pool.query_one(
+            '''SELECT COALESCE(SUM(kills), 0), COALESCE(SUM(deaths), 0), COALESCE(SUM(headshots), 0),
+                      COALESCE(SUM(assists), 0), COALESCE(SUM(revives), 0), COALESCE(SUM(seconds), 0)
+               FROM session_journal WHERE character_id=? AND ts>=?''', (db_character_id(cid), int(since)))
+        return dict(zip(("k", "d", "hs", "a", "revives", "seconds"), row))
 
     def save_char_to_db(self, cid, name, world_id, faction_id=0, rank=0, tag=""):
-        """Saves a character (Thread-safe, as it uses a new connection)."""
-        conn = sqlite3.connect(self.db_name)
-        conn.execute(
-            "INSERT OR REPLACE INTO player_cache (character_id, name, faction_id, battle_rank, outfit_tag, world_id) VALUES (?, ?, ?, ?, ?, ?)",
-            (cid, name, faction_id, rank, tag, world_id))
-        # Also save to "My Chars" (for tracking)
-        conn.execute("INSERT OR REPLACE INTO my_chars (name, character_id) VALUES (?, ?)", (name, cid))
-        conn.commit()
-        conn.close()
-
-    def remove_my_char(self, name):
-        conn = sqlite3.connect(self.db_name)
-        conn.execute("DELETE FROM my_chars WHERE name=?", (name,))
-        conn.commit()
-        conn.close()
+        """Saves a character (queued on the writer thread; waits for the commit)."""
+        def write(conn):
+            added = self._upsert_players(conn, [(cid, name, faction_id, rank, tag)])
+            conn.execute("UPDATE player_cache SET world_id=? WHERE character_id=?", (world_id, db_character_id(cid)))
+            # Also save to "My Chars" (for tracking)
+            conn.execute("INSERT OR REPLACE INTO my_chars (name, character_id) VALUES (?, ?)", (name, db_character_id(cid)))
+            return added
+        self.pool.submit(write, on_commit=self._count_players).result()
+
+    def remove_my_char(self, cid):
+        self.pool.execute("DELETE FROM my_chars WHERE character_id=?", (db_character_id(cid),)).result()
@@ -0,0 +1,191 @@
+import threading
+
+from item_catalog import get_item_catalog, normalize_item_name
+
+
+# Name fragments that identify a weapon's faction, checked in this order;
+# the first group with any fragment in the (upper-cased) name wins.
+# "VS" = 1, "NC" = 2, "TR" = 3, "NSO" = 4.
+FACTION_TERM_GROUPS = (
+    # Special variants (Survivor/Networked/Unique Empire Picks)
+    ("1", ("NS-W", "NSX-W", "XOXO")),
+    ("2", ("NS-G", "NSX-G", "NS-C")),
+    ("3", ("NS-M", "NSX-M", "NS-B")),
+    # Exact faction tags
+    ("1", ("(VS)",)),
+    ("2", ("(NC)",)),
+    ("3", ("(TR)",)),
+    ("4", (
+        "AR-", "SR-", "CB-", "XMG-", "PMG-", "BAR-", "SG-", "XGG-", "NP-"
+    )),
+    ("1", (
+        "PULSAR", "ORION", "SOLSTICE", "BEAMER", "LASHER", "SCYTHE", "MAGRIDER", "SIRIUS", "ZENITH", "PHASESHIFT",
+        "VX", "VA", "VE", "SPYKER", "CERBERUS", "HV-45", "H-V45", "TERMINUS", "CORVUS", "ERIDANI", "SKORPIOS", "CANIS", "HORIZON", "LACERTA",
+        "PPA", "SARON", "PROTON", "APHELION", "STARFALL", "EQUINOX", "SVA-88", "FLARE", "URSA", "COBALT", "OBELISK",
+        "GHOST", "PARALLAX", "XM98", "PHANTOM", "SPECTRE", "NYX", "NEMESIS", "HADES", "POLARIS", "QUASAR", "COSMOS", "NEBULA", "BLUESHIFT", "MANTIS",
+        "SERPENT", "PROMINENCE", "NOVA", "THANATOS", "DEIMOS", "SPIKER", "MANTICORE", "V10", "LANCER", "VS-", " VS ", "EIDOLON", "ECLIPSE", "SUPERNOVA"
+    )),
+    ("2", (
+        "GAUSS", "MERCENARY", "MAG-SHOT", "VANGUARD", "REAVER", "NC6", "GD-", "AF-", "LA-", "AC-", " AC ", "EM1", "EM6", "ANCHOR", "JACKHAMMER",
+        "REBEL", "DESPERADO", "GR-22", "CARNAGE", "REAPER", "BANDIT", "CYCLONE", "TEMPEST", "GLADIUS", "PROMISE", "BISHOP",
+        "ENFORCER", "CANISTER", "MJOLNIR", "PHOENIX", "SPARROW", "RAVEN", "CYLINDER", "RAILJACK", "SAW", "BLUEPRINT", "COVENANT",
+        "WARDEN", "VANDAL", "LONGSHOT", "BOLT DRIVER", "SAS-R", "GLADIATOR", "MERC", "MAULER", "TRAWLER", "TITAN", "FALCON",
+        "A-TROSS", "SHRIKE", "SWEEPER", "BRUISER", "MAG-SCATTER", "IMPETUS", "LA80", "NC-", " NC ", "TESSERACT"
+    )),
+    ("3", (
+        "CYCLER", "CARV", "REPEATER", "PROWLER", "MOSQUITO", "T1", "T9", "TX", "SABR", "TRAC", "JAGUAR", "LYNX", "TMG",
+        "INQUISITOR", "EMPEROR", "T1B", "TAR", "TORQ-9", "ARMISTICE", "SHURIKEN", "JACKAL", "DRAGOON",
+        "VULCAN", "MARAUDER", "GATEKEEPER", "STRIKER", "POUNDERS", "FRACTURES", "MSW-R", "BULL", "RHINO", "ARBALEST", "MINIGUN",
+        "99SV", "M77-B", "RAMS .50M", "TSAR-42", "TRAP-M1", "CLAYMORE", "ONAGER",
+        "NIGHTHAWK", "HAYMAKER", "BARRAGE", "BLACKJACK", "SKEP", "HAILSTORM", "TR-", " TR ", "LC", "HC"
+    )),
+)
+
+# CSV names shorter than this are only matched exactly (too many false substring hits).
+MIN_SUBSTRING_LEN = 4
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher. Each pattern carries a rank; `best(text)`
+    returns the lowest rank among the patterns found in `text` (None if none)
+    in one pass over `text`, however many patterns there are.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._rank = [None]
+        for pattern, rank in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._rank.append(None)
+                node = nxt
+            if self._rank[node] is None or rank < self._rank[node]:
+                self._rank[node] = rank
+        self._fail = [0] * len(self._goto)
+        self._link_failures()
+
+    def _link_failures(self):
+        # Breadth-first, so a node's failure target is final before its children need it.
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Fold the suffix's rank in, so `best()` never walks failure chains for output.
+                inherited = self._rank[self._fail[child]]
+                if inherited is not None and (self._rank[child] is None or inherited < self._rank[child]):
+                    self._rank[child] = inherited
+                queue.append(child)
+
+    def best(self, text):
+        goto, fail, ranks = self._goto, self._fail, self._rank
+        node = 0
+        best = None
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            rank = ranks[node]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+        return best
+
+
+class FactionClassifier:
+    """
+    Faction lookups for directive / item names, built once and memoized.
+
+    `infer(name)` applies FACTION_TERM_GROUPS in their priority order.
+    `factions(name)` maps a name to the sanction-list faction IDs: an exact
+    normalized-name hit, otherwise the first CSV name (in file order) that
+    contains the name or is contained in it. Both run over precomputed
+    automata / indexes instead of scanning every term and CSV name per call.
+    """
+
+    def __init__(self, faction_names=None):
+        self._group_factions = [faction for faction, _terms in FACTION_TERM_GROUPS]
+        self._terms = AhoCorasick(
+            (term, rank) for rank, (_faction, terms) in enumerate(FACTION_TERM_GROUPS) for term in terms)
+
+        self._exact = {}
+        self._names = []  # (normalized CSV name, factions) in file order
+        for norm, factions in (faction_names or {}).items():
+            frozen = frozenset(factions)
+            self._exact[norm] = frozen
+            if len(norm) >= MIN_SUBSTRING_LEN:
+                self._names.append((norm, frozen))
+        # "CSV name inside the query": one automaton over every CSV name.
+        self._contained = AhoCorasick((norm, i) for i, (norm, _f) in enumerate(self._names))
+        # "Query inside a CSV name": candidates share the query's first n-gram.
+        self._grams = {}
+        for i, (norm, _f) in enumerate(self._names):
+            for start in range(len(norm) - MIN_SUBSTRING_LEN + 1):
+                postings = self._grams.setdefault(norm[start:start + MIN_SUBSTRING_LEN], [])
+                if not postings or postings[-1] != i:
+                    postings.append(i)
+
+        self._infer_memo = {}
+        self._factions_memo = {}
+
+    def infer(self, name):
+        """Faction ID ("1"-"4") named by the item name's fragments, or None."""
+        try:
+            return self._infer_memo[name]
+        except KeyError:
+            pass
+        rank = self._terms.best(str(name).upper())
+        result = None if rank is None else self._group_factions[rank]
+        self._infer_memo[name] = result
+        return result
+
+    def factions(self, name):
+        """Sanction-list faction IDs for `name` (empty if it matches no CSV name)."""
+        try:
+            return self._factions_memo[name]
+        except KeyError:
+            pass
+        result = self._lookup(normalize_item_name(name))
+        self._factions_memo[name] = result
+        return result
+
+    def _lookup(self, norm):
+        if not norm:
+            return frozenset()
+        exact = self._exact.get(norm)
+        if exact:
+            return exact
+
+        first = self._contained.best(norm)
+        if len(norm) >= MIN_SUBSTRING_LEN:
+            candidates = self._grams.get(norm[:MIN_SUBSTRING_LEN], ())
+        else:
+            candidates = range(len(self._names))
+        for i in candidates:
+            if first is not None and i >= first:
+                break
+            if norm in self._names[i][0]:
+                first = i
+                break
+        return frozenset() if first is None else self._names[first][1]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_faction_classifier():
+    """Process-wide classifier over the shared item catalog (built on first use)."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = FactionClassifier(get_item_catalog().faction_names())
+        return _classifier
@@ -0,0 +1,198 @@
+import csv
+import os
+import pickle
+import threading
+
+from dior_utils import BASE_DIR, get_asset_path
+
+
+# Bump when the index layout changes so stale cache files are rebuilt.
+INDEX_VERSION = 1
+CACHE_FILENAME = "item_catalog.cache"
+
+
+def normalize_item_name(name):
+    """Upper-case alphanumerics separated by single spaces, for loose name matches."""
+    if not name:
+        return ""
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in str(name).upper())
+    return " ".join(cleaned.split())
+
+
+def _field(fields, wanted, default):
+    # Header matching that ignores case and spaces ("Faction ID" == "factionid").
+    return next((f for f in fields if f.lower().replace(" ", "") == wanted), default)
+
+
+def parse_sanction_list(path):
+    """
+    Parses sanction-list.csv with the csv module (item names contain quoted
+    commas and quotes). Returns {item_id: record}.
+    """
+    items = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = [fn.strip() for fn in (reader.fieldnames or [])]
+        reader.fieldnames = fields
+        id_key = _field(fields, "itemid", "Item ID")
+        cat_key = _field(fields, "itemcategory", "Item Category")
+        veh_key = _field(fields, "isvehicleweapon", "Is Vehicle Weapon")
+        name_key = _field(fields, "itemname", "Item Name")
+        fac_key = _field(fields, "factionid", "Faction ID")
+        sanction_key = _field(fields, "sanction", "Sanction")
+        for row in reader:
+            item_id = (row.get(id_key) or "").strip()
+            if not item_id:
+                continue
+            items[item_id] = {
+                "name": (row.get(name_key) or "").strip(),
+                # "type" is the item category; the HSR / killfeed code reads it under this key.
+                "type": (row.get(cat_key) or "").strip(),
+                "faction_id": (row.get(fac_key) or "").strip(),
+                "vehicle": (row.get(veh_key) or "").strip() == "1",
+                "sanction": (row.get(sanction_key) or "").strip(),
+            }
+    return items
+
+
+def build_index(items):
+    """The lookup tables derived from the parsed items."""
+    by_name = {}
+    by_category = {}
+    for item_id, record in items.items():
+        norm = normalize_item_name(record["name"])
+        if norm and record["faction_id"]:
+            by_name.setdefault(norm, set()).add(record["faction_id"])
+        by_category.setdefault(record["type"], []).append(item_id)
+    return {"items": items, "factions_by_name": by_name, "by_category": by_category}
+
+
+class ItemCatalog:
+    """
+    Weapon / item data from sanction-list.csv, shared by the killfeed, the
+    weapon stats view and the directive faction filter.
+
+    The CSV is parsed once and the derived index pickled next to the
+    player DB, keyed by the CSV's mtime and size; later starts load the
+    pickle instead of re-parsing. `load_async()` does the work on a
+    background thread. Lookups made before it finishes wait for it, so
+    callers never see a half-built index; a missing or unreadable CSV
+    leaves the catalog empty. `get()` keeps the `item_db.get(id, default)`
+    interface the existing call sites use.
+    """
+
+    def __init__(self, csv_path, cache_path=None, log=print):
+        self.csv_path = csv_path
+        self.cache_path = cache_path
+        self.log = log
+        self._index = build_index({})
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+        self._thread = None
+        self.source = None  # "cache", "csv" or None (not found / failed)
+
+    def load_async(self):
+        with self._load_lock:
+            if self._thread is None and not self._loaded.is_set():
+                self._thread = threading.Thread(target=self.load, name="Item-Catalog", daemon=True)
+                self._thread.start()
+        return self
+
+    def load(self):
+        """Loads the index (from the cache when it is current). Idempotent."""
+        with self._load_lock:
+            if self._loaded.is_set():
+                return self
+            try:
+                self._index, self.source = self._read_index()
+                self.log(f"Item catalog loaded from {self.source}: {len(self)} items.")
+            except FileNotFoundError:
+                self.log(f"Item catalog: {self.csv_path} not found.")
+            except Exception as e:
+                self.log(f"Error loading item catalog: {e}")
+            finally:
+                self._loaded.set()
+        return self
+
+    def wait(self, timeout=None):
+        """Blocks until the index is loaded (starting the load if nobody has)."""
+        if not self._loaded.is_set():
+            if self._thread is None:
+                self.load()
+            self._loaded.wait(timeout)
+        return self._loaded.is_set()
+
+    # --- Lookups -----------------------------------------------------------
+    def __len__(self):
+        return len(self._index["items"])
+
+    def __contains__(self, item_id):
+        self.wait()
+        return str(item_id) in self._index["items"]
+
+    def get(self, item_id, default=None):
+        """Record dict for `item_id` (name, type, faction_id, vehicle, sanction)."""
+        self.wait()
+        return self._index["items"].get(str(item_id), default)
+
+    def factions_for_name(self, name):
+        """Faction IDs of the items whose normalized name equals `name`'s."""
+        self.wait()
+        return set(self._index["factions_by_name"].get(normalize_item_name(name), ()))
+
+    def faction_names(self):
+        """{normalized item name: faction IDs} for every item with a faction."""
+        self.wait()
+        return self._index["factions_by_name"]
+
+    def items_in_category(self, category):
+        self.wait()
+        return list(self._index["by_category"].get(category, ()))
+
+    def categories(self):
+        self.wait()
+        return sorted(c for c in self._index["by_category"] if c)
+
+    # --- Cache -------------------------------------------------------------
+    def _cache_key(self):
+        st = os.stat(self.csv_path)
+        return (INDEX_VERSION, st.st_mtime_ns, st.st_size)
+
+    def _read_index(self):
+        key = self._cache_key()
+        if self.cache_path:
+            try:
+                with open(self.cache_path, "rb") as f:
+                    cached = pickle.load(f)
+                if cached.get("key") == key:
+                    return cached["index"], "cache"
+            except (OSError, EOFError, pickle.UnpicklingError, AttributeError, TypeError):
+                pass  # Missing or corrupt cache: rebuild below.
+
+        index = build_index(parse_sanction_list(self.csv_path))
+        if self.cache_path:
+            self._write_cache(key, index)
+        return index, "csv"
+
+    def _write_cache(self, key, index):
+        tmp = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump({"key": key, "index": index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            self.log(f"Item catalog: could not write cache: {e}")
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_item_catalog():
+    """Process-wide catalog for the bundled sanction-list.csv (loading starts on first call)."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ItemCatalog(get_asset_path("sanction-list.csv"),
+                                   cache_path=os.path.join(BASE_DIR, CACHE_FILENAME))
+        return _catalog.load_async()
@@ -0,0 +1,257 @@
+import concurrent.futures
+import threading
+import time
+from collections import deque
+
+
+CHARACTER_SHOW = "character_id,name.first,faction_id,battle_rank"
+
+
+class NameResolver:
+    """
+    Batches character ID -> name/outfit lookups against Census.
+
+    `request(cid)` is cheap and safe to call on every event: IDs that are
+    already known, already pending, or recently reported missing by Census
+    are skipped. A dispatcher thread flushes the pending IDs as one
+    `character` query once `batch_size` IDs are waiting or the oldest one
+    has waited `max_wait` seconds, with up to `max_concurrent` batches in
+    flight on the shared REST client's worker pool.
+
+    `when_resolved(cid, callback, timeout)` calls `callback(name)` once the
+    name is known, or `callback(None)` after `timeout`, so the killfeed can
+    hold an entry briefly instead of printing "Unknown".
+
+    Results land in `name_cache` / `outfit_cache` (the dicts the rest of the
+    app reads) and are handed to `on_results(rows)` for persistence, with
+    rows as (character_id, name, faction_id, battle_rank, outfit_tag).
+    """
+
+    def __init__(self, rest, name_cache, outfit_cache, on_results=None, on_error=None,
+                 batch_size=100, max_wait=0.25, max_concurrent=3, negative_ttl=600.0):
+        self.rest = rest
+        self.name_cache = name_cache
+        self.outfit_cache = outfit_cache
+        self.on_results = on_results
+        self.on_error = on_error
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self.negative_ttl = float(negative_ttl)
+        self._slots = threading.BoundedSemaphore(max(1, int(max_concurrent)))
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._pending = set()
+        self._first_pending_at = None
+        self._missing = {}  # cid -> expires (monotonic)
+        self._waiters = {}  # cid -> [(deadline, callback), ...]
+        self._thread = None
+        self._running = False
+        self.stats = {"requested": 0, "batches": 0, "resolved": 0, "missing": 0, "errors": 0, "timeouts": 0}
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="Name-Resolver", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # --- Entry points ------------------------------------------------------
+    def request(self, cid):
+        """Queues `cid` for lookup unless it is known, pending or known-missing."""
+        if not cid or cid == "0" or cid in self.name_cache:
+            return False
+        with self._cond:
+            return self._enqueue(cid, time.monotonic())
+
+    def when_resolved(self, cid, callback, timeout=0.5):
+        """
+        Calls `callback(name)` right away if the name is cached, otherwise
+        from the resolver thread once the batch returns, or with None after
+        `timeout` seconds (or when Census does not know the ID).
+        """
+        name = self.name_cache.get(cid)
+        if name is not None:
+            callback(name)
+            return
+        now = time.monotonic()
+        with self._cond:
+            # Re-check under the lock: a batch may have landed meanwhile.
+            name = self.name_cache.get(cid)
+            ready = name is not None or self._is_missing(cid, now)
+            if not ready:
+                self._waiters.setdefault(cid, []).append((now + max(0.0, timeout), callback))
+                self._enqueue(cid, now)
+                self._cond.notify()
+        if ready:
+            callback(name)
+
+    def resolve(self, cid, timeout=0.5):
+        """Future for the name of `cid` (None if unknown or not back within `timeout`)."""
+        fut = concurrent.futures.Future()
+        self.when_resolved(cid, fut.set_result, timeout)
+        return fut
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    # --- Internals ---------------------------------------------------------
+    def _is_missing(self, cid, now):
+        expires = self._missing.get(cid)
+        if expires is None:
+            return False
+        if expires <= now:
+            del self._missing[cid]
+            return False
+        return True
+
+    def _enqueue(self, cid, now):
+        # Caller holds self._cond.
+        if cid in self._pending or self._is_missing(cid, now):
+            return False
+        self._pending.add(cid)
+        self._queue.append(cid)
+        self.stats["requested"] += 1
+        if self._first_pending_at is None:
+            self._first_pending_at = now
+        if len(self._queue) >= self.batch_size or len(self._queue) == 1:
+            self._cond.notify()
+        return True
+
+    def _next_wakeup(self, now):
+        # Caller holds self._cond.
+        wake = None
+        if self._queue:
+            wake = self._first_pending_at + self.max_wait
+        for entries in self._waiters.values():
+            for deadline, _cb in entries:
+                if wake is None or deadline < wake:
+                    wake = deadline
+        return None if wake is None else max(0.0, wake - now)
+
+    def _take_batch(self, now):
+        # Caller holds self._cond.
+        if not self._queue:
+            return None
+        if len(self._queue) < self.batch_size and now - self._first_pending_at < self.max_wait:
+            return None
+        n = min(self.batch_size, len(self._queue))
+        batch = [self._queue.popleft() for _ in range(n)]
+        self._first_pending_at = now if self._queue else None
+        return batch
+
+    def _expire_waiters(self, now):
+        # Caller holds self._cond. Returns callbacks to run outside the lock.
+        fired = []
+        for cid in list(self._waiters):
+            entries = self._waiters[cid]
+            keep = [(d, cb) for d, cb in entries if d > now]
+            if len(keep) != len(entries):
+                fired.extend(cb for d, cb in entries if d <= now)
+                if keep:
+                    self._waiters[cid] = keep
+                else:
+                    del self._waiters[cid]
+        self.stats["timeouts"] += len(fired)
+        return fired
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    now = time.monotonic()
+                    expired = self._expire_waiters(now)
+                    batch = self._take_batch(now)
+                    if batch or expired:
+                        break
+                    self._cond.wait(self._next_wakeup(now))
+            for cb in expired:
+                self._call(cb, None)
+            if batch:
+                # Blocks while max_concurrent batches are already in flight.
+                self._slots.acquire()
+                self.stats["batches"] += 1
+                fut = self.rest.get_async("character", {
+                    "character_id": ",".join(batch),
+                    "c:show": CHARACTER_SHOW,
+                    "c:resolve": "outfit",
+                }, ttl=0)
+                fut.add_done_callback(lambda f, b=batch: self._batch_done(b, f))
+
+    def _batch_done(self, batch, fut):
+        try:
+            try:
+                data = fut.result()
+            except Exception as e:
+                self._batch_failed(batch, e)
+                return
+
+            rows = []
+            for char in data.get("character_list") or ():
+                cid = char.get("character_id")
+                name = (char.get("name") or {}).get("first")
+                if not cid or not name:
+                    continue
+                tag = (char.get("outfit") or {}).get("alias", "")
+                rows.append((cid, name, char.get("faction_id", 0),
+                             (char.get("battle_rank") or {}).get("value", 0), tag))
+                # Cache before waking waiters so their callbacks can read it too.
+                self.name_cache[cid] = name
+                self.outfit_cache[cid] = tag
+
+            found = {row[0] for row in rows}
+            now = time.monotonic()
+            ready = []
+            with self._cond:
+                for cid in batch:
+                    self._pending.discard(cid)
+                    if cid not in found:
+                        self._missing[cid] = now + self.negative_ttl
+                    for _d, cb in self._waiters.pop(cid, ()):
+                        ready.append((cb, self.name_cache.get(cid)))
+                self.stats["resolved"] += len(found)
+                self.stats["missing"] += len(batch) - len(found)
+
+            if rows and self.on_results:
+                try:
+                    self.on_results(rows)
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(e)
+            for cb, name in ready:
+                self._call(cb, name)
+        finally:
+            self._slots.release()
+            with self._cond:
+                self._cond.notify()
+
+    def _batch_failed(self, batch, error):
+        # Transient failure: forget the IDs (no negative caching) so the next
+        # event for them queues a fresh lookup; waiters get None now.
+        ready = []
+        with self._cond:
+            for cid in batch:
+                self._pending.discard(cid)
+                ready.extend(cb for _d, cb in self._waiters.pop(cid, ()))
+            self.stats["errors"] += 1
+        if self.on_error:
+            self.on_error(error)
+        for cb in ready:
+            self._call(cb, None)
+
+    def _call(self, callback, name):
+        try:
+            callback(name)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(e)
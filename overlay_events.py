@@ -103,6 +103,10 @@ def normalize_overlay_event(event_type, payload, seq=0):
             elif evt_type in {"feed"}:
                 html = str(safe_payload.get("html") or "")
                 dedupe_key = f"feed:{hash(html)}"
+        if not coalesce_key and category == "cosmetic":
+            # High-frequency feedback: identical hits within one flush merge into one message.
+            ev_name = str(safe_payload.get("event_type") or evt_type).strip().lower()
+            coalesce_key = f"{evt_type}:{ev_name}:{safe_payload.get('filename') or ''}"
 
     event_id = str(safe_payload.get("id") or f"{now_ms}-{seq}-{uuid4().hex[:8]}")
 
@@ -0,0 +1,69 @@
+import heapq
+import itertools
+from collections import deque
+
+
+TRANSIENT_LANES = ("critical", "normal", "cosmetic")
+
+
+class TransientQueue:
+    """
+    Pending transient overlay messages, one FIFO per lane.
+
+    Items are `(wire_event, lane, dedupe_key)` tuples, as OverlayServer
+    queues them. Each lane is a deque (a ring buffer, so appends and
+    oldest-first removals are O(1)) and per-lane counts are its length, so
+    the cosmetic cap check and overflow eviction never scan the queue.
+    Every item gets an arrival sequence number; iteration and `drain()`
+    merge the lanes by it, so consumers see the original FIFO order.
+    Lanes outside TRANSIENT_LANES are queued as "normal". Not thread-safe:
+    OverlayServer only touches it on the WS loop thread or under its lock.
+    """
+
+    __slots__ = ("_lanes", "_seq", "_size")
+
+    def __init__(self, items=()):
+        self._lanes = {lane: deque() for lane in TRANSIENT_LANES}
+        self._seq = itertools.count()
+        self._size = 0
+        for item in items:
+            self.append(item)
+
+    def _lane(self, lane):
+        return self._lanes.get(str(lane), self._lanes["normal"])
+
+    def append(self, item):
+        lane = item[1] if len(item) >= 2 else "normal"
+        self._lane(lane).append((next(self._seq), item))
+        self._size += 1
+
+    def count(self, lane):
+        return len(self._lane(lane))
+
+    def pop_oldest(self, lane):
+        """Removes and returns the oldest item of `lane` (None if that lane is empty)."""
+        queue = self._lane(lane)
+        if not queue:
+            return None
+        self._size -= 1
+        return queue.popleft()[1]
+
+    def drain(self):
+        """All items in arrival order; leaves the queue empty."""
+        items = list(self)
+        self.clear()
+        return items
+
+    def clear(self):
+        for queue in self._lanes.values():
+            queue.clear()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        queues = [queue for queue in self._lanes.values() if queue]
+        if len(queues) == 1:
+            return (item for _seq, item in queues[0])
+        return (item for _seq, item in heapq.merge(*queues, key=lambda entry: entry[0]))
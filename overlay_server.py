@@ -10,6 +10,11 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import websockets
 from overlay_events import normalize_overlay_event
+from overlay_lanes import TransientQueue
+import overlay_wire
+from overlay_wire import (
+    COMPACT_PROTOCOL, WireEvent, batch_envelope, compact_batch, compact_hello, trace_row,
+)
 try:
     from dior_utils import get_user_data_dir
     LOG_DIR = get_user_data_dir()
@@ -100,12 +105,16 @@ class AssetHTTPHandler(BaseHTTPRequestHandler):
             perf_debug = bool(getattr(self.server, 'perf_debug', False))
             event_pipeline_v2 = bool(getattr(self.server, 'event_pipeline_v2', True))
             js_scheduler_v2 = bool(getattr(self.server, 'js_scheduler_v2', True))
+            ws_compact_wire = bool(getattr(self.server, 'ws_compact_wire', True))
+            ws_msgpack = bool(getattr(self.server, 'ws_msgpack', False)) and overlay_wire.msgpack is not None
             payload = (
                 "window.OVERLAY_CONFIG = { "
                 f"wsPort: {int(ws_port)}, "
                 f"perfDebug: {'true' if perf_debug else 'false'}, "
                 f"eventPipelineV2: {'true' if event_pipeline_v2 else 'false'}, "
-                f"jsSchedulerV2: {'true' if js_scheduler_v2 else 'false'} "
+                f"jsSchedulerV2: {'true' if js_scheduler_v2 else 'false'}, "
+                f"compactWire: {'true' if ws_compact_wire else 'false'}, "
+                f"wireMsgpack: {'true' if ws_msgpack else 'false'} "
                 "};\n"
             )
             data = payload.encode('utf-8')
@@ -271,6 +280,8 @@ class OverlayServer:
         self.http_port = http_port
         self.ws_port = ws_port
         self.ws_clients = set()
+        # Subset of ws_clients that negotiated the compact protocol: websocket -> MessagePack frames?
+        self._compact_clients = {}
         self.ws_loop = None
         self.httpd = None
 
@@ -281,7 +292,16 @@ class OverlayServer:
         self._state_lock = threading.Lock()
         self._state_cache = {}
         self._pending_state_by_type = {}
-        self._pending_transient = deque()
+        self._pending_transient = TransientQueue()
+        # Producer -> loop hand-off. deque append/popleft are atomic, so
+        # producers never take a lock; see broadcast() / _drain_intake().
+        self._intake = deque()
+        self._intake_scheduled = False
+        self._intake_slice = 512
+        # (lane, coalesce_key) -> pending WireEvent that later same-key transients merge into.
+        self._pending_coalesce = {}
+        self._coalesce_absorbed = {}  # coalesce_key -> events merged away (metrics)
+        self._coalesce_metric_keys = 64
         self._max_transient_pending = 2048
         self._dedupe_window_ms = 120
         self._recent_dedupe = {}
@@ -296,6 +316,9 @@ class OverlayServer:
         self.trace_export = False
         self.event_pipeline_v2 = True
         self.js_scheduler_v2 = True
+        self.ws_compact_wire = True
+        self.ws_msgpack = False
+        self.ws_deflate = True
         self._last_metrics_emit_ms = 0
         self._metrics = {
             "events_in_total": 0,
@@ -304,7 +327,9 @@ class OverlayServer:
             "last_flush_size": 0,
             "max_pending_state": 0,
             "max_pending_transient": 0,
+            "max_pending_intake": 0,
             "coalesce_replaced": 0,
+            "coalesced_transient_total": 0,
             "dropped_total": 0,
             "dropped_transient_overflow": 0,
             "deduped_total": 0,
@@ -322,6 +347,8 @@ class OverlayServer:
             "legacy_flush_count": 0,
             "last_batch_size": 0,
             "last_emit_payload_ms": 0,
+            "wire_bytes_json": 0,
+            "wire_bytes_compact": 0,
         }
         self._dev_overlay_visibility_mode = "auto"  # auto | hide | show
         self._item_moved_callback = None
@@ -391,6 +418,23 @@ class OverlayServer:
             self.httpd.js_scheduler_v2 = self.js_scheduler_v2
         self.broadcast("perf_js_scheduler_mode", {"enabled": self.js_scheduler_v2})
 
+    def set_ws_wire_options(self, compact=None, msgpack=None, deflate=None):
+        """
+        Wire formats offered to overlay clients. `compact` / `msgpack` apply
+        to connections made afterwards (clients that ask for them get JSON
+        while they are off); `deflate` (permessage-deflate) takes effect the
+        next time the WS server starts.
+        """
+        if compact is not None:
+            self.ws_compact_wire = bool(compact)
+        if msgpack is not None:
+            self.ws_msgpack = bool(msgpack)
+        if deflate is not None:
+            self.ws_deflate = bool(deflate)
+        if self.httpd:
+            self.httpd.ws_compact_wire = self.ws_compact_wire
+            self.httpd.ws_msgpack = self.ws_msgpack
+
     def set_dev_overlay_visibility_mode(self, mode):
         mode_s = str(mode or "auto").strip().lower()
         if mode_s not in {"auto", "hide", "show"}:
@@ -446,7 +490,10 @@ class OverlayServer:
         with self._state_lock:
             self._pending_state_by_type.clear()
             self._pending_transient.clear()
+            self._pending_coalesce.clear()
             self._recent_dedupe.clear()
+        self._intake.clear()
+        self._intake_scheduled = False
         self._flush_scheduled = False
         self._next_flush_at = 0.0
         self._flush_task = None
@@ -464,6 +511,8 @@ class OverlayServer:
                 self.httpd.perf_debug = self.perf_debug
                 self.httpd.event_pipeline_v2 = self.event_pipeline_v2
                 self.httpd.js_scheduler_v2 = self.js_scheduler_v2
+                self.httpd.ws_compact_wire = self.ws_compact_wire
+                self.httpd.ws_msgpack = self.ws_msgpack
                 print(f'WEB: Overlay ready at http://localhost:{self.http_port}')
                 self.http_ready.set()
                 self.httpd.serve_forever()
@@ -491,7 +540,8 @@ class OverlayServer:
                     if port == self.http_port:
                         continue
                         
-                    async with websockets.serve(self._ws_handler, '127.0.0.1', port):
+                    compression = "deflate" if self.ws_deflate else None
+                    async with websockets.serve(self._ws_handler, '127.0.0.1', port, compression=compression):
                         self.ws_port = port
                         found = True
                         print(f'WS: WebSocket listening on port {self.ws_port}')
@@ -544,32 +594,99 @@ class OverlayServer:
         except Exception:
             path = None
 
-        if path != "/better_planetside":
+        url = urlparse(path or "")
+        if url.path != "/better_planetside":
             server_log(f"WS CONNECTION REJECTED: Invalid path {path}")
             await websocket.close(1008, "Invalid Path")
             return
 
+        compact, packed = self._negotiate_wire(url.query)
+        if compact:
+            # The tables go out before the client is registered, so no batch can precede them.
+            await websocket.send(compact_hello(packed))
+            self._compact_clients[websocket] = packed
         self.ws_clients.add(websocket)
         try:
             with self._state_lock:
                 replay = list(self._state_cache.values())
-            if self.ws_batching_v2 and replay:
-                await websocket.send(json.dumps({
-                    "kind": "batch",
-                    "tick_ts_ms": int(time.time() * 1000),
-                    "events": replay,
-                }))
+            if compact:
+                if replay:
+                    await websocket.send(compact_batch(replay, packed=packed))
+            elif self.ws_batching_v2 and replay:
+                await websocket.send(batch_envelope(replay))
             else:
-                for payload in replay:
-                    await websocket.send(json.dumps(payload))
+                for event in replay:
+                    await websocket.send(event.json)
             await websocket.wait_closed()
         finally:
+            self._compact_clients.pop(websocket, None)
             self.ws_clients.discard(websocket)
 
+    def _negotiate_wire(self, query):
+        """(compact, msgpack) for a client's `?proto=c1&enc=msgpack` connect query."""
+        params = parse_qs(query or "")
+        compact = self.ws_compact_wire and COMPACT_PROTOCOL in params.get("proto", ())
+        packed = (compact and self.ws_msgpack and overlay_wire.msgpack is not None
+                  and "msgpack" in params.get("enc", ()))
+        return bool(compact), bool(packed)
+
     def broadcast(self, category, data):
-        now_ms = int(time.time() * 1000)
-        payload_data = data if isinstance(data, dict) else {"value": data}
-        payload_data = dict(payload_data)
+        """
+        Queues a message for the overlay and returns. The calling thread (GUI,
+        Census) only copies the payload and appends it to the intake queue;
+        normalization, dedupe, lane assignment, metrics and sending all run
+        on the WS loop thread. Without a running loop the message is
+        processed inline, so state and metrics stay current before start().
+        """
+        payload_data = dict(data) if isinstance(data, dict) else {"value": data}
+        self._intake.append((category, payload_data, int(time.time() * 1000)))
+        loop = self.ws_loop
+        if not self.is_running or loop is None:
+            self._drain_intake(inline=True)
+            return
+        # One wakeup per burst: the drain clears the flag before it empties the queue.
+        if not self._intake_scheduled:
+            self._intake_scheduled = True
+            try:
+                loop.call_soon_threadsafe(self._drain_intake)
+            except RuntimeError:  # Loop closed under us (shutdown).
+                self._intake_scheduled = False
+                self._drain_intake(inline=True)
+
+    def _drain_intake(self, inline=False):
+        """
+        Runs queued intake messages through the pipeline. `inline` is for
+        the producer thread (no loop, or one that is closing): state and
+        metrics are updated but the loop is never touched.
+        """
+        self._intake_scheduled = False
+        intake = self._intake
+        depth = len(intake)
+        if depth > self._metrics["max_pending_intake"]:
+            self._metrics["max_pending_intake"] = depth
+        on_loop = not inline and self.is_running and self.ws_loop is not None
+        # On the loop, work in slices so a huge burst cannot hold off flushes and sends.
+        budget = self._intake_slice if on_loop else None
+        queued = False
+        while budget is None or budget > 0:
+            try:
+                category, payload_data, now_ms = intake.popleft()
+            except IndexError:
+                break
+            queued = self._process_broadcast(category, payload_data, now_ms, on_loop) or queued
+            if budget is not None:
+                budget -= 1
+        if on_loop and intake and not self._intake_scheduled:
+            self._intake_scheduled = True
+            self.ws_loop.call_soon(self._drain_intake)
+        if queued and on_loop and self.ws_clients:
+            self._schedule_flush()
+
+    def _process_broadcast(self, category, payload_data, now_ms, on_loop=True):
+        """
+        Runs one intake message through the pipeline. Returns True if it
+        awaits a flush. Legacy-mode sends are only started when `on_loop`.
+        """
 
         # Dev override for legacy overlay visibility while keeping pipeline active.
         if str(category or "").strip().lower() == "overlay_visibility":
@@ -583,22 +700,17 @@ class OverlayServer:
         payload_data["ts_server_rx_ms"] = now_ms
 
         if not self.event_pipeline_v2:
-            wire_msg = {
-                'category': str(category or "unknown"),
-                'data': payload_data,
-            }
             try:
                 evt = normalize_overlay_event(category, payload_data, seq=0)
                 lane = evt["category"]
             except Exception:
                 lane = "normal"
+            event = WireEvent({
+                'category': str(category or "unknown"),
+                'data': payload_data,
+            }, lane)
             if self.trace_export:
-                self._append_trace_log(
-                    lane=lane,
-                    wire_category=wire_msg.get("category"),
-                    payload_data=payload_data,
-                    meta={"mode": "legacy"},
-                )
+                self._append_trace_log(event, lane, extra_meta={"mode": "legacy"})
             with self._state_lock:
                 self._metrics["events_in_total"] += 1
                 self._increment_lane_metric("in", lane)
@@ -609,37 +721,36 @@ class OverlayServer:
                 self._metrics["last_flush_size"] = 1
                 self._metrics["last_batch_size"] = 1
                 if lane == "state":
-                    self._state_cache[str(category or "unknown")] = wire_msg
+                    self._state_cache[str(category or "unknown")] = event
                 should_emit_metrics = (
                     self.perf_debug and (int(time.time() * 1000) - self._last_metrics_emit_ms) >= 1000
                 )
                 if should_emit_metrics:
                     self._last_metrics_emit_ms = int(time.time() * 1000)
                     metrics_data = self._build_metrics_payload()
-                    metrics_payload = json.dumps({
+                    metrics_event = WireEvent({
                         "category": "perf_stats",
                         "data": metrics_data
-                    })
+                    }, "state")
                     self._append_perf_log(metrics_data)
                 else:
-                    metrics_payload = None
+                    metrics_event = None
 
-            if not self.is_running or not self.ws_loop or not self.ws_clients:
-                return
+            if not on_loop or not self.is_running or not self.ws_loop or not self.ws_clients:
+                return False
 
+            # On the loop thread already: tasks run in creation order.
             try:
-                asyncio.run_coroutine_threadsafe(
-                    self._ws_broadcast(json.dumps(wire_msg)),
-                    self.ws_loop
-                )
-                if metrics_payload:
-                    asyncio.run_coroutine_threadsafe(
-                        self._ws_broadcast(metrics_payload),
-                        self.ws_loop
-                    )
+                if self._json_clients():
+                    self.ws_loop.create_task(self._ws_broadcast(event.json))
+                    if metrics_event:
+                        self.ws_loop.create_task(self._ws_broadcast(metrics_event.json))
+                if self._compact_clients:
+                    self.ws_loop.create_task(
+                        self._ws_broadcast_compact([event, metrics_event] if metrics_event else [event]))
             except Exception:
                 pass
-            return
+            return False
 
         with self._state_lock:
             self._metrics["events_in_total"] += 1
@@ -649,7 +760,7 @@ class OverlayServer:
             lane = evt["category"]
             self._increment_lane_metric("in", lane)
 
-            wire_msg = {
+            event = WireEvent({
                 'category': evt["type"],
                 'data': payload_data,
                 'meta': {
@@ -662,23 +773,18 @@ class OverlayServer:
                         'dedupe_key': evt["dedupe_key"],
                     }
                 }
-            }
+            }, lane)
             if self.trace_export:
-                self._append_trace_log(
-                    lane=lane,
-                    wire_category=wire_msg.get("category"),
-                    payload_data=payload_data,
-                    meta=wire_msg.get("meta"),
-                )
+                self._append_trace_log(event, lane)
 
             is_state = (lane == "state")
             if is_state:
                 # Replay cache is only for persistent state.
-                self._state_cache[evt["type"]] = wire_msg
+                self._state_cache[evt["type"]] = event
                 replaced = evt["type"] in self._pending_state_by_type
                 if replaced:
                     self._metrics["coalesce_replaced"] += 1
-                self._pending_state_by_type[evt["type"]] = (wire_msg, lane)
+                self._pending_state_by_type[evt["type"]] = (event, lane)
                 pending_state_len = len(self._pending_state_by_type)
                 if pending_state_len > self._metrics["max_pending_state"]:
                     self._metrics["max_pending_state"] = pending_state_len
@@ -687,7 +793,13 @@ class OverlayServer:
                 if self._should_dedupe_transient(lane, dedupe_key, now_ms):
                     self._metrics["deduped_total"] += 1
                     self._metrics["dropped_total"] += 1
-                    return
+                    return False
+
+                # Same-key transients within one flush window merge into the pending
+                # message (newest payload, with a count). Critical events never merge.
+                coalesce_key = str(evt.get("coalesce_key") or "") if lane != "critical" else ""
+                if coalesce_key and self._coalesce_transient(lane, coalesce_key, event):
+                    return True
 
                 # Hard limit cosmetic queue share so hitmarker bursts can never starve normal events.
                 if lane == "cosmetic":
@@ -695,7 +807,7 @@ class OverlayServer:
                         self._metrics["dropped_total"] += 1
                         self._metrics["dropped_transient_overflow"] += 1
                         self._metrics["dropped_cosmetic_total"] += 1
-                        return
+                        return False
 
                 # Transient events are queued FIFO and batched on next flush tick.
                 if len(self._pending_transient) >= self._max_transient_pending:
@@ -706,19 +818,40 @@ class OverlayServer:
                             self._metrics["dropped_cosmetic_total"] += 1
                         elif lane == "normal":
                             self._metrics["dropped_normal_total"] += 1
-                        return
-                self._pending_transient.append((wire_msg, lane, dedupe_key))
+                        return False
+                self._pending_transient.append((event, lane, dedupe_key))
+                if coalesce_key:
+                    self._pending_coalesce[(lane, coalesce_key)] = event
                 pending_transient_len = len(self._pending_transient)
                 if pending_transient_len > self._metrics["max_pending_transient"]:
                     self._metrics["max_pending_transient"] = pending_transient_len
+        return True
 
-        if not self.is_running or not self.ws_loop or not self.ws_clients:
+    def _coalesce_transient(self, lane, coalesce_key, event):
+        # Caller holds self._state_lock. Returns False if nothing is pending for the key.
+        pending = self._pending_coalesce.get((lane, coalesce_key))
+        if pending is None:
+            return False
+        absorbed = int(pending.msg["data"].get("coalesced_count", 1) or 1)
+        merged = event.msg
+        merged["data"]["coalesced_count"] = absorbed + 1
+        pending.replace(merged)
+        self._metrics["coalesced_transient_total"] += 1
+        by_key = self._coalesce_absorbed
+        if coalesce_key not in by_key and len(by_key) >= self._coalesce_metric_keys:
+            coalesce_key = "(other)"
+        by_key[coalesce_key] = by_key.get(coalesce_key, 0) + 1
+        return True
+
+    def _forget_coalesce(self, item):
+        # An evicted transient can no longer absorb newer events.
+        event = item[0] if item else None
+        msg = getattr(event, "msg", None)
+        if not msg:
             return
-
-        try:
-            self.ws_loop.call_soon_threadsafe(self._schedule_flush)
-        except Exception:
-            pass
+        key = (item[1], str(((msg.get("meta") or {}).get("v2") or {}).get("coalesce_key") or ""))
+        if self._pending_coalesce.get(key) is event:
+            del self._pending_coalesce[key]
 
     def _schedule_flush(self):
         if self._flush_scheduled:
@@ -744,8 +877,8 @@ class OverlayServer:
             pending_items = list(self._pending_state_by_type.values())
             self._pending_state_by_type.clear()
             if self._pending_transient:
-                pending_items.extend(self._pending_transient)
-                self._pending_transient.clear()
+                pending_items.extend(self._pending_transient.drain())
+            self._pending_coalesce.clear()
             pending_messages = [item[0] for item in pending_items]
             for item in pending_items:
                 lane = item[1] if len(item) >= 2 else "normal"
@@ -759,29 +892,32 @@ class OverlayServer:
             if should_emit_metrics:
                 self._last_metrics_emit_ms = int(time.time() * 1000)
                 metrics_data = self._build_metrics_payload()
-                metrics_payload = json.dumps({
+                metrics_event = WireEvent({
                     "category": "perf_stats",
                     "data": metrics_data
-                })
+                }, "state")
                 self._append_perf_log(metrics_data)
             else:
-                metrics_payload = None
-
-        if self.ws_batching_v2:
-            self._metrics["batch_flush_count"] += 1
-            self._metrics["last_batch_size"] = len(pending_messages)
-            await self._ws_broadcast(json.dumps({
-                "kind": "batch",
-                "tick_ts_ms": int(time.time() * 1000),
-                "events": pending_messages,
-            }))
-        else:
-            self._metrics["legacy_flush_count"] += 1
-            self._metrics["last_batch_size"] = 1
-            for payload in pending_messages:
-                await self._ws_broadcast(json.dumps(payload))
-        if metrics_payload:
-            await self._ws_broadcast(metrics_payload)
+                metrics_event = None
+
+        # JSON text is only produced when a JSON client is connected (or none
+        # at all, so the send path behaves as before when nothing negotiated).
+        if self._json_clients() or not self._compact_clients:
+            if self.ws_batching_v2:
+                self._metrics["batch_flush_count"] += 1
+                self._metrics["last_batch_size"] = len(pending_messages)
+                await self._ws_broadcast(batch_envelope(pending_messages))
+            else:
+                self._metrics["legacy_flush_count"] += 1
+                self._metrics["last_batch_size"] = 1
+                for event in pending_messages:
+                    await self._ws_broadcast(event.json)
+            if metrics_event:
+                await self._ws_broadcast(metrics_event.json)
+        if self._compact_clients:
+            # Compact clients always get the whole flush as one batch frame.
+            await self._ws_broadcast_compact(
+                pending_messages + [metrics_event] if metrics_event else pending_messages)
 
         # Pace next flush by configured target FPS.
         self._next_flush_at = (self.ws_loop.time() if self.ws_loop else 0.0) + self._flush_interval_s
@@ -791,9 +927,30 @@ class OverlayServer:
         if has_more and self.ws_loop and self.is_running:
             self._schedule_flush()
 
+    def _json_clients(self):
+        if not self._compact_clients:
+            return self.ws_clients
+        return [ws for ws in self.ws_clients if ws not in self._compact_clients]
+
     async def _ws_broadcast(self, message):
-        if self.ws_clients:
-            websockets.broadcast(self.ws_clients, message)
+        clients = self._json_clients()
+        if clients:
+            self._metrics["wire_bytes_json"] += len(message)
+            websockets.broadcast(clients, message)
+
+    async def _ws_broadcast_compact(self, events):
+        text_clients = [ws for ws, packed in self._compact_clients.items() if not packed]
+        packed_clients = [ws for ws, packed in self._compact_clients.items() if packed]
+        tick_ts_ms = int(time.time() * 1000)
+        # Text frames are counted in characters; the payloads are almost entirely ASCII.
+        if text_clients:
+            frame = compact_batch(events, tick_ts_ms)
+            self._metrics["wire_bytes_compact"] += len(frame)
+            websockets.broadcast(text_clients, frame)
+        if packed_clients:
+            frame = compact_batch(events, tick_ts_ms, packed=True)
+            self._metrics["wire_bytes_compact"] += len(frame)
+            websockets.broadcast(packed_clients, frame)
 
     def _build_metrics_payload(self):
         now_ms = int(time.time() * 1000)
@@ -807,7 +964,10 @@ class OverlayServer:
             "last_flush_size": int(self._metrics["last_flush_size"]),
             "max_pending_state": int(self._metrics["max_pending_state"]),
             "max_pending_transient": int(self._metrics["max_pending_transient"]),
+            "max_pending_intake": int(self._metrics["max_pending_intake"]),
             "coalesce_replaced": int(self._metrics["coalesce_replaced"]),
+            "coalesced_transient_total": int(self._metrics["coalesced_transient_total"]),
+            "coalesce_absorbed_by_key": dict(self._coalesce_absorbed),
             "dropped_total": int(self._metrics["dropped_total"]),
             "dropped_transient_overflow": int(self._metrics["dropped_transient_overflow"]),
             "deduped_total": int(self._metrics["deduped_total"]),
@@ -830,6 +990,12 @@ class OverlayServer:
             "last_batch_size": int(self._metrics["last_batch_size"]),
             "event_pipeline_v2": bool(self.event_pipeline_v2),
             "js_scheduler_v2": bool(self.js_scheduler_v2),
+            "ws_compact_wire": bool(self.ws_compact_wire),
+            "ws_msgpack": bool(self.ws_msgpack),
+            "ws_deflate": bool(self.ws_deflate),
+            "ws_compact_clients": len(self._compact_clients),
+            "wire_bytes_json": int(self._metrics["wire_bytes_json"]),
+            "wire_bytes_compact": int(self._metrics["wire_bytes_compact"]),
         }
 
     def _append_perf_log(self, metrics):
@@ -841,20 +1007,12 @@ class OverlayServer:
         except Exception:
             pass
 
-    def _append_trace_log(self, lane, wire_category, payload_data, meta=None):
+    def _append_trace_log(self, event, lane, extra_meta=None):
         try:
-            now_ms = int(time.time() * 1000)
-            row = {
-                "ts_server_trace_ms": now_ms,
-                "ts_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                "lane": str(lane or "normal"),
-                "category": str(wire_category or "unknown"),
-                "data": dict(payload_data or {}),
-            }
-            if meta:
-                row["meta"] = dict(meta)
+            # Reuses the event's wire encoding instead of copying and re-serializing it.
+            line = trace_row(event, lane, extra_meta=extra_meta)
             with open(trace_log_path(), "a", encoding="utf-8") as f:
-                f.write(json.dumps(row, ensure_ascii=True) + "\n")
+                f.write(line + "\n")
         except Exception:
             pass
 
@@ -891,7 +1049,7 @@ class OverlayServer:
             self._recent_dedupe.pop(k, None)
 
     def _pending_cosmetic_count(self):
-        return sum(1 for item in self._pending_transient if len(item) >= 2 and str(item[1]) == "cosmetic")
+        return self._pending_transient.count("cosmetic")
 
     def _max_cosmetic_pending(self):
         # Keep cosmetics bounded to avoid blocking normal/critical transients.
@@ -907,26 +1065,22 @@ class OverlayServer:
             return True
 
         # Remove oldest cosmetic first.
-        for idx, item in enumerate(self._pending_transient):
-            if len(item) >= 2 and str(item[1]) == "cosmetic":
-                self._pending_transient.rotate(-idx)
-                self._pending_transient.popleft()
-                self._pending_transient.rotate(idx)
-                self._metrics["dropped_total"] += 1
-                self._metrics["dropped_transient_overflow"] += 1
-                self._metrics["dropped_cosmetic_total"] += 1
-                return True
+        victim = self._pending_transient.pop_oldest("cosmetic")
+        if victim is not None:
+            self._forget_coalesce(victim)
+            self._metrics["dropped_total"] += 1
+            self._metrics["dropped_transient_overflow"] += 1
+            self._metrics["dropped_cosmetic_total"] += 1
+            return True
 
         # For incoming critical, allow displacing oldest normal.
         if str(incoming_lane) == "critical":
-            for idx, item in enumerate(self._pending_transient):
-                if len(item) >= 2 and str(item[1]) == "normal":
-                    self._pending_transient.rotate(-idx)
-                    self._pending_transient.popleft()
-                    self._pending_transient.rotate(idx)
-                    self._metrics["dropped_total"] += 1
-                    self._metrics["dropped_transient_overflow"] += 1
-                    self._metrics["dropped_normal_total"] += 1
-                    return True
+            victim = self._pending_transient.pop_oldest("normal")
+            if victim is not None:
+                self._forget_coalesce(victim)
+                self._metrics["dropped_total"] += 1
+                self._metrics["dropped_transient_overflow"] += 1
+                self._metrics["dropped_normal_total"] += 1
+                return True
 
         return False
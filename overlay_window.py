@@ -2004,8 +2004,10 @@ class QtOverlay(QWidget):
         dhsr = (dhs / max(1, d_calc_base) * 100)
         
         # Total Session Time Logic (with Pause/Resume support)
+        # Session start times are event time, so measure against the session clock.
         acc_t = stats_data.get("acc_t", 0)
-        now = time.time()
+        clock = getattr(self.gui_ref, "session_clock", None)
+        now = clock.now() if clock is not None else time.time()
         
         if start_t > 0:
             total_sec = acc_t + (now - start_t)
@@ -2424,6 +2426,11 @@ class QtOverlay(QWidget):
                     self.server.set_trace_export(bool(self.gui_ref.config.get("overlay_trace_export", False)))
                     self.server.set_event_pipeline_v2(bool(self.gui_ref.config.get("event_pipeline_v2", True)))
                     self.server.set_js_scheduler_v2(bool(self.gui_ref.config.get("js_scheduler_v2", True)))
+                    self.server.set_ws_wire_options(
+                        compact=bool(self.gui_ref.config.get("overlay_ws_compact", True)),
+                        msgpack=bool(self.gui_ref.config.get("overlay_ws_msgpack", False)),
+                        deflate=bool(self.gui_ref.config.get("overlay_ws_deflate", True)),
+                    )
                     self.server.set_event_pipeline_tuning(
                         dedupe_window_ms=int(self.gui_ref.config.get("overlay_dedupe_window_ms", 120)),
                         max_transient_pending=int(self.gui_ref.config.get("overlay_transient_max_pending", 2048)),
@@ -2445,6 +2452,11 @@ class QtOverlay(QWidget):
                 self.server.set_trace_export(bool(self.gui_ref.config.get("overlay_trace_export", False)))
                 self.server.set_event_pipeline_v2(bool(self.gui_ref.config.get("event_pipeline_v2", True)))
                 self.server.set_js_scheduler_v2(bool(self.gui_ref.config.get("js_scheduler_v2", True)))
+                self.server.set_ws_wire_options(
+                    compact=bool(self.gui_ref.config.get("overlay_ws_compact", True)),
+                    msgpack=bool(self.gui_ref.config.get("overlay_ws_msgpack", False)),
+                    deflate=bool(self.gui_ref.config.get("overlay_ws_deflate", True)),
+                )
                 self.server.set_event_pipeline_tuning(
                     dedupe_window_ms=int(self.gui_ref.config.get("overlay_dedupe_window_ms", 120)),
                     max_transient_pending=int(self.gui_ref.config.get("overlay_transient_max_pending", 2048)),
@@ -0,0 +1,151 @@
+import json
+import time
+
+try:
+    import orjson
+except ImportError:  # Optional fast path
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional binary encoding for compact clients
+    msgpack = None
+
+
+# Compact protocol ("c1"), negotiated per client with ?proto=c1 on the
+# websocket URL. Each event is an array
+#     [category, data]                              (legacy pipeline)
+#     [category, data, seq, lane, coalesce_key]     (event pipeline v2)
+# where category / lane are indexes into the tables the server sends once
+# at connect (`compact_hello`); a category missing from the table is sent
+# as its name. Batches are {"b": tick_ts_ms, "e": [event, ...]}. The id,
+# priority and dedupe_key meta fields are server-side only and omitted.
+# With ?enc=msgpack (and msgpack installed) the same structures go out as
+# MessagePack binary frames.
+COMPACT_PROTOCOL = "c1"
+WIRE_LANES = ("state", "critical", "normal", "cosmetic")
+# Append only: IDs are positions, and cached pages decode with the table they got at connect.
+WIRE_CATEGORIES = (
+    "stats", "feed", "feed_config", "feed_clear", "stats_clear", "streak", "crosshair",
+    "event", "hitmarker", "events_clear", "scifi_mode", "overlay_visibility",
+    "twitch_config", "twitch_message", "twitch_visibility",
+    "perf_debug_mode", "perf_target_fps", "perf_pipeline_tuning", "perf_ws_batching_mode",
+    "perf_event_pipeline_mode", "perf_js_scheduler_mode", "perf_stats",
+)
+_CATEGORY_IDS = {name: i for i, name in enumerate(WIRE_CATEGORIES)}
+_LANE_IDS = {name: i for i, name in enumerate(WIRE_LANES)}
+
+
+def encode_json(obj):
+    """
+    Compact JSON text for `obj`. Values JSON cannot represent are sent as
+    their str() instead of failing the whole flush.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+
+class WireEvent:
+    """
+    One overlay wire message (`{"category", "data", "meta"}`) and its JSON
+    text. The text is encoded on first use and then shared by every consumer:
+    the websocket send, batch envelopes, the state replay cache and the
+    trace log. It stays `str` rather than bytes because websockets sends
+    bytes as binary frames, which the overlay page does not read.
+    """
+
+    __slots__ = ("msg", "lane", "_json", "_compact", "_packed")
+
+    def __init__(self, msg, lane="normal"):
+        self.msg = msg
+        self.lane = lane
+        self._json = None
+        self._compact = None
+        self._packed = None
+
+    def replace(self, msg):
+        """Swaps in a new message (transient coalescing); the next access re-encodes."""
+        self.msg = msg
+        self._json = None
+        self._compact = None
+        self._packed = None
+
+    @property
+    def json(self):
+        text = self._json
+        if text is None:
+            text = self._json = encode_json(self.msg)
+        return text
+
+    @property
+    def compact(self):
+        """The message as compact-protocol JSON text."""
+        text = self._compact
+        if text is None:
+            text = self._compact = encode_json(compact_fields(self.msg))
+        return text
+
+    @property
+    def packed(self):
+        """The message as compact-protocol MessagePack bytes (needs msgpack)."""
+        data = self._packed
+        if data is None:
+            data = self._packed = msgpack.packb(compact_fields(self.msg), default=str)
+        return data
+
+
+def compact_fields(msg):
+    """The compact-protocol array for a `{"category", "data", "meta"}` message."""
+    category = msg.get("category")
+    fields = [_CATEGORY_IDS.get(category, category), msg.get("data") or {}]
+    meta = msg.get("meta")
+    if meta:
+        v2 = meta.get("v2") or {}
+        fields += [meta.get("seq", 0), _LANE_IDS.get(v2.get("category"), _LANE_IDS["normal"]),
+                   v2.get("coalesce_key") or ""]
+    return fields
+
+
+def compact_hello(packed=False):
+    """First frame to a compact client: protocol name and the lookup tables."""
+    hello = {"k": "hello", "proto": COMPACT_PROTOCOL, "cats": list(WIRE_CATEGORIES), "lanes": list(WIRE_LANES)}
+    return msgpack.packb(hello) if packed else encode_json(hello)
+
+
+def compact_batch(events, tick_ts_ms=None, packed=False):
+    """Compact batch frame, joined from the events' cached compact encodings."""
+    if tick_ts_ms is None:
+        tick_ts_ms = int(time.time() * 1000)
+    if not packed:
+        return f'{{"b":{int(tick_ts_ms)},"e":[{",".join(e.compact for e in events)}]}}'
+    # MessagePack arrays are a header followed by the packed items, so the
+    # cached per-event bytes are concatenated as-is.
+    packer = msgpack.Packer()
+    return b"".join([packer.pack_map_header(2), packer.pack("b"), packer.pack(int(tick_ts_ms)),
+                     packer.pack("e"), packer.pack_array_header(len(events))]
+                    + [e.packed for e in events])
+
+
+def batch_envelope(events, tick_ts_ms=None):
+    """`{"kind": "batch", ...}` built by joining the events' encoded texts."""
+    if tick_ts_ms is None:
+        tick_ts_ms = int(time.time() * 1000)
+    return f'{{"kind":"batch","tick_ts_ms":{int(tick_ts_ms)},"events":[{",".join(e.json for e in events)}]}}'
+
+
+def trace_row(event, lane, now_ms=None, extra_meta=None):
+    """
+    One overlay_trace.jsonl line: trace fields spliced in front of the
+    event's encoded text, so its category / data / meta keys are reused
+    as-is. `extra_meta` is for messages that carry no meta of their own.
+    """
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    head = (f'{{"ts_server_trace_ms":{int(now_ms)},'
+            f'"ts_iso":"{time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now_ms / 1000.0))}",'
+            f'"lane":{json.dumps(str(lane or "normal"))},')
+    if extra_meta:
+        head += f'"meta":{encode_json(extra_meta)},'
+    body = event.json
+    return head + body[1:] if len(body) > 2 else head[:-1] + "}"
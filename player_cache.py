@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+
+
+class _FieldView:
+    """
+    Dict-like view of one field of PlayerCache (name or outfit tag), so
+    existing `name_cache.get(cid, "Unknown")` / `cid in name_cache` /
+    `name_cache[cid] = name` call sites keep working.
+    """
+
+    __slots__ = ("_cache", "_index")
+
+    def __init__(self, cache, index):
+        self._cache = cache
+        self._index = index
+
+    def get(self, cid, default=None):
+        entry = self._cache.lookup(cid)
+        return default if entry is None else entry[self._index]
+
+    def __getitem__(self, cid):
+        entry = self._cache.lookup(cid)
+        if entry is None:
+            raise KeyError(cid)
+        return entry[self._index]
+
+    def __contains__(self, cid):
+        return self._cache.lookup(cid) is not None
+
+    def __setitem__(self, cid, value):
+        if self._index == 0:
+            self._cache.put(cid, name=value)
+        else:
+            self._cache.put(cid, tag=value)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class PlayerCache:
+    """
+    Tiered character ID -> (name, outfit tag) lookup.
+
+    A bounded LRU sits in front of point lookups on the player_cache table
+    (`db.lookup_player`). IDs the table does not have are remembered in a
+    bounded negative set so a busy unknown ID costs one query, not one per
+    event; `put()` clears that entry once the name resolver finds it.
+    `names` / `outfits` expose the two fields with the dict interface the
+    killfeed code uses. IDs looked up successfully are remembered until
+    `drain_seen()` so maintenance can refresh their last_seen in one batch.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, db, capacity=20000, negative_capacity=20000):
+        self.db = db
+        self.capacity = max(1, int(capacity))
+        self.negative_capacity = max(1, int(negative_capacity))
+        self._entries = OrderedDict()  # cid -> (name, tag)
+        self._missing = OrderedDict()  # cid -> None
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.names = _FieldView(self, 0)
+        self.outfits = _FieldView(self, 1)
+        self.stats = {"hits": 0, "db_hits": 0, "db_misses": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def warm(self, limit):
+        """Preloads the `limit` most recently seen players. Returns how many were loaded."""
+        if limit <= 0:
+            return 0
+        rows = self.db.load_recent_players(min(int(limit), self.capacity))
+        with self._lock:
+            # Oldest first, so the most recent end up at the hot end of the LRU.
+            for cid, name, tag in reversed(rows):
+                self._store(cid, (name, tag or ""))
+        return len(rows)
+
+    def lookup(self, cid):
+        """(name, tag) for `cid`, loading it from the DB on an LRU miss. None if unknown."""
+        with self._lock:
+            entry = self._entries.get(cid)
+            if entry is not None:
+                self._entries.move_to_end(cid)
+                self._seen.add(cid)
+                self.stats["hits"] += 1
+                return entry
+            if cid in self._missing:
+                return None
+
+        row = self.db.lookup_player(cid) if cid else None
+        with self._lock:
+            # A put() may have landed while we were querying; it wins.
+            entry = self._entries.get(cid)
+            if entry is not None:
+                return entry
+            if row is None or row[0] is None:
+                self.stats["db_misses"] += 1
+                self._missing[cid] = None
+                if len(self._missing) > self.negative_capacity:
+                    self._missing.popitem(last=False)
+                return None
+            self.stats["db_hits"] += 1
+            entry = (row[0], row[1] or "")
+            self._store(cid, entry)
+            self._seen.add(cid)
+            return entry
+
+    def drain_seen(self):
+        """IDs looked up since the last call."""
+        with self._lock:
+            seen, self._seen = self._seen, set()
+        return seen
+
+    def put(self, cid, name=None, tag=None):
+        """Updates the in-memory entry (the caller persists to the DB)."""
+        with self._lock:
+            old = self._entries.get(cid)
+            if old is None:
+                if name is None:
+                    return
+                entry = (name, tag or "")
+            else:
+                entry = (old[0] if name is None else name, old[1] if tag is None else tag)
+            self._missing.pop(cid, None)
+            self._store(cid, entry)
+
+    def _store(self, cid, entry):
+        # Caller holds self._lock.
+        self._entries[cid] = entry
+        self._entries.move_to_end(cid)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
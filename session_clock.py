@@ -0,0 +1,92 @@
+import threading
+import time
+
+
+class SessionClock:
+    """
+    Session clock driven by Census payload timestamps (event time).
+
+    Session start/pause and kill times are taken from the event itself, so
+    ingest lag, batched processing and reconnect replays no longer stretch
+    or shrink session time and KPM. `now()` is the newest event time seen,
+    advanced by wall time since that event arrived; with no events yet it
+    is plain wall time. Replaying a recorded stream faster than real time
+    therefore moves the clock at replay speed.
+
+    Per-character active intervals live on the stats object: `start` is the
+    event time the open interval began (0 = paused), `acc_t` the sum of
+    closed intervals and `end` the event time of the last pause. Late events
+    from before `end` belong to time already counted (or logged out), so
+    they neither reopen nor widen an interval.
+    """
+
+    def __init__(self, wall=time.time, monotonic=time.monotonic):
+        self._wall = wall
+        self._monotonic = monotonic
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.watermark = 0.0
+            self._mono_at_watermark = 0.0
+
+    def observe(self, ts):
+        """Advances the clock to event time `ts` (never moves backwards)."""
+        with self._lock:
+            if ts > self.watermark:
+                self.watermark = ts
+                self._mono_at_watermark = self._monotonic()
+
+    def now(self):
+        with self._lock:
+            if not self.watermark:
+                return self._wall()
+            return self.watermark + (self._monotonic() - self._mono_at_watermark)
+
+    def event_time(self, p):
+        """Event time of a payload; falls back to `now()` if it has no usable timestamp."""
+        try:
+            ts = float(p.get("timestamp"))
+        except (TypeError, ValueError):
+            return self.now()
+        if ts <= 0:
+            return self.now()
+        self.observe(ts)
+        return ts
+
+    # --- Per-character active intervals ----------------------------------
+    @staticmethod
+    def open_interval(obj, ts):
+        """Starts (or resumes) the character's session at `ts`. True if it was paused."""
+        end = obj.get("end", 0)
+        if end and ts <= end:
+            return False
+        start = obj.get("start", 0)
+        if not start:
+            obj["start"] = ts
+            return True
+        if ts < start:
+            # Late event from before the interval we opened (but after the last pause): widen it.
+            obj["start"] = ts
+        return False
+
+    @staticmethod
+    def close_interval(obj, ts):
+        """Pauses the character's session at `ts`. Returns the seconds added to acc_t."""
+        start = obj.get("start", 0)
+        if not start:
+            return 0.0
+        elapsed = max(0.0, ts - start)
+        obj["acc_t"] = obj.get("acc_t", 0) + elapsed
+        obj["start"] = 0
+        obj["end"] = max(ts, obj.get("end", 0))
+        return elapsed
+
+    def active_seconds(self, obj, now=None):
+        """Total session time: closed intervals plus the open one up to `now`."""
+        total = obj.get("acc_t", 0)
+        start = obj.get("start", 0)
+        if start:
+            total += max(0.0, (self.now() if now is None else now) - start)
+        return total
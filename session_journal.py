@@ -0,0 +1,115 @@
+import threading
+import time
+
+from session_clock import SessionClock
+
+
+# Store column -> journal column, in journal row order.
+JOURNAL_FIELDS = (("k", "kills"), ("d", "deaths"), ("hs", "headshots"), ("a", "assists"),
+                  ("revives_received", "revives"))
+
+
+class SessionJournal:
+    """
+    Write-behind history of session stats.
+
+    Every `interval_s` a background thread samples the SessionStatsStore
+    rows of the journaled characters (own characters by default), diffs
+    them against the previous sample and queues the non-zero deltas for
+    the DB writer as one batch. The Census apply path is never touched;
+    it only keeps updating the in-memory store as before.
+
+    Baselines are kept per character, not per store: switch_server carries
+    the active character's row over into the new store, and that must not
+    count twice. A counter that went down (fresh row after a server switch
+    or restart) starts a new baseline at zero. Call `flush()` right before
+    replacing the store to keep the old store's last few seconds.
+    """
+
+    def __init__(self, db, get_store, get_cids, clock=None, interval_s=5.0, wall=time.time, log=print):
+        self.db = db
+        self.get_store = get_store
+        self.get_cids = get_cids
+        self.clock = clock or SessionClock()
+        self.interval_s = max(0.5, float(interval_s))
+        self.wall = wall
+        self.log = log
+        self._last = {}  # cid -> (k, d, hs, a, revives, seconds)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.rows_written = 0
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="Session-Journal", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        """Samples now and queues the deltas. Returns the queued row count."""
+        with self._lock:
+            rows = self._collect()
+        if rows:
+            self.db.append_journal(rows).add_done_callback(self._on_written)
+        return len(rows)
+
+    def summary(self, cid, days=7, kd_mode_revive=True):
+        """Totals plus KPM / KD for `cid` over the last `days` days."""
+        totals = self.db.journal_totals(cid, self.wall() - days * 86400)
+        deaths = totals["d"]
+        if kd_mode_revive:
+            deaths = max(0, deaths - totals["revives"])
+        minutes = totals["seconds"] / 60.0
+        totals["kpm"] = totals["k"] / minutes if minutes > 0 else 0.0
+        totals["kd"] = totals["k"] / max(1, deaths)
+        return totals
+
+    # --- Internals ---------------------------------------------------------
+    def _collect(self):
+        # Caller holds self._lock.
+        store = self.get_store()
+        if store is None:
+            return []
+
+        now = self.clock.now()
+        ts = int(self.wall())
+        rows = []
+        for cid in self.get_cids():
+            obj = store.get(cid)
+            if obj is None:
+                continue
+            cur = tuple(int(obj.get(f, 0) or 0) for f, _col in JOURNAL_FIELDS)
+            cur += (round(self.clock.active_seconds(obj, now), 3),)
+            prev = self._last.get(cid)
+            self._last[cid] = cur
+            if prev is None or any(c < p for c, p in zip(cur, prev)):
+                prev = (0,) * len(cur)
+            delta = tuple(c - p for c, p in zip(cur, prev))
+            if any(delta[:-1]) or delta[-1] >= 1.0:
+                rows.append((cid, ts) + delta)
+            elif delta[-1] > 0:
+                # Keep sub-second time for the next sample instead of writing it.
+                self._last[cid] = cur[:-1] + (prev[-1],)
+        return rows
+
+    def _on_written(self, fut):
+        try:
+            self.rows_written += fut.result()
+        except Exception as e:
+            self.log(f"DB-ERROR (Journal): {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.flush()
+            except Exception as e:
+                self.log(f"DB-ERROR (Journal): {e}")
@@ -0,0 +1,267 @@
+import threading
+import time
+from array import array
+from collections.abc import MutableMapping
+
+try:
+    import numpy as np
+except ImportError:  # Optional fast path
+    np = None
+
+
+# Integer counters kept per player (one array column each).
+COUNTER_FIELDS = ("k", "d", "a", "hs", "hsrkill", "dhs", "dhs_eligible", "revives_received")
+# Float timestamps/durations (seconds).
+TIME_FIELDS = ("start", "acc_t", "last_kill_time")
+# Low-cardinality / free text fields (plain lists).
+TEXT_FIELDS = ("name", "faction", "world_id", "last_seen_base")
+
+CORE_FIELDS = ("id",) + TEXT_FIELDS + COUNTER_FIELDS + TIME_FIELDS
+_CORE_SET = frozenset(CORE_FIELDS)
+
+
+class PlayerStats(MutableMapping):
+    """
+    Per-character view onto one row of a SessionStatsStore.
+
+    Behaves like the old per-player dict (`obj["k"] += 1`, `.get()`,
+    `dict(obj)`), so overlay and killfeed code keep working unchanged.
+    Keys outside the fixed columns are kept in a small per-row dict.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._store._get_field(self._row, key)
+
+    def __setitem__(self, key, value):
+        self._store._set_field(self._row, key, value)
+
+    def __delitem__(self, key):
+        extras = self._store._extras.get(self._row)
+        if key in _CORE_SET or not extras or key not in extras:
+            raise KeyError(key)
+        del extras[key]
+
+    def __iter__(self):
+        yield from CORE_FIELDS
+        extras = self._store._extras.get(self._row)
+        if extras:
+            yield from list(extras)
+
+    def __len__(self):
+        return len(CORE_FIELDS) + len(self._store._extras.get(self._row) or ())
+
+    def __repr__(self):
+        return f"PlayerStats({dict(self)!r})"
+
+
+class SessionStatsStore:
+    """
+    Columnar session stats for every player seen on the server.
+
+    A player-index map assigns each character ID a row; counters live in
+    `array` columns, so thousands of tracked players cost a few bytes per
+    stat instead of one dict each. `get()`/`[]` return a PlayerStats view
+    for code that works on a single character; dashboard-wide queries
+    (leaderboard, totals) run over the columns, vectorized with NumPy when
+    it is installed.
+
+    Rows are only appended (never removed); `switch_server` starts a new
+    store instead of clearing, so views held by the Census thread stay valid.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = {}
+        self._ids = []
+        self._counters = {f: array("q") for f in COUNTER_FIELDS}
+        self._times = {f: array("d") for f in TIME_FIELDS}
+        self._text = {f: [] for f in TEXT_FIELDS}
+        self._extras = {}
+        self._views = []
+
+    # --- Mapping surface -------------------------------------------------
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, cid):
+        return cid in self._index
+
+    def __iter__(self):
+        return iter(list(self._index))
+
+    def __getitem__(self, cid):
+        return self._views[self._index[cid]]
+
+    def __setitem__(self, cid, values):
+        """Creates or overwrites a row from a mapping (e.g. a preserved dict copy)."""
+        row = self._index.get(cid)
+        if row is None:
+            self.create(cid, **dict(values))
+            return
+        view = self._views[row]
+        for key, value in dict(values).items():
+            if key != "id":
+                view[key] = value
+
+    def get(self, cid, default=None):
+        row = self._index.get(cid)
+        if row is None:
+            return default
+        return self._views[row]
+
+    def keys(self):
+        return list(self._index)
+
+    def items(self):
+        views = self._views
+        return [(cid, views[row]) for cid, row in list(self._index.items())]
+
+    def values(self):
+        return [view for _cid, view in self.items()]
+
+    def create(self, cid, **fields):
+        """Appends a row for `cid` (or returns the existing view) with defaults."""
+        with self._lock:
+            row = self._index.get(cid)
+            if row is not None:
+                return self._views[row]
+
+            now = time.time()
+            row = len(self._ids)
+            for f in COUNTER_FIELDS:
+                self._counters[f].append(int(fields.pop(f, 0) or 0))
+            self._times["start"].append(float(fields.pop("start", now) or 0))
+            self._times["acc_t"].append(float(fields.pop("acc_t", 0) or 0))
+            self._times["last_kill_time"].append(float(fields.pop("last_kill_time", now) or 0))
+            self._text["name"].append(fields.pop("name", "Searching..."))
+            self._text["faction"].append(fields.pop("faction", "NSO"))
+            self._text["world_id"].append(str(fields.pop("world_id", "0")))
+            self._text["last_seen_base"].append(fields.pop("last_seen_base", ""))
+            fields.pop("id", None)
+            if fields:
+                self._extras[row] = fields
+            self._ids.append(cid)
+            self._views.append(PlayerStats(self, row))
+            # Publish last: readers only see fully appended rows.
+            self._index[cid] = row
+            return self._views[row]
+
+    # --- Row access (used by PlayerStats) --------------------------------
+    def _get_field(self, row, key):
+        col = self._counters.get(key)
+        if col is not None:
+            return col[row]
+        col = self._times.get(key)
+        if col is not None:
+            return col[row]
+        col = self._text.get(key)
+        if col is not None:
+            return col[row]
+        if key == "id":
+            return self._ids[row]
+        extras = self._extras.get(row)
+        if extras and key in extras:
+            return extras[key]
+        raise KeyError(key)
+
+    def _set_field(self, row, key, value):
+        col = self._counters.get(key)
+        if col is not None:
+            col[row] = int(value)
+            return
+        col = self._times.get(key)
+        if col is not None:
+            col[row] = float(value)
+            return
+        col = self._text.get(key)
+        if col is not None:
+            col[row] = str(value) if key == "world_id" else value
+            return
+        if key == "id":
+            raise KeyError("id is fixed per row")
+        self._extras.setdefault(row, {})[key] = value
+
+    # --- Column queries --------------------------------------------------
+    def _snapshot(self, fields):
+        """Consistent copy of the row count and the requested numeric columns."""
+        with self._lock:
+            n = len(self._ids)
+            ids = self._ids[:n]
+            cols = {}
+            for f in fields:
+                src = self._counters.get(f)
+                if src is None:
+                    src = self._times[f]
+                cols[f] = src[:n]
+            text = {f: self._text[f][:n] for f in ("name", "faction", "world_id")}
+        return ids, cols, text
+
+    def leaderboard(self, world_id, active_ids, kd_mode_revive=True, now=None, limit=None):
+        """
+        Dashboard player list: active players on `world_id`, sorted by kills.
+
+        Returns dicts with id/name/fac/k/d/a/active_min, where `d` already
+        has revives subtracted in revive KD mode.
+        """
+        now = time.time() if now is None else now
+        world_id = str(world_id)
+        ids, cols, text = self._snapshot(("k", "d", "a", "revives_received", "start"))
+        worlds = text["world_id"]
+        rows = [i for i, cid in enumerate(ids) if worlds[i] == world_id and cid in active_ids]
+        if not rows:
+            return []
+
+        if np is not None:
+            idx = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            k = np.frombuffer(cols["k"], dtype=np.int64)[idx]
+            d = np.frombuffer(cols["d"], dtype=np.int64)[idx]
+            a = np.frombuffer(cols["a"], dtype=np.int64)[idx]
+            if kd_mode_revive:
+                d = np.maximum(0, d - np.frombuffer(cols["revives_received"], dtype=np.int64)[idx])
+            active_min = np.maximum((now - np.frombuffer(cols["start"], dtype=np.float64)[idx]) / 60.0, 0.5)
+            order = np.argsort(-k, kind="stable")
+            if limit is not None:
+                order = order[:limit]
+            k, d, a, active_min = k.tolist(), d.tolist(), a.tolist(), active_min.tolist()
+            ranked = [(rows[j], k[j], d[j], a[j], active_min[j]) for j in order.tolist()]
+        else:
+            k_col, d_col, a_col = cols["k"], cols["d"], cols["a"]
+            rev_col, start_col = cols["revives_received"], cols["start"]
+            ranked = []
+            for i in rows:
+                d = d_col[i]
+                if kd_mode_revive:
+                    d = max(0, d - rev_col[i])
+                ranked.append((i, k_col[i], d, a_col[i], max((now - start_col[i]) / 60.0, 0.5)))
+            ranked.sort(key=lambda r: r[1], reverse=True)
+            if limit is not None:
+                ranked = ranked[:limit]
+
+        names, factions = text["name"], text["faction"]
+        return [
+            {"id": ids[i], "name": names[i], "fac": factions[i], "k": k, "d": d, "a": a, "active_min": m}
+            for i, k, d, a, m in ranked
+        ]
+
+    def totals(self, cids):
+        """Summed counters over `cids` (e.g. all owned characters)."""
+        out = {f: 0 for f in COUNTER_FIELDS}
+        rows = [self._index[c] for c in cids if c in self._index]
+        if not rows:
+            return out
+        ids, cols, _text = self._snapshot(COUNTER_FIELDS)
+        if np is not None:
+            idx = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            for f in COUNTER_FIELDS:
+                out[f] = int(np.frombuffer(cols[f], dtype=np.int64)[idx].sum())
+        else:
+            for f in COUNTER_FIELDS:
+                col = cols[f]
+                out[f] = sum(col[i] for i in rows)
+        return out
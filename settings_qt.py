@@ -128,6 +128,8 @@ class SettingsSignals(QObject):
     browse_bg_requested = pyqtSignal()  # Trigger for Background-Dialog
     clear_bg_requested = pyqtSignal()   # Trigger for Background Reset
     check_updates_requested = pyqtSignal()  # Trigger for release update checks
+    compact_db_requested = pyqtSignal()  # Trigger for one-shot DB compaction
+    db_stats_updated = pyqtSignal(dict)  # DB size / row counts (from any thread)
 
 
 class SettingsWidget(QWidget):
@@ -316,6 +318,39 @@ class SettingsWidget(QWidget):
 
         main_layout.addWidget(self.discord_group)
 
+        # --- GROUP 5: DATABASE ---
+        self.db_group = QFrame(objectName="Group")
+        db_layout = QVBoxLayout(self.db_group)
+        db_layout.setContentsMargins(15, 15, 15, 15)
+
+        db_layout.addWidget(QLabel("> PLAYER DATABASE", objectName="GroupTitle"))
+        db_layout.addWidget(
+            QLabel("Players not seen for the set number of days are removed (0 = keep forever). "
+                   "Your own characters are always kept.", objectName="InfoText", wordWrap=True)
+        )
+
+        self.lbl_db_stats = QLabel("Size: -", objectName="PathLabel")
+        db_layout.addWidget(self.lbl_db_stats)
+
+        retention_row = QHBoxLayout()
+        retention_row.addWidget(QLabel("Keep players for (days):", styleSheet="color: #aaa;"))
+        self.spin_db_retention = QSpinBox()
+        self.spin_db_retention.setRange(0, 3650)
+        self.spin_db_retention.setValue(90)
+        self.spin_db_retention.setStyleSheet("QSpinBox { background-color: #111; border: 1px solid #444; color: #eee; padding: 6px; border-radius: 3px; }")
+        self.spin_db_retention.valueChanged.connect(self.request_save)
+        retention_row.addStretch()
+        retention_row.addWidget(self.spin_db_retention)
+        db_layout.addLayout(retention_row)
+
+        self.btn_compact_db = QPushButton("COMPACT DATABASE", objectName="ActionBtn")
+        self.btn_compact_db.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_compact_db.clicked.connect(self.on_compact_db_clicked)
+        db_layout.addWidget(self.btn_compact_db)
+
+        self.signals.db_stats_updated.connect(self.update_db_stats)
+        main_layout.addWidget(self.db_group)
+
         # --- GROUP 6: DEV TOOLS (SOURCE ONLY) ---
         self.dev_group = QFrame(objectName="Group")
         dev_layout = QVBoxLayout(self.dev_group)
@@ -548,6 +583,11 @@ class SettingsWidget(QWidget):
         self.btn_discord_presence.blockSignals(False)
         self.update_discord_presence_button(discord_active)
 
+        # Player DB retention
+        self.spin_db_retention.blockSignals(True)
+        self.spin_db_retention.setValue(max(0, min(3650, int(config_data.get("db_retention_days", 90) or 0))))
+        self.spin_db_retention.blockSignals(False)
+
         # 6. Overlay perf debug (dev only)        # 7. Overlay perf debug (dev only)
         overlay_perf_debug = bool(config_data.get("overlay_perf_debug", False))
         self.btn_overlay_perf_debug.blockSignals(True)
@@ -707,6 +747,22 @@ class SettingsWidget(QWidget):
         self.update_js_scheduler_button(bool(active))
         self.request_save()
 
+    def on_compact_db_clicked(self):
+        self.btn_compact_db.setEnabled(False)
+        self.btn_compact_db.setText("COMPACTING...")
+        self.signals.compact_db_requested.emit()
+
+    def update_db_stats(self, stats):
+        """Shows DB size / row counts; also re-enables the compact button after a run."""
+        size_mb = stats.get("size_bytes", 0) / 1048576
+        free_mb = stats.get("free_bytes", 0) / 1048576
+        self.lbl_db_stats.setText(
+            f"Size: {size_mb:.1f} MB ({free_mb:.1f} MB free)  |  "
+            f"Players: {stats.get('players', 0):,}  |  Own chars: {stats.get('my_chars', 0)}"
+        )
+        self.btn_compact_db.setEnabled(True)
+        self.btn_compact_db.setText("COMPACT DATABASE")
+
     def update_volume_label(self, val):
         """Only for optics while dragging."""
         self.lbl_vol_val.setText(f"{val}%")
@@ -718,6 +774,7 @@ class SettingsWidget(QWidget):
             "audio_device": self.combo_audio_device.currentText(),
             "main_background_path": self.lbl_bg_name.text() if self.lbl_bg_name.text() != "None" else "",
             "discord_presence_active": bool(self.btn_discord_presence.isChecked()),
+            "db_retention_days": int(self.spin_db_retention.value()),
         }
         if self.is_dev_environment:
             data["overlay_perf_debug"] = bool(self.btn_overlay_perf_debug.isChecked())
@@ -0,0 +1,25 @@
+import unittest
+
+from tools.bench_census_ingest import bench_mix, build_payloads, compare
+
+
+class BenchCensusIngestTests(unittest.TestCase):
+    def test_synthetic_mix_runs_without_handler_errors(self):
+        payloads = build_payloads("mixed", 500)
+        self.assertEqual(len(payloads), 500)
+        result = bench_mix("mixed", payloads, repeat=1, alloc_events=100)
+        self.assertEqual(result["errors"], 0)
+        self.assertGreater(result["events_per_s"], 0)
+        self.assertLessEqual(result["p50_us"], result["p99_us"])
+
+    def test_compare_flags_regressions_only(self):
+        base = {"mixes": {"mixed": {"events_per_s": 1000.0, "p99_us": 50.0, "peak_bytes_per_event": 300.0}}}
+        ok = {"mixed": {"events_per_s": 900.0, "p99_us": 55.0, "peak_bytes_per_event": 320.0, "errors": 0}}
+        slow = {"mixed": {"events_per_s": 500.0, "p99_us": 90.0, "peak_bytes_per_event": 900.0, "errors": 2}}
+        self.assertEqual(compare(ok, base, 0.25), [])
+        self.assertEqual(len(compare(slow, base, 0.25)), 4)
+        self.assertEqual(compare({"other": ok["mixed"]}, base, 0.25), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
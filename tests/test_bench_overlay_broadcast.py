@@ -0,0 +1,16 @@
+import unittest
+
+from tools.bench_overlay_broadcast import build_messages, run
+
+
+class BenchOverlayBroadcastTests(unittest.TestCase):
+    def test_both_modes_process_every_message(self):
+        report = run(300)
+        self.assertEqual(len(build_messages(300)), 300)
+        self.assertEqual(report["inline"]["events_in"], 300)
+        self.assertEqual(report["queued"]["events_in"], 300)
+        self.assertGreater(report["queued"]["us_per_call"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from census_correlation import GunnerKillIndex
+
+
+def death(victim, attacker="900"):
+    return {"event_name": "Death", "character_id": victim, "attacker_character_id": attacker}
+
+
+class GunnerKillIndexTests(unittest.TestCase):
+    def test_death_before_xp_matches_immediately(self):
+        idx = GunnerKillIndex(window_s=3)
+        d = death("1")
+        self.assertIsNone(idx.add_death(d, 100.0))
+        self.assertIs(idx.expect("1", 101.0), d)
+        # Consumed: a second XP for the same death does not match again.
+        self.assertIsNone(idx.expect("1", 101.0))
+        self.assertEqual(idx.matched, 1)
+
+    def test_xp_before_death_waits_for_it(self):
+        idx = GunnerKillIndex(window_s=3)
+        self.assertIsNone(idx.expect("2", 100.0))
+        self.assertEqual(idx.next_deadline(), 103.0)
+        self.assertEqual(idx.add_death(death("2"), 101.0), 100.0)
+        self.assertEqual(idx.pending, {})
+        self.assertIsNone(idx.next_deadline())
+
+    def test_out_of_window_does_not_match(self):
+        idx = GunnerKillIndex(window_s=3)
+        idx.add_death(death("3"), 100.0)
+        self.assertIsNone(idx.expect("3", 110.0))
+
+    def test_sweep_expires_only_overdue_xp(self):
+        idx = GunnerKillIndex(window_s=3)
+        idx.expect("a", 100.0)
+        idx.expect("b", 102.0)
+        self.assertEqual(idx.sweep(102.0), [])
+        self.assertEqual(idx.sweep(103.0), ["a"])
+        self.assertEqual(idx.next_deadline(), 105.0)
+        self.assertEqual(idx.sweep(200.0), ["b"])
+        self.assertEqual(idx.expired, 2)
+
+    def test_ring_buffer_evicts_oldest_death(self):
+        idx = GunnerKillIndex(window_s=3, max_deaths=2)
+        idx.add_death(death("x"), 100.0)
+        idx.add_death(death("y"), 100.0)
+        idx.add_death(death("z"), 100.0)
+        self.assertEqual(len(idx), 2)
+        self.assertIsNone(idx.expect("x", 100.0))
+        self.assertIsNotNone(idx.expect("z", 100.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
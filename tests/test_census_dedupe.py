@@ -0,0 +1,59 @@
+import unittest
+
+from census_dedupe import TimeWindowDedupe, census_event_key
+
+
+def _death(ts, victim="1", attacker="2", weapon="80"):
+    return {
+        "event_name": "Death",
+        "timestamp": str(ts),
+        "character_id": victim,
+        "attacker_character_id": attacker,
+        "attacker_weapon_id": weapon,
+    }
+
+
+class TimeWindowDedupeTests(unittest.TestCase):
+    def test_duplicate_within_window_is_detected(self):
+        d = TimeWindowDedupe(window_s=30)
+        self.assertFalse(d.seen_payload(_death(1000)))
+        self.assertTrue(d.seen_payload(_death(1000)))
+        self.assertFalse(d.seen_payload(_death(1000, weapon="81")))
+        self.assertEqual(d.duplicates, 1)
+
+    def test_window_is_time_based_not_count_based(self):
+        d = TimeWindowDedupe(window_s=30, max_entries=100000)
+        first = _death(1000)
+        d.seen_payload(first)
+        # A burst of 5000 distinct events in the same second must not evict it.
+        for i in range(5000):
+            d.seen_payload(_death(1000, victim=str(10 + i)))
+        self.assertTrue(d.seen_payload(first))
+
+    def test_entries_expire_after_window(self):
+        d = TimeWindowDedupe(window_s=30)
+        d.seen_payload(_death(1000))
+        d.seen_payload(_death(1031, victim="9"))
+        self.assertEqual(len(d), 1)
+        self.assertFalse(d.seen_payload(_death(1000)))
+
+    def test_hard_cap_bounds_memory(self):
+        d = TimeWindowDedupe(window_s=30, max_entries=10)
+        for i in range(50):
+            d.seen_payload(_death(1000, victim=str(i)))
+        self.assertEqual(len(d), 10)
+        self.assertEqual(d.evicted_by_cap, 40)
+
+    def test_invalid_timestamp_uses_watermark(self):
+        d = TimeWindowDedupe(window_s=30)
+        d.seen_payload(_death(1000))
+        self.assertFalse(d.seen(census_event_key({"event_name": "X"}), None))
+        self.assertEqual(len(d), 2)
+
+    def test_keys_distinguish_event_types(self):
+        xp = {"event_name": "GainExperience", "timestamp": "1", "character_id": "1", "experience_id": "2", "other_id": "80"}
+        self.assertNotEqual(census_event_key(xp), census_event_key(_death(1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+from census_worker import CensusWorker, NO_EXP_RULE, compile_exp_rules, compile_loadout_rules
+from session_stats import SessionStatsStore
+
+
+class _Controller:
+    def __init__(self):
+        self.config = {"killfeed": {"font_size": 21}}
+        self.session_stats = SessionStatsStore()
+        self.active_players = {}
+        self.name_cache = {}
+        self.outfit_cache = {}
+        self.item_db = {}
+        self.char_data = {"Me": "111"}
+        self.current_character_id = "111"
+        self.current_world_id = "10"
+        self.name_resolver = None
+        self.overlay_win = None
+        self.kd_mode_revive = True
+        self.events = []
+
+    def add_log(self, text):
+        pass
+
+    def trigger_overlay_event(self, name, *args, **kwargs):
+        self.events.append(name)
+
+
+class CensusDispatchTableTests(unittest.TestCase):
+    def setUp(self):
+        self.rules = compile_exp_rules({"1000": "Flash"}, {"2000": "Sunderer"})
+
+    def test_revive_is_not_a_generic_support_event(self):
+        rule = self.rules["7"]
+        self.assertTrue(rule.revive)
+        self.assertIsNone(rule.support_event)
+
+    def test_support_and_assist_lookup(self):
+        self.assertEqual(self.rules["4"].support_event, "Heal")
+        self.assertEqual(self.rules["373"].support_event, "Gunner Kill")
+        self.assertTrue(self.rules["371"].assist)
+        self.assertTrue(self.rules["26"].roadkill)
+        self.assertEqual(self.rules["26"].support_event, "RoadKill")
+
+    def test_vehicle_maps_are_folded_in(self):
+        self.assertEqual(self.rules["1000"].gunner_vehicle, "Flash")
+        self.assertEqual(self.rules["2000"].destroyed_vehicle, "Sunderer")
+        self.assertIs(self.rules.get("999999", NO_EXP_RULE), NO_EXP_RULE)
+
+    def test_loadout_rules(self):
+        rules = compile_loadout_rules()
+        self.assertEqual(rules["45"], ("Kill MAX", "kill_max"))
+        self.assertEqual(rules["1"], ("Kill Infil", "kill_infil"))
+        self.assertEqual(rules["11"], ("Kill Medic", None))
+        self.assertNotIn("2", rules)
+
+
+class CensusFastPathTests(unittest.TestCase):
+    def setUp(self):
+        self.c = _Controller()
+        self.worker = CensusWorker(self.c, "s:test")
+
+    def test_tracked_ids_follow_char_data(self):
+        self.assertEqual(self.worker.tracked_ids, frozenset({"111"}))
+        self.c.char_data["Alt"] = "222"
+        self.assertNotIn("222", self.worker.tracked_ids)
+        self.worker.refresh_tracked_characters()
+        self.assertEqual(self.worker.tracked_ids, frozenset({"111", "222"}))
+
+    def test_foreign_death_only_touches_global_stats(self):
+        self.worker._handle_death({
+            "character_id": "500", "attacker_character_id": "600",
+            "team_id": "1", "attacker_team_id": "2", "attacker_weapon_id": "1", "timestamp": "1700000000",
+        }, "10", 1700000000.0)
+        self.assertEqual(self.c.session_stats["600"]["k"], 1)
+        self.assertEqual(self.c.session_stats["500"]["d"], 1)
+        self.assertEqual(self.c.events, [])
+
+    def test_facility_capture_updates_the_stat_row(self):
+        self.worker.facility_map["1234"] = "The Crown"
+        self.worker._apply_payload({
+            "event_name": "PlayerFacilityCapture", "character_id": "111", "facility_id": "1234",
+            "world_id": "10", "timestamp": "1700000000",
+        })
+        row = self.c.session_stats["111"]
+        self.assertEqual(row["last_seen_base"], "The Crown")
+        self.assertEqual(row["start"], 1700000000.0)
+        self.assertEqual(row["world_id"], "10")
+
+    def test_killfeed_style_is_cached_until_invalidated(self):
+        style = self.worker._killfeed_style()
+        self.assertIn("font-size: 21px", style.base)
+        self.assertIs(self.worker._killfeed_style(), style)
+        self.c.config["killfeed"]["font_size"] = 30
+        self.assertIs(self.worker._killfeed_style(), style)
+        self.worker.invalidate_killfeed_style()
+        self.assertIn("font-size: 30px", self.worker._killfeed_style().base)
+
+
+if __name__ == "__main__":
+    unittest.main()
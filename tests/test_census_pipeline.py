@@ -0,0 +1,90 @@
+import json
+import queue
+import unittest
+
+from census_pipeline import CensusIngestQueue, StageStats, classify_payload, decode_census_frames
+
+
+class CensusPipelineTests(unittest.TestCase):
+    def test_decode_keeps_only_payload_frames(self):
+        frames = [
+            json.dumps({"payload": {"event_name": "Death", "world_id": "10"}}),
+            json.dumps({"online": {"EventServerEndpoint_Connery_1": "true"}, "type": "heartbeat"}),
+            "not-json",
+            json.dumps({"subscription": {"worlds": ["10"]}}),
+            json.dumps({"payload": {"event_name": "GainExperience"}}).encode("utf-8"),
+        ]
+        payloads = decode_census_frames(frames)
+        self.assertEqual([p["event_name"] for p in payloads], ["Death", "GainExperience"])
+
+    def test_classify_drops_other_world_events(self):
+        worlds = {"10", "13"}
+        self.assertTrue(classify_payload({"world_id": "13"}, worlds, set()))
+        self.assertFalse(classify_payload({"world_id": "1", "character_id": "5"}, worlds, {"9"}))
+
+    def test_classify_keeps_tracked_characters_anywhere(self):
+        worlds = {"10", "13"}
+        self.assertTrue(classify_payload({"world_id": "1", "other_id": "9"}, worlds, {"9"}))
+        self.assertTrue(classify_payload({"world_id": "1", "attacker_character_id": "9"}, worlds, {"9"}))
+
+    def test_classify_without_active_world_keeps_everything(self):
+        self.assertTrue(classify_payload({"world_id": "1"}, set(), set()))
+
+    def test_stage_stats_snapshot(self):
+        st = StageStats("decode")
+        st.record(4.0, events=2)
+        st.record(2.0, events=2)
+        snap = st.snapshot()
+        self.assertEqual(snap["events"], 4)
+        self.assertEqual(snap["batches"], 2)
+        self.assertEqual(snap["avg_ms_per_event"], 1.5)
+        self.assertEqual(snap["max_ms"], 4.0)
+
+
+class CensusIngestQueueTests(unittest.TestCase):
+    def test_preserves_arrival_order_across_classes(self):
+        q = CensusIngestQueue(max_pending=100)
+        q.put("a")
+        q.put("b", protected=True)
+        q.put("c")
+        self.assertEqual([q.get(timeout=0), q.get(timeout=0), q.get(timeout=0)], ["a", "b", "c"])
+        with self.assertRaises(queue.Empty):
+            q.get(timeout=0)
+
+    def test_coalesces_pending_global_items(self):
+        q = CensusIngestQueue(max_pending=100)
+        q.put("p1", coalesce_key=("presence", "5"))
+        q.put("x")
+        q.put("p2", coalesce_key=("presence", "5"))
+        self.assertEqual(q.qsize(), 2)
+        self.assertEqual(q.get(timeout=0), "p2")
+        q.put("p3", coalesce_key=("presence", "5"))
+        self.assertEqual(q.qsize(), 2)
+        self.assertEqual(q.snapshot()["coalesced"], 1)
+
+    def test_shed_oldest_never_drops_protected(self):
+        q = CensusIngestQueue(max_pending=100, policy="shed_oldest")
+        for i in range(100):
+            q.put(("g", i))
+        q.put(("own", 0), protected=True)
+        q.put(("g", 100))
+        snap = q.snapshot()
+        self.assertEqual(snap["dropped"], 1)
+        self.assertEqual(snap["depth"], 101)
+        items = [q.get(timeout=0) for _ in range(q.qsize())]
+        self.assertIn(("own", 0), items)
+        self.assertEqual(items[0], ("g", 1))
+        self.assertEqual(items[-1], ("g", 100))
+
+    def test_shed_newest_rejects_incoming_global(self):
+        q = CensusIngestQueue(max_pending=100, policy="shed_newest")
+        for i in range(100):
+            q.put(i)
+        self.assertFalse(q.put("late"))
+        self.assertTrue(q.put("mine", protected=True))
+        self.assertEqual(q.qsize(), 101)
+        self.assertEqual(q.snapshot()["max_depth"], 101)
+
+
+if __name__ == "__main__":
+    unittest.main()
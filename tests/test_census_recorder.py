@@ -0,0 +1,52 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from census_recorder import CensusRecorder, iter_recording, recording_files
+
+
+class CensusRecorderTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_keeps_order_and_arrival_time(self):
+        rec = CensusRecorder(self.dir).start()
+        rec.record('{"payload": {"event_name": "Death"}}', arrival_ts=100.5)
+        rec.record(b'{"type": "heartbeat"}', arrival_ts=101.25)
+        rec.close()
+
+        rows = list(iter_recording(self.dir))
+        self.assertEqual(rows, [
+            (100.5, '{"payload": {"event_name": "Death"}}'),
+            (101.25, '{"type": "heartbeat"}'),
+        ])
+        self.assertEqual(rec.frames, 2)
+
+    def test_rolls_over_and_keeps_newest_files(self):
+        rec = CensusRecorder(self.dir, max_bytes=1024, max_files=2).start()
+        frame = "x" * 300
+        for i in range(20):
+            rec.record(frame, arrival_ts=float(i))
+        rec.close()
+
+        files = recording_files(self.dir)
+        self.assertEqual(len(files), 2)
+        rows = list(iter_recording(files))
+        self.assertEqual(rows[-1][0], 19.0)
+        self.assertLess(len(rows), 20)
+
+    def test_truncated_file_is_read_up_to_the_damage(self):
+        path = os.path.join(self.dir, "census_broken.jsonl.gz")
+        data = gzip.compress(b'[1.0, "a"]\n[2.0, "b"]\n')
+        with open(path, "wb") as f:
+            f.write(data[:-6])
+        self.assertLessEqual(len(list(iter_recording(path))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
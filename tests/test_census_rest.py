@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from census_rest import CensusRestClient, CensusRestError, build_query
+
+
+class _Response:
+    def __init__(self, data, status=200):
+        self._data = data
+        self.status_code = status
+
+    def json(self):
+        return self._data
+
+
+class _Session:
+    """Stand-in for requests.Session that records URLs and can block."""
+
+    def __init__(self, data=None, status=200, delay=0.0):
+        self.data = data if data is not None else {"returned": 1, "character_list": [{"faction_id": "2"}]}
+        self.status = status
+        self.delay = delay
+        self.urls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            self.urls.append(url)
+        if self.delay:
+            time.sleep(self.delay)
+        return _Response(self.data, self.status)
+
+    def close(self):
+        pass
+
+
+class CensusRestClientTests(unittest.TestCase):
+    def _client(self, **kwargs):
+        session = _Session(**kwargs)
+        client = CensusRestClient("s:test", session=session, ttls={"character": 60})
+        self.addCleanup(client.close)
+        return client, session
+
+    def test_build_query_keeps_census_syntax(self):
+        self.assertEqual(build_query({"character_id": "1,2", "c:show": "name"}), "character_id=1,2&c:show=name")
+        self.assertEqual(build_query("?c:join=a^on:b"), "c:join=a^on:b")
+
+    def test_url_and_ttl_cache(self):
+        client, session = self._client()
+        self.assertEqual(
+            client.url("character", {"character_id": "5"}),
+            "https://census.daybreakgames.com/s:test/get/ps2:v2/character/?character_id=5",
+        )
+        first = client.get("character", {"character_id": "5"})
+        second = client.get("character", {"character_id": "5"})
+        self.assertEqual(first, second)
+        first["character_list"].clear()  # Callers get copies; the cached response is unaffected.
+        self.assertTrue(client.get("character", {"character_id": "5"})["character_list"])
+        self.assertEqual(len(session.urls), 1)
+        self.assertEqual(client.stats["cache_hits"], 2)
+
+        # Uncached collection / ttl=0 always hits the network.
+        client.get("character", {"character_id": "6"}, ttl=0)
+        client.get("character", {"character_id": "6"}, ttl=0)
+        client.get("outfit", "alias=ABC")
+        client.get("outfit", "alias=ABC")
+        self.assertEqual(len(session.urls), 5)
+
+        client.invalidate("character")
+        client.get("character", {"character_id": "5"})
+        self.assertEqual(len(session.urls), 6)
+
+    def test_identical_inflight_requests_are_coalesced(self):
+        client, session = self._client(delay=0.2)
+        futures = [client.get_async("character", {"character_id": "7"}, ttl=0) for _ in range(4)]
+        results = [f.result(timeout=5) for f in futures]
+        self.assertEqual(len(session.urls), 1)
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(len({id(r) for r in results}), 4)  # one copy per caller
+        self.assertEqual(client.stats["coalesced"], 3)
+
+    def test_errors_raise_and_are_not_cached(self):
+        client, session = self._client(status=503)
+        with self.assertRaises(CensusRestError):
+            client.get("character", {"character_id": "8"})
+        session.status = 200
+        session.data = {"error": "No data found."}
+        with self.assertRaises(CensusRestError):
+            client.get("character", {"character_id": "8"})
+        self.assertEqual(len(session.urls), 2)
+        self.assertEqual(client.stats["errors"], 2)
+
+    def test_only_static_data_is_cached_by_default(self):
+        session = _Session()
+        client = CensusRestClient("s:test", session=session)
+        self.addCleanup(client.close)
+        for collection in ("character", "characters_weapon_stat", "characters_directive", "directive_tree"):
+            client.get(collection, "character_id=5")
+            client.get(collection, "character_id=5")
+        self.assertEqual(len(session.urls), 7)
+
+    def test_async_fetch(self):
+        client, _session = self._client()
+        data = asyncio.run(client.fetch("character", {"character_id": "9"}))
+        self.assertEqual(data["character_list"][0]["faction_id"], "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from census_subscriptions import CensusSubscriptionManager
+
+
+class CensusSubscriptionManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.mgr = CensusSubscriptionManager()
+
+    def test_initial_subscription_uses_world_aliases_and_characters(self):
+        msgs = self.mgr.plan("10", ["111", "222"])
+        self.assertEqual(len(msgs), 1)
+        self.assertEqual(msgs[0]["action"], "subscribe")
+        self.assertEqual(msgs[0]["worlds"], ["10", "13"])
+        self.assertEqual(msgs[0]["characters"], ["111", "222"])
+        self.assertFalse(msgs[0]["logicalAndCharactersWithWorlds"])
+
+    def test_unchanged_target_sends_nothing(self):
+        self.mgr.plan("10", ["111"])
+        self.assertEqual(self.mgr.plan("10", ["111"]), [])
+
+    def test_server_switch_is_incremental(self):
+        self.mgr.plan("10", ["111"])
+        msgs = self.mgr.plan("40", ["111"])
+        self.assertEqual([m["action"] for m in msgs], ["clearSubscribe", "subscribe"])
+        self.assertEqual(msgs[0]["worlds"], ["10", "13"])
+        self.assertNotIn("characters", msgs[0])
+        self.assertEqual(msgs[1]["worlds"], ["40"])
+        self.assertNotIn("characters", msgs[1])
+
+    def test_character_removal_only_clears_that_character(self):
+        self.mgr.plan("1", ["111", "222"])
+        msgs = self.mgr.plan("1", ["111", "0", ""])
+        self.assertEqual(len(msgs), 1)
+        self.assertEqual(msgs[0]["action"], "clearSubscribe")
+        self.assertEqual(msgs[0]["characters"], ["222"])
+
+    def test_global_mode_round_trip(self):
+        self.mgr.plan("10", ["111"])
+        msgs = self.mgr.plan("10", ["111"], global_mode=True)
+        self.assertEqual(msgs[0], {"service": "event", "action": "clearSubscribe", "all": "true"})
+        self.assertEqual(msgs[1]["worlds"], ["all"])
+        msgs = self.mgr.plan("10", ["111"])
+        self.assertEqual(msgs[0]["action"], "clearSubscribe")
+        self.assertEqual(msgs[1]["worlds"], ["10", "13"])
+
+    def test_reset_forces_full_subscription(self):
+        self.mgr.plan("10", ["111"])
+        self.mgr.reset()
+        msgs = self.mgr.plan("10", ["111"])
+        self.assertEqual([m["action"] for m in msgs], ["subscribe"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from db_maintenance import DatabaseMaintenance
+from dior_db import DatabaseHandler
+from player_cache import PlayerCache
+
+DAY = 86400
+NOW = 1_800_000_000
+
+
+class DatabaseMaintenanceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "test.db")
+        self.db = DatabaseHandler(self.path)
+        self.logs = []
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _players(self, n, start=1):
+        return [(str(5428000000000000000 + i), f"P{i}", 1, 1, "") for i in range(start, start + n)]
+
+    def _maintenance(self, **kwargs):
+        return DatabaseMaintenance(self.db, log=self.logs.append, clock=lambda: NOW, **kwargs)
+
+    def test_expires_unseen_players_but_keeps_own_chars(self):
+        self.db.upsert_players(self._players(10)).result()
+        self.db.save_char_to_db("5428000000000000001", "P1", 10)
+        self.db.pool.execute("UPDATE player_cache SET last_seen=?", (NOW - 100 * DAY,)).result()
+        self.db.touch_players(["5428000000000000002"], NOW - DAY).result()
+
+        deleted = self.db.expire_players(90, NOW, chunk=3)
+        self.assertEqual(deleted, 8)
+        self.assertEqual(self.db.player_count(), 2)
+        self.assertIsNotNone(self.db.lookup_player("5428000000000000001"))
+        self.assertIsNotNone(self.db.lookup_player("5428000000000000002"))
+        self.assertEqual(self.db.expire_players(0, NOW), 0)
+
+    def test_failed_expiry_commit_keeps_the_counter(self):
+        self.db.upsert_players(self._players(4)).result()
+        self.db.pool.execute("UPDATE player_cache SET last_seen=?", (NOW - 100 * DAY,)).result()
+        self.db.pool.submit(lambda conn: conn.executescript(
+            "PRAGMA foreign_keys=ON;"
+            "CREATE TABLE parent (id INTEGER PRIMARY KEY);"
+            "CREATE TABLE child (pid INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED);"),
+            transaction=False).result()
+        expire_chunk = self.db._expire_chunk
+
+        def expire_then_break_commit(conn, cutoff, chunk):
+            deleted = expire_chunk(conn, cutoff, chunk)
+            conn.execute("INSERT INTO child VALUES (42)")  # Deferred FK: the COMMIT fails.
+            return deleted
+
+        self.db._expire_chunk = expire_then_break_commit
+        with self.assertRaises(Exception):
+            self.db.expire_players(90, NOW)
+        self.assertEqual(self.db.player_count(), 4)
+        self.assertEqual(self.db.pool.query_one("SELECT COUNT(*) FROM player_cache")[0], 4)
+
+    def test_rows_without_last_seen_get_a_grace_period(self):
+        self.db.upsert_players(self._players(3)).result()
+        self.db.pool.execute("UPDATE player_cache SET last_seen=NULL").result()
+        self.assertEqual(self.db.expire_players(30, NOW), 0)
+        self.assertEqual(self.db.expire_players(30, NOW + 31 * DAY), 3)
+
+    def test_cache_lookups_refresh_last_seen(self):
+        self.db.upsert_players(self._players(2)).result()
+        self.db.pool.execute("UPDATE player_cache SET last_seen=?", (NOW - 100 * DAY,)).result()
+        cache = PlayerCache(self.db)
+        cache.names.get("5428000000000000001")
+        maintenance = self._maintenance(player_cache=cache, retention_days=90)
+        stats = maintenance.run_once()
+        self.assertEqual(stats["players"], 1)
+        self.assertIsNotNone(self.db.lookup_player("5428000000000000001"))
+        self.assertTrue(any("Expired 1" in line for line in self.logs))
+
+    def test_compact_shrinks_file_and_enables_incremental_vacuum(self):
+        self.db.upsert_players(self._players(3000)).result()
+        self.db.pool.execute("UPDATE player_cache SET last_seen=?", (NOW - 100 * DAY,)).result()
+        published = []
+        maintenance = self._maintenance(retention_days=90, on_stats=published.append)
+        before, after = maintenance.compact()
+        self.assertEqual(after["players"], 0)
+        self.assertLess(after["size_bytes"], before["size_bytes"])
+        self.assertTrue(after["auto_vacuum"])
+        self.assertEqual(published[-1], after)
+
+        # Incremental vacuum now returns freed pages without a full rebuild.
+        self.db.upsert_players(self._players(3000)).result()
+        self.db.pool.execute("DELETE FROM player_cache").result()
+        self.assertGreater(self.db.db_stats()["free_bytes"], 0)
+        self.db.incremental_vacuum(100000).result()
+        self.assertEqual(self.db.db_stats()["free_bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import db_migrations
+from db_migrations import SCHEMA_VERSION, migrate, schema_version
+from dior_db import DatabaseHandler
+from tools.bench_db_lookup import run as run_lookup_bench
+
+
+class DbMigrationTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "test.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _legacy_db(self):
+        conn = sqlite3.connect(self.path)
+        db_migrations._v1_base_tables(conn.cursor())
+        conn.execute("""INSERT INTO player_cache (character_id, name, faction_id, world_id, battle_rank)
+                        VALUES ('5428000000000000001', 'Alpha', '2', '10', '100')""")
+        conn.execute("INSERT INTO my_chars VALUES ('5428000000000000001', 'Alpha')")
+        conn.commit()
+        conn.close()
+
+    def test_fresh_db_is_created_at_latest_version(self):
+        db = DatabaseHandler(self.path)
+        db.close()
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(schema_version(conn), SCHEMA_VERSION)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertTrue({"idx_player_cache_name_lower", "idx_player_cache_last_seen",
+                         "idx_player_cache_world_faction", "idx_my_chars_name"} <= indexes)
+        conn.close()
+
+    def test_legacy_db_is_migrated_with_typed_columns(self):
+        self._legacy_db()
+        db = DatabaseHandler(self.path)
+        self.addCleanup(db.close)
+        self.assertEqual(db.schema_version, SCHEMA_VERSION)
+        self.assertEqual(db.load_my_chars(), {"Alpha": "5428000000000000001"})
+        row = db.pool.query_one("SELECT typeof(character_id), typeof(world_id), faction_id, name_lower, last_seen "
+                                "FROM player_cache")
+        self.assertEqual(row, ("integer", "integer", 2, "alpha", None))
+        self.assertEqual(db.find_player_id("ALPHA"), "5428000000000000001")
+
+        # my_chars rows are deleted by ID now.
+        db.remove_my_char("5428000000000000001")
+        self.assertEqual(db.load_my_chars(), {})
+
+    def test_reopen_does_not_migrate_again(self):
+        DatabaseHandler(self.path).close()
+        never = mock.Mock(side_effect=AssertionError("migration re-run"))
+        with mock.patch.object(db_migrations, "MIGRATIONS", (never,) * SCHEMA_VERSION):
+            DatabaseHandler(self.path).close()
+        never.assert_not_called()
+
+    def test_failed_migration_rolls_back_everything(self):
+        self._legacy_db()
+
+        def broken(cursor):
+            cursor.execute("CREATE TABLE half_done (x)")
+            raise RuntimeError("boom")
+
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        with mock.patch.object(db_migrations, "MIGRATIONS", db_migrations.MIGRATIONS + (broken,)), \
+                mock.patch.object(db_migrations, "SCHEMA_VERSION", SCHEMA_VERSION + 1):
+            conn.execute("BEGIN")
+            with self.assertRaises(RuntimeError):
+                migrate(conn.cursor())
+            conn.execute("ROLLBACK")
+        self.assertEqual(schema_version(conn), 0)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.assertNotIn("half_done", tables)
+        self.assertEqual(conn.execute("SELECT typeof(character_id) FROM player_cache").fetchone()[0], "text")
+        conn.close()
+
+
+class DbLookupBenchTests(unittest.TestCase):
+    def test_indexes_replace_scans(self):
+        report = run_lookup_bench(players=2000, lookups=100)
+        self.assertEqual(report["schema_version"], SCHEMA_VERSION)
+        self.assertIn("SCAN", report["before"]["by_name"]["plan"])
+        for name in ("by_id", "by_name", "world_faction"):
+            self.assertNotIn("SCAN", report["after"][name]["plan"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from dior_db import DatabaseHandler, SQLitePool
+
+
+class DatabaseHandlerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "test.db")
+        self.db = DatabaseHandler(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _count(self):
+        return self.db.pool.query_one("SELECT COUNT(*) FROM player_cache")[0]
+
+    def test_uses_wal(self):
+        self.assertEqual(self.db.pool.query_one("PRAGMA journal_mode")[0], "wal")
+
+    def test_upsert_maintains_row_counter(self):
+        added = self.db.upsert_players([("1", "Alpha", 1, 10, "A"), ("2", "Bravo", 2, 20, "")]).result()
+        self.assertEqual(added, 2)
+        added = self.db.upsert_players([("2", "BravoTwo", 2, 21, "B"), ("3", "Charlie", 3, 30, "")]).result()
+        self.assertEqual(added, 1)
+        self.assertEqual(self.db.player_count(), 3)
+        self.assertEqual(self._count(), 3)
+
+        self.assertEqual(self.db.lookup_player("2"), ("BravoTwo", "B"))
+        self.assertEqual(self.db.pool.query_one(
+            "SELECT name_lower FROM player_cache WHERE character_id=2")[0], "bravotwo")
+
+    def test_rolled_back_upsert_does_not_count(self):
+        with self.assertRaises(Exception):
+            self.db.save_char_to_db("7", None, 10)  # my_chars.name is NOT NULL
+        self.assertEqual(self._count(), 0)
+        self.assertEqual(self.db.player_count(), 0)
+
+    def test_counter_survives_reopen(self):
+        self.db.upsert_players([(str(i), f"P{i}", 1, 1, "") for i in range(1, 51)]).result()
+        self.db.close()
+        self.db = DatabaseHandler(self.path)
+        self.assertEqual(self.db.player_count(), 50)
+
+    def test_upsert_keeps_world_id(self):
+        self.db.save_char_to_db("9", "Mine", 10)
+        self.db.upsert_players([("9", "MineRenamed", 1, 100, "TAG")]).result()
+        self.assertEqual(self.db.get_player_world("9"), 10)
+        self.assertEqual(self.db.load_my_chars(), {"Mine": "9"})
+        self.assertEqual(self.db.player_count(), 1)
+        self.db.remove_my_char("9")
+        self.assertEqual(self.db.load_my_chars(), {})
+
+    def test_concurrent_writers_and_readers(self):
+        def writer(base):
+            futs = [self.db.upsert_players([(str(base + i), f"N{base + i}", 1, 1, "")]) for i in range(50)]
+            for f in futs:
+                f.result()
+
+        def reader():
+            for _ in range(50):
+                self.db.load_recent_players(100)
+
+        threads = [threading.Thread(target=writer, args=(b,)) for b in (1000, 2000, 3000)]
+        threads += [threading.Thread(target=reader) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.db.player_count(), 150)
+        self.assertEqual(self._count(), 150)
+
+
+class SQLitePoolTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.pool = SQLitePool(os.path.join(self.tmp, "pool.db"),
+                               setup=lambda conn: conn.execute("CREATE TABLE t (k TEXT PRIMARY KEY)"))
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_failed_job_does_not_roll_back_its_batch(self):
+        ok = self.pool.execute("INSERT INTO t VALUES ('a')")
+        bad = self.pool.execute("INSERT INTO t VALUES ('a')")
+        ok2 = self.pool.executemany("INSERT INTO t VALUES (?)", [("b",), ("c",)])
+        self.assertEqual(ok.result(), 1)
+        with self.assertRaises(Exception):
+            bad.result()
+        self.assertEqual(ok2.result(), 2)
+        self.assertEqual(self.pool.query_one("SELECT COUNT(*) FROM t")[0], 3)
+
+    def test_on_commit_runs_only_for_committed_jobs(self):
+        committed = []
+        self.pool.submit(lambda conn: conn.executescript(
+            "PRAGMA foreign_keys=ON;"
+            "CREATE TABLE parent (id INTEGER PRIMARY KEY);"
+            "CREATE TABLE child (pid INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED);"),
+            transaction=False).result()
+
+        ok = self.pool.submit(lambda conn: conn.execute("INSERT INTO t VALUES ('a')").rowcount,
+                              on_commit=committed.append)
+        self.assertEqual(ok.result(), 1)
+        bad = self.pool.submit(lambda conn: conn.execute("INSERT INTO t VALUES ('a')").rowcount,
+                               on_commit=committed.append)
+        with self.assertRaises(Exception):
+            bad.result()
+        # Fails only at COMMIT (deferred foreign key), after the job itself returned.
+        orphan = self.pool.submit(lambda conn: conn.execute("INSERT INTO child VALUES (42)").rowcount,
+                                  on_commit=committed.append)
+        with self.assertRaises(Exception):
+            orphan.result()
+        self.assertEqual(committed, [1])
+
+    def test_readers_are_read_only(self):
+        with self.assertRaises(Exception):
+            self.pool.query("INSERT INTO t VALUES ('x')")
+
+    def test_submit_after_close_fails(self):
+        self.pool.close()
+        with self.assertRaises(RuntimeError):
+            self.pool.execute("SELECT 1").result()
+
+
+if __name__ == "__main__":
+    unittest.main()
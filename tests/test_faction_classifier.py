@@ -0,0 +1,96 @@
+import json
+import os
+import unittest
+
+from faction_classifier import FACTION_TERM_GROUPS, AhoCorasick, FactionClassifier
+from item_catalog import ItemCatalog, normalize_item_name
+from dior_utils import get_asset_path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scan_infer(name):
+    """Reference: the term-by-term scan the classifier replaces."""
+    n = name.upper()
+    for faction, terms in FACTION_TERM_GROUPS:
+        for t in terms:
+            if t in n:
+                return faction
+    return None
+
+
+def scan_factions(faction_name_map, name):
+    """Reference: exact match, then the first CSV name containing / contained in it."""
+    norm = normalize_item_name(name)
+    if not norm:
+        return set()
+    exact = faction_name_map.get(norm)
+    if exact:
+        return set(exact)
+    for csv_name_norm, factions in faction_name_map.items():
+        if len(csv_name_norm) < 4:
+            continue
+        if csv_name_norm in norm or norm in csv_name_norm:
+            return set(factions)
+    return set()
+
+
+def _directive_names():
+    names = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            name = node.get("name")
+            if isinstance(name, dict) and isinstance(name.get("en"), str):
+                names.append(name["en"])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    for fn in ("tree31_full.json", "tree65_tier1.json", "test_directives.json"):
+        path = os.path.join(ROOT, fn)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                walk(json.load(f))
+    return names
+
+
+class AhoCorasickTests(unittest.TestCase):
+    def test_lowest_rank_wins_including_suffix_matches(self):
+        ac = AhoCorasick([("HERS", 2), ("HE", 3), ("SHE", 1), ("RS", 0)])
+        self.assertEqual(ac.best("USHERS"), 0)
+        self.assertEqual(ac.best("USHE"), 1)
+        self.assertEqual(ac.best("HEX"), 3)
+        self.assertIsNone(ac.best("XYZ"))
+        self.assertIsNone(AhoCorasick([]).best("ANY"))
+
+
+class FactionClassifierTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        catalog = ItemCatalog(get_asset_path("sanction-list.csv"), log=lambda _msg: None).load()
+        cls.faction_names = catalog.faction_names()
+        cls.classifier = FactionClassifier(cls.faction_names)
+        cls.names = sorted({r["name"] for r in catalog._index["items"].values()} | set(_directive_names()))
+
+    def test_matches_reference_scan(self):
+        extra = ["", "AR", "NC1", "Gauss", "Vanu (VS) Thing", "Some  NC  gun", "Apex", "T1B Cycler", "zzz"]
+        for name in self.names + extra:
+            self.assertEqual(self.classifier.infer(name), scan_infer(name), name)
+            self.assertEqual(self.classifier.factions(name), scan_factions(self.faction_names, name), name)
+
+    def test_priority_order(self):
+        self.assertEqual(self.classifier.infer("NS-11 Gauss (TR)"), "3")  # tag beats term
+        self.assertEqual(self.classifier.infer("NSX-W Gauss"), "1")  # special variant first
+        self.assertEqual(self.classifier.infer("AR-N203"), "4")
+        self.assertIsNone(self.classifier.infer("Knife"))
+
+    def test_results_are_memoized(self):
+        first = self.classifier.factions("NS-11C")
+        self.assertIs(self.classifier.factions("NS-11C"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import item_catalog
+from item_catalog import ItemCatalog, normalize_item_name, parse_sanction_list
+from dior_utils import get_asset_path
+
+CSV = '''﻿Item ID,Item Category,Is Vehicle Weapon,Item Name,Faction ID,Sanction
+15016,AA MAX (Left),0,NS-10 Burster,3,max
+6013480,Assault Rifle,0,"""Apex"" NC1 Gauss Rifle",2,infantry
+6013476,Assault Rifle,0,"""Apex"" Pulsar VS1",1,infantry
+6009604,Assault Rifle,0,"NS-11 ""Endeavor"" Assault Rifle",0,infantry-explosive
+4905,Tank Cannon,1,"Titan-150 AP, Gen 2",2,vehicle
+'''
+
+
+class ItemCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp, "sanction-list.csv")
+        self.cache_path = os.path.join(self.tmp, "item_catalog.cache")
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(CSV)
+        self.logs = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _catalog(self):
+        return ItemCatalog(self.csv_path, cache_path=self.cache_path, log=self.logs.append)
+
+    def test_parses_quoted_fields(self):
+        items = parse_sanction_list(self.csv_path)
+        self.assertEqual(items["6013480"]["name"], '"Apex" NC1 Gauss Rifle')
+        self.assertEqual(items["4905"], {"name": "Titan-150 AP, Gen 2", "type": "Tank Cannon",
+                                         "faction_id": "2", "vehicle": True, "sanction": "vehicle"})
+
+    def test_lookups(self):
+        catalog = self._catalog().load_async()
+        self.assertEqual(catalog.get(15016)["type"], "AA MAX (Left)")
+        self.assertEqual(catalog.get("999", {}), {})
+        self.assertEqual(catalog.factions_for_name("apex pulsar vs1"), {"1"})
+        self.assertEqual(sorted(catalog.items_in_category("Assault Rifle")), ["6009604", "6013476", "6013480"])
+        self.assertIn("Tank Cannon", catalog.categories())
+        self.assertEqual(normalize_item_name('NS-11 "Endeavor"'), "NS 11 ENDEAVOR")
+
+    def test_second_load_uses_cache_until_csv_changes(self):
+        self.assertEqual(self._catalog().load().source, "csv")
+        with mock.patch.object(item_catalog, "parse_sanction_list", side_effect=AssertionError("re-parsed")):
+            cached = self._catalog().load()
+        self.assertEqual(cached.source, "cache")
+        self.assertEqual(len(cached), 5)
+
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write("1,Knife,0,Ripper,1,infantry\n")
+        st = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        rebuilt = self._catalog().load()
+        self.assertEqual(rebuilt.source, "csv")
+        self.assertEqual(rebuilt.get("1")["name"], "Ripper")
+
+    def test_corrupt_cache_is_rebuilt(self):
+        with open(self.cache_path, "wb") as f:
+            f.write(b"not a pickle")
+        catalog = self._catalog().load()
+        self.assertEqual(catalog.source, "csv")
+        self.assertEqual(len(catalog), 5)
+
+    def test_missing_csv_leaves_catalog_empty(self):
+        catalog = ItemCatalog(os.path.join(self.tmp, "nope.csv"), log=self.logs.append)
+        self.assertIsNone(catalog.get("15016"))
+        self.assertIsNone(catalog.source)
+        self.assertTrue(any("not found" in line for line in self.logs))
+
+    def test_bundled_list_parses(self):
+        catalog = ItemCatalog(get_asset_path("sanction-list.csv"), log=self.logs.append).load()
+        self.assertGreater(len(catalog), 1000)
+        self.assertEqual(catalog.get("6013480")["name"], '"Apex" NC1 Gauss Rifle')
+        self.assertEqual(catalog.get("6013480")["type"], "Assault Rifle")
+
+
+if __name__ == "__main__":
+    unittest.main()
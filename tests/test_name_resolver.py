@@ -0,0 +1,119 @@
+import concurrent.futures
+import threading
+import time
+import unittest
+
+from census_rest import CensusRestError
+from name_resolver import NameResolver
+
+
+class _Rest:
+    """Stand-in for CensusRestClient.get_async: answers with the IDs in `known`."""
+
+    def __init__(self, known=None, delay=0.0, fail=False):
+        self.known = known or {}
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+    def get_async(self, collection, query, ttl=None, timeout=None):
+        ids = query["character_id"].split(",")
+        self.batches.append(ids)
+        return self._pool.submit(self._answer, ids)
+
+    def _answer(self, ids):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise CensusRestError("HTTP 503")
+        return {"character_list": [
+            {"character_id": cid, "name": {"first": self.known[cid]}, "faction_id": "1",
+             "battle_rank": {"value": "100"}, "outfit": {"alias": "DIOR"}}
+            for cid in ids if cid in self.known
+        ]}
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+class NameResolverTests(unittest.TestCase):
+    def _resolver(self, rest, **kwargs):
+        self.rows = []
+        self.errors = []
+        resolver = NameResolver(rest, {}, {}, on_results=self.rows.extend, on_error=self.errors.append, **kwargs)
+        resolver.start()
+        self.addCleanup(rest.close)
+        self.addCleanup(resolver.stop)
+        return resolver
+
+    def _wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_duplicate_requests_are_batched_once(self):
+        rest = _Rest({"1": "Alpha", "2": "Bravo"})
+        resolver = self._resolver(rest, max_wait=0.05)
+        for _ in range(20):
+            resolver.request("1")
+            resolver.request("2")
+        self.assertTrue(self._wait_for(lambda: "2" in resolver.name_cache))
+        self.assertEqual(rest.batches, [["1", "2"]])
+        self.assertEqual(resolver.outfit_cache["1"], "DIOR")
+        self.assertEqual(sorted(r[0] for r in self.rows), ["1", "2"])
+        # Already known: no new lookup.
+        self.assertFalse(resolver.request("1"))
+
+    def test_full_batch_flushes_before_deadline(self):
+        known = {str(i): f"P{i}" for i in range(1, 11)}
+        rest = _Rest(known)
+        resolver = self._resolver(rest, batch_size=5, max_wait=10.0)
+        for cid in known:
+            resolver.request(cid)
+        self.assertTrue(self._wait_for(lambda: len(resolver.name_cache) == 10))
+        self.assertEqual([len(b) for b in rest.batches], [5, 5])
+
+    def test_missing_ids_are_negatively_cached(self):
+        rest = _Rest({"1": "Alpha"})
+        resolver = self._resolver(rest, max_wait=0.01)
+        resolver.request("1")
+        resolver.request("404")
+        self.assertTrue(self._wait_for(lambda: resolver.pending_count() == 0 and rest.batches))
+        self.assertFalse(resolver.request("404"))
+        self.assertIsNone(resolver.resolve("404").result(timeout=1))
+        self.assertEqual(len(rest.batches), 1)
+
+    def test_when_resolved_waits_for_name(self):
+        rest = _Rest({"7": "Charlie"}, delay=0.05)
+        resolver = self._resolver(rest, max_wait=0.01)
+        got = []
+        done = threading.Event()
+        resolver.when_resolved("7", lambda name: (got.append(name), done.set()), timeout=2.0)
+        self.assertTrue(done.wait(2))
+        self.assertEqual(got, ["Charlie"])
+        # Cached now: callback runs inline.
+        resolver.when_resolved("7", got.append)
+        self.assertEqual(got, ["Charlie", "Charlie"])
+
+    def test_when_resolved_times_out(self):
+        rest = _Rest({"8": "Delta"}, delay=0.5)
+        resolver = self._resolver(rest, max_wait=0.01)
+        started = time.monotonic()
+        self.assertIsNone(resolver.resolve("8", timeout=0.1).result(timeout=2))
+        self.assertLess(time.monotonic() - started, 0.4)
+
+    def test_errors_are_not_negatively_cached(self):
+        rest = _Rest({"9": "Echo"}, fail=True)
+        resolver = self._resolver(rest, max_wait=0.01)
+        self.assertIsNone(resolver.resolve("9", timeout=2).result(timeout=2))
+        self.assertEqual(len(self.errors), 1)
+        rest.fail = False
+        self.assertEqual(resolver.resolve("9", timeout=2).result(timeout=2), "Echo")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,7 @@ class OverlayEventsTests(unittest.TestCase):
         )
         self.assertEqual(evt["category"], "cosmetic")
         self.assertEqual(evt["dedupe_key"], "")
+        self.assertEqual(evt["coalesce_key"], "event:hitmarker:hm.png")
 
     def test_critical_event_is_critical(self):
         evt = normalize_overlay_event(
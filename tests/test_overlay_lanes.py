@@ -0,0 +1,35 @@
+import unittest
+
+from overlay_lanes import TransientQueue
+
+
+def _item(name, lane):
+    return ({"category": name}, lane, name)
+
+
+class TransientQueueTests(unittest.TestCase):
+    def test_iteration_merges_lanes_in_arrival_order(self):
+        q = TransientQueue()
+        for name, lane in [("a", "normal"), ("b", "cosmetic"), ("c", "critical"), ("d", "cosmetic"), ("e", "normal")]:
+            q.append(_item(name, lane))
+        self.assertEqual([item[2] for item in q], ["a", "b", "c", "d", "e"])
+        self.assertEqual((len(q), q.count("cosmetic"), q.count("normal"), q.count("critical")), (5, 2, 2, 1))
+
+    def test_pop_oldest_per_lane(self):
+        q = TransientQueue([_item("a", "cosmetic"), _item("b", "normal"), _item("c", "cosmetic")])
+        self.assertEqual(q.pop_oldest("cosmetic")[2], "a")
+        self.assertEqual(q.count("cosmetic"), 1)
+        self.assertEqual(len(q), 2)
+        self.assertIsNone(q.pop_oldest("critical"))
+        self.assertEqual([item[2] for item in q.drain()], ["b", "c"])
+        self.assertEqual(len(q), 0)
+        self.assertFalse(q)
+
+    def test_unknown_lane_is_queued_as_normal(self):
+        q = TransientQueue([_item("x", "weird"), ({"category": "y"},)])
+        self.assertEqual(q.count("normal"), 2)
+        self.assertEqual(q.pop_oldest("normal")[2], "x")
+
+
+if __name__ == "__main__":
+    unittest.main()
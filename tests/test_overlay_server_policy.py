@@ -1,6 +1,7 @@
+import json
 import unittest
-from collections import deque
 
+from overlay_lanes import TransientQueue
 from overlay_server import OverlayServer
 
 
@@ -28,7 +29,7 @@ class OverlayServerPolicyTests(unittest.TestCase):
         self.assertFalse(self.server._should_dedupe_transient("normal", "a", now + 500))
 
     def test_make_room_prefers_dropping_cosmetic(self):
-        self.server._pending_transient = deque(
+        self.server._pending_transient = TransientQueue(
             [
                 ({"category": "hitmarker"}, "cosmetic", "c1"),
                 ({"category": "event"}, "normal", "n1"),
@@ -46,6 +47,110 @@ class OverlayServerPolicyTests(unittest.TestCase):
         self.assertEqual(self.server._metrics["events_in_cosmetic"], 1)
         self.assertEqual(self.server._metrics["events_in_normal"], 0)
 
+    def test_broadcast_defers_pipeline_to_the_loop(self):
+        class FakeLoop:
+            def __init__(self):
+                self.callbacks = []
+
+            def call_soon_threadsafe(self, cb):
+                self.callbacks.append(cb)
+
+            call_soon = call_soon_threadsafe
+
+        loop = FakeLoop()
+        self.server.ws_loop = loop
+        self.server.is_running = True
+        payload = {"event_type": "kill", "html": "<b>x</b>"}
+        self.server.broadcast("event", payload)
+        self.server.broadcast("event", {"event_type": "death"})
+        payload["html"] = "mutated"
+        # Producer side: queued only, one wakeup for the burst.
+        self.assertEqual(self.server._metrics["events_in_total"], 0)
+        self.assertEqual(len(self.server._intake), 2)
+        self.assertEqual(len(loop.callbacks), 1)
+
+        loop.callbacks.pop()()
+        self.assertEqual(self.server._metrics["events_in_total"], 2)
+        self.assertEqual(self.server._metrics["max_pending_intake"], 2)
+        first = next(iter(self.server._pending_transient))[0]
+        self.assertEqual(first.msg["data"]["html"], "<b>x</b>")
+
+    def test_loop_drain_works_in_slices(self):
+        self.server.ws_loop = type("L", (), {"call_soon": lambda s, cb: calls.append(cb),
+                                             "call_soon_threadsafe": lambda s, cb: calls.append(cb)})()
+        calls = []
+        self.server.is_running = True
+        self.server._intake_slice = 3
+        for i in range(7):
+            self.server.broadcast("event", {"event_type": "kill", "n": i})
+        while calls:
+            calls.pop(0)()
+        self.assertEqual(self.server._metrics["events_in_total"], 7)
+        self.assertEqual(len(self.server._intake), 0)
+
+    def test_closed_loop_fallback_never_touches_the_loop(self):
+        class ClosedLoop:
+            def call_soon_threadsafe(self, cb):
+                raise RuntimeError("Event loop is closed")
+
+            def _touched(self, *args, **kwargs):
+                raise AssertionError("loop API used from the producer thread")
+
+            call_soon = call_later = create_task = time = _touched
+
+        self.server.ws_loop = ClosedLoop()
+        self.server.is_running = True
+        self.server.ws_clients = {object()}
+        self.server._intake_slice = 1
+        self.server.broadcast("event", {"event_type": "kill", "n": 1})
+        self.server.broadcast("event", {"event_type": "kill", "n": 2})
+        self.server.event_pipeline_v2 = False
+        self.server.broadcast("stats", {"kd": 1.0})
+        self.assertEqual(self.server._metrics["events_in_total"], 3)
+        self.assertEqual(len(self.server._intake), 0)
+        self.assertEqual(len(self.server._pending_transient), 2)
+
+    def _flushed(self):
+        import asyncio
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        self.server._ws_broadcast = capture
+        asyncio.run(self.server._flush_pending_broadcasts())
+        return [json.loads(m) for m in sent]
+
+    def test_same_key_hitmarkers_merge_within_a_flush(self):
+        for i in range(5):
+            self.server.broadcast("hitmarker", {"event_type": "hitmarker", "filename": "hm.png", "x": i})
+        self.server.broadcast("hitmarker", {"event_type": "headshot hitmarker", "filename": "hs.png"})
+        self.assertEqual(len(self.server._pending_transient), 2)
+        sent = self._flushed()
+        self.assertEqual([m["data"].get("coalesced_count") for m in sent], [5, None])
+        self.assertEqual(sent[0]["data"]["x"], 4)  # newest payload wins
+        self.assertEqual(self.server._metrics["coalesced_transient_total"], 4)
+        self.assertEqual(self.server._coalesce_absorbed, {"hitmarker:hitmarker:hm.png": 4})
+
+        # A new flush window starts a new message.
+        self.server.broadcast("hitmarker", {"event_type": "hitmarker", "filename": "hm.png"})
+        self.assertNotIn("coalesced_count", self._flushed()[0]["data"])
+
+    def test_critical_events_never_merge(self):
+        for _ in range(3):
+            self.server.broadcast("event", {"event_type": "kill", "coalesce_key": "k", "dedupe_key": "",
+                                            "ts_source_ms": 1})
+        self.assertEqual(len(self.server._pending_transient), 3)
+        self.assertEqual(self.server._metrics["coalesced_transient_total"], 0)
+
+    def test_evicted_transient_stops_absorbing(self):
+        self.server._max_transient_pending = 1
+        self.server.broadcast("hitmarker", {"filename": "hm.png"})
+        self.server.broadcast("event", {"event_type": "spot", "dedupe_key": "a"})  # evicts the hitmarker
+        self.assertEqual(self.server._pending_coalesce, {})
+        self.server.broadcast("hitmarker", {"filename": "hm.png"})
+        self.assertEqual(self.server._metrics["coalesced_transient_total"], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import overlay_server
+import overlay_wire
+from overlay_server import OverlayServer
+from overlay_wire import (
+    WIRE_CATEGORIES, WIRE_LANES, WireEvent, batch_envelope, compact_batch, compact_hello, encode_json, trace_row,
+)
+from tools.replay_overlay_trace import load_trace_events
+
+
+class _Obj:
+    def __str__(self):
+        return "obj"
+
+
+class OverlayWireTests(unittest.TestCase):
+    def test_encoders_agree(self):
+        msg = {"category": "event", "data": {"html": "<b>Ünïcode</b>", "n": 3, 7: None, "o": _Obj()}}
+        fast = json.loads(encode_json(msg))
+        with mock.patch.object(overlay_wire, "orjson", None):
+            plain = json.loads(encode_json(msg))
+        self.assertEqual(fast, plain)
+        self.assertEqual(plain["data"]["o"], "obj")
+        self.assertEqual(plain["data"]["7"], None)
+
+    def test_batch_envelope_joins_encoded_events(self):
+        events = [WireEvent({"category": "a", "data": {"x": 1}}), WireEvent({"category": "b", "data": {}})]
+        batch = json.loads(batch_envelope(events, tick_ts_ms=5))
+        self.assertEqual(batch, {"kind": "batch", "tick_ts_ms": 5, "events": [e.msg for e in events]})
+        self.assertEqual(json.loads(batch_envelope([], tick_ts_ms=1))["events"], [])
+
+    def test_trace_row_is_readable_by_replay_tool(self):
+        event = WireEvent({"category": "event", "data": {"event_type": "kill"}})
+        row = json.loads(trace_row(event, "normal", now_ms=1000, extra_meta={"mode": "legacy"}))
+        self.assertEqual(row["lane"], "normal")
+        self.assertEqual(row["meta"], {"mode": "legacy"})
+        self.assertEqual(row["data"], {"event_type": "kill"})
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(trace_row(event, "normal", now_ms=1000) + "\n")
+        try:
+            events = load_trace_events(path)
+            self.assertEqual(events[0]["ts_ms"], 1000)
+            self.assertEqual(events[0]["message"]["category"], "event")
+        finally:
+            os.unlink(path)
+
+    def test_each_event_is_encoded_once_across_trace_replay_and_flush(self):
+        server = OverlayServer()
+        server.trace_export = True
+        server.ws_batching_v2 = False
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        server._ws_broadcast = capture
+        tmp = tempfile.mkdtemp()
+        with mock.patch.object(overlay_server, "LOG_DIR", tmp), \
+                mock.patch.object(overlay_wire, "encode_json", wraps=overlay_wire.encode_json) as enc:
+            server.broadcast("stats", {"kd": 1.5})
+            server.broadcast("event", {"event_type": "kill", "html": "<i>x</i>"})
+            asyncio.run(server._flush_pending_broadcasts())
+            self.assertEqual(enc.call_count, 2)
+        self.assertEqual([json.loads(m)["category"] for m in sent], ["stats", "event"])
+        self.assertIs(server._state_cache["stats"].json, sent[0])
+        with open(os.path.join(tmp, "overlay_trace.jsonl"), encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+
+def _v2_message(category, data, seq, lane, coalesce_key=""):
+    return {"category": category, "data": data, "meta": {"seq": seq, "v2": {
+        "id": f"id{seq}", "category": lane, "priority": 1, "coalesce_key": coalesce_key, "dedupe_key": "d"}}}
+
+
+def _expand(fields, cats, lanes):
+    # What web_overlay/websocket.js rebuilds from a compact event.
+    cat = fields[0]
+    message = {"category": cats[cat] if isinstance(cat, int) else cat, "data": fields[1]}
+    if len(fields) > 2:
+        message["meta"] = {"seq": fields[2], "v2": {"category": lanes[fields[3]], "coalesce_key": fields[4]}}
+    return message
+
+
+class _FakeRequest:
+    def __init__(self, path):
+        self.path = path
+
+
+class _FakeSocket:
+    def __init__(self, path):
+        self.request = _FakeRequest(path)
+        self.sent = []
+        self.closed = asyncio.Event()
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.sent.append(("close", code))
+
+    async def wait_closed(self):
+        await self.closed.wait()
+
+
+class CompactWireTests(unittest.TestCase):
+    def test_compact_batch_round_trips_to_the_json_shape(self):
+        events = [
+            WireEvent(_v2_message("hitmarker", {"x": 1}, 7, "cosmetic", "hitmarker:hm.png")),
+            WireEvent(_v2_message("stats", {"kd": 1.5}, 8, "state")),
+            WireEvent({"category": "not_in_table", "data": {"y": 2}}),
+        ]
+        hello = json.loads(compact_hello())
+        self.assertEqual((hello["k"], hello["proto"]), ("hello", "c1"))
+        batch = json.loads(compact_batch(events, tick_ts_ms=5))
+        self.assertEqual(batch["b"], 5)
+        self.assertEqual(batch["e"][0][:1], [WIRE_CATEGORIES.index("hitmarker")])
+        expanded = [_expand(f, hello["cats"], hello["lanes"]) for f in batch["e"]]
+        self.assertEqual(expanded[0], {"category": "hitmarker", "data": {"x": 1}, "meta": {
+            "seq": 7, "v2": {"category": "cosmetic", "coalesce_key": "hitmarker:hm.png"}}})
+        self.assertEqual(expanded[1]["meta"]["v2"]["category"], "state")
+        self.assertEqual(expanded[2], {"category": "not_in_table", "data": {"y": 2}})
+        self.assertLess(len(compact_batch(events, 5)), len(batch_envelope(events, 5)))
+
+    def test_replace_resets_compact_encodings(self):
+        event = WireEvent({"category": "event", "data": {"n": 1}})
+        first = event.compact
+        event.replace({"category": "event", "data": {"n": 2}})
+        self.assertNotEqual(event.compact, first)
+        self.assertEqual(json.loads(event.compact)[1], {"n": 2})
+
+    @unittest.skipIf(overlay_wire.msgpack is None, "msgpack not installed")
+    def test_msgpack_batch_matches_text_batch(self):
+        events = [WireEvent(_v2_message("event", {"n": i}, i, "normal")) for i in range(3)]
+        packed = overlay_wire.msgpack.unpackb(compact_batch(events, 9, packed=True))
+        self.assertEqual(packed, json.loads(compact_batch(events, 9)))
+        self.assertEqual(overlay_wire.msgpack.unpackb(compact_hello(packed=True))["lanes"], list(WIRE_LANES))
+
+    def test_negotiation_follows_query_and_settings(self):
+        server = OverlayServer()
+        self.assertEqual(server._negotiate_wire(""), (False, False))
+        self.assertEqual(server._negotiate_wire("proto=c1"), (True, False))
+        self.assertEqual(server._negotiate_wire("proto=c1&enc=msgpack"),
+                         (True, False))  # msgpack is off by default
+        server.set_ws_wire_options(msgpack=True)
+        self.assertEqual(server._negotiate_wire("proto=c1&enc=msgpack"),
+                         (True, overlay_wire.msgpack is not None))
+        server.set_ws_wire_options(compact=False)
+        self.assertEqual(server._negotiate_wire("proto=c1&enc=msgpack"), (False, False))
+
+    def test_legacy_mode_skips_json_without_json_clients(self):
+        server = OverlayServer()
+        server.set_event_pipeline_v2(False)
+        tasks = []
+        server.ws_loop = type("Loop", (), {"create_task": lambda _self, coro: tasks.append(coro)})()
+        server.is_running = True
+        compact_ws = object()
+        server.ws_clients = {compact_ws}
+        server._compact_clients = {compact_ws: False}
+        server._process_broadcast("stats", {"kd": 1.5}, 1000)
+        sent = []
+        with mock.patch.object(overlay_server.websockets, "broadcast",
+                               side_effect=lambda clients, msg: sent.append(msg)):
+            for coro in tasks:
+                asyncio.run(coro)
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(json.loads(sent[0])["e"][0][1]["kd"], 1.5)
+        self.assertIsNone(server._state_cache["stats"]._json)  # never encoded as JSON
+
+    def test_compact_and_json_clients_share_one_flush(self):
+        server = OverlayServer()
+        server.broadcast("stats", {"kd": 1.5})
+
+        async def scenario():
+            compact_ws = _FakeSocket("/better_planetside?proto=c1")
+            json_ws = _FakeSocket("/better_planetside")
+            bad_ws = _FakeSocket("/other?proto=c1")
+            tasks = [asyncio.ensure_future(server._ws_handler(ws)) for ws in (compact_ws, json_ws, bad_ws)]
+            await asyncio.sleep(0)
+            self.assertEqual(set(server._compact_clients), {compact_ws})
+            self.assertEqual(bad_ws.sent, [("close", 1008)])
+
+            server.broadcast("hitmarker", {"event_type": "hitmarker", "filename": "hm.png"})
+            sent = {}
+            with mock.patch.object(overlay_server.websockets, "broadcast",
+                                   side_effect=lambda clients, msg: sent.setdefault(tuple(clients), []).append(msg)):
+                await server._flush_pending_broadcasts()
+            compact_ws.closed.set()
+            json_ws.closed.set()
+            await asyncio.gather(*tasks)
+            return compact_ws, json_ws, sent
+
+        compact_ws, json_ws, sent = asyncio.run(scenario())
+        hello = json.loads(compact_ws.sent[0])
+        replay = json.loads(compact_ws.sent[1])
+        self.assertEqual(_expand(replay["e"][0], hello["cats"], hello["lanes"])["data"]["kd"], 1.5)
+        self.assertEqual(json.loads(json_ws.sent[0])["category"], "stats")
+
+        # Both clients see the stats update still pending from before they connected, then the
+        # hitmarker: JSON as one message each, compact as a single batch frame.
+        self.assertEqual(len(sent[(compact_ws,)]), 1)
+        flushed = json.loads(sent[(compact_ws,)][0])
+        self.assertEqual([_expand(f, hello["cats"], hello["lanes"])["category"] for f in flushed["e"]],
+                         ["stats", "hitmarker"])
+        self.assertEqual([json.loads(m)["category"] for m in sent[(json_ws,)]], ["stats", "hitmarker"])
+        self.assertFalse(server._compact_clients)
+        self.assertFalse(server.ws_clients)
+        self.assertGreater(server._metrics["wire_bytes_compact"], 0)
+        self.assertGreater(server._metrics["wire_bytes_json"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from dior_db import DatabaseHandler
+from player_cache import PlayerCache
+
+
+class PlayerCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "test.db")
+        self.db = DatabaseHandler(self.path)
+        self.db.upsert_players([
+            ("5428000000000000001", "Alpha", 1, 10, "AAA"),
+            ("5428000000000000002", "Bravo", 2, 20, ""),
+            ("5428000000000000003", "Charlie", 3, 30, "CCC"),
+        ]).result()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_lazy_lookup_and_negative_cache(self):
+        cache = PlayerCache(self.db, capacity=10)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.names.get("5428000000000000001"), "Alpha")
+        self.assertEqual(cache.outfits.get("5428000000000000001"), "AAA")
+        self.assertEqual(cache.stats["db_hits"], 1)
+        self.assertIn("5428000000000000003", cache.names)
+
+        self.assertEqual(cache.names.get("5428000000000000999", "Unknown"), "Unknown")
+        self.assertNotIn("5428000000000000999", cache.names)
+        self.assertEqual(cache.stats["db_misses"], 1)
+        self.assertNotIn("not-a-number", cache.names)
+
+        # Resolver fills it in: negative entry is dropped.
+        cache.names["5428000000000000999"] = "Delta"
+        cache.outfits["5428000000000000999"] = "DDD"
+        self.assertEqual(cache.names["5428000000000000999"], "Delta")
+        self.assertEqual(cache.outfits["5428000000000000999"], "DDD")
+
+    def test_lru_is_bounded(self):
+        cache = PlayerCache(self.db, capacity=2)
+        for cid in ("5428000000000000001", "5428000000000000002", "5428000000000000003"):
+            cache.names.get(cid)
+        self.assertEqual(len(cache), 2)
+        # Evicted entry is reloaded from the DB.
+        self.assertEqual(cache.names.get("5428000000000000001"), "Alpha")
+        self.assertEqual(cache.stats["db_hits"], 4)
+
+    def test_warm_loads_recent_players(self):
+        cache = PlayerCache(self.db, capacity=10)
+        self.assertEqual(cache.warm(2), 2)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.warm(0), 0)
+
+    def test_name_lookup_uses_index(self):
+        self.assertEqual(self.db.find_player_id("cHaRlIe"), "5428000000000000003")
+        self.assertIsNone(self.db.find_player_id("nobody"))
+        plan = self.db.pool.query("EXPLAIN QUERY PLAN SELECT character_id FROM player_cache WHERE name_lower=?", ("x",))
+        self.assertTrue(any("idx_player_cache_name_lower" in str(row) for row in plan))
+
+
+class PlayerCacheMigrationTests(unittest.TestCase):
+    def test_text_ids_are_migrated_to_integers(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        path = os.path.join(tmp, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute('''CREATE TABLE player_cache
+                        (character_id TEXT PRIMARY KEY, name TEXT, name_lower TEXT,
+                         faction_id INTEGER, world_id INTEGER, outfit_tag TEXT,
+                         battle_rank INTEGER, created_date TEXT, last_login TEXT,
+                         kills INTEGER, deaths INTEGER, score INTEGER, playtime INTEGER,
+                         m30_kills INTEGER, m30_deaths INTEGER, m30_score INTEGER, m30_time INTEGER)''')
+        conn.executemany("INSERT INTO player_cache (character_id, name, world_id, outfit_tag) VALUES (?, ?, ?, ?)",
+                         [("5428000000000000001", "Alpha", 10, "AAA"), ("junk", "Broken", 1, "")])
+        conn.commit()
+        conn.close()
+
+        db = DatabaseHandler(path)
+        self.addCleanup(db.close)
+        self.assertEqual(db.player_count(), 1)
+        self.assertEqual(db.lookup_player("5428000000000000001"), ("Alpha", "AAA"))
+        self.assertEqual(db.get_player_world("5428000000000000001"), 10)
+        self.assertEqual(db.find_player_id("alpha"), "5428000000000000001")
+        col_type = [r for r in db.pool.query("PRAGMA table_info(player_cache)") if r[1] == "character_id"][0][2]
+        self.assertEqual(col_type, "INTEGER")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from session_clock import SessionClock
+
+
+class _FakeTime:
+    def __init__(self, wall=5000.0):
+        self.wall = wall
+        self.mono = 0.0
+
+    def advance(self, seconds):
+        self.wall += seconds
+        self.mono += seconds
+
+
+class SessionClockTests(unittest.TestCase):
+    def setUp(self):
+        self.t = _FakeTime()
+        self.clock = SessionClock(wall=lambda: self.t.wall, monotonic=lambda: self.t.mono)
+
+    def test_now_is_wall_time_until_first_event(self):
+        self.assertEqual(self.clock.now(), 5000.0)
+
+    def test_now_follows_event_time(self):
+        self.assertEqual(self.clock.event_time({"timestamp": "1000"}), 1000.0)
+        self.t.advance(3)
+        self.assertEqual(self.clock.now(), 1003.0)
+        # Older events never move the clock back.
+        self.assertEqual(self.clock.event_time({"timestamp": "990"}), 990.0)
+        self.assertEqual(self.clock.now(), 1003.0)
+
+    def test_missing_timestamp_falls_back_to_now(self):
+        self.clock.event_time({"timestamp": "1000"})
+        self.assertEqual(self.clock.event_time({}), 1000.0)
+        self.assertEqual(self.clock.event_time({"timestamp": "bogus"}), 1000.0)
+
+    def test_intervals_ignore_processing_delay(self):
+        obj = {"start": 0, "acc_t": 0}
+        self.assertTrue(SessionClock.open_interval(obj, 1000.0))
+        # Login and logout processed a minute late in one batch: same result.
+        self.t.advance(60)
+        self.assertEqual(SessionClock.close_interval(obj, 1100.0), 100.0)
+        self.assertEqual(obj["start"], 0)
+        self.assertFalse(SessionClock.close_interval(obj, 1200.0))
+
+        SessionClock.open_interval(obj, 2000.0)
+        self.assertFalse(SessionClock.open_interval(obj, 1990.0))
+        self.assertEqual(obj["start"], 1990.0)
+        self.assertEqual(self.clock.active_seconds(obj, now=2010.0), 120.0)
+
+    def test_late_events_do_not_span_a_pause(self):
+        obj = {"start": 0, "acc_t": 0}
+        SessionClock.open_interval(obj, 100.0)
+        SessionClock.close_interval(obj, 200.0)
+        # Arrives after the logout was processed, no new login: stays paused.
+        self.assertFalse(SessionClock.open_interval(obj, 190.0))
+        self.assertEqual(self.clock.active_seconds(obj, now=1000.0), 100.0)
+
+        # Re-login, then a late event from the first interval: not widened over the gap.
+        self.assertTrue(SessionClock.open_interval(obj, 300.0))
+        self.assertFalse(SessionClock.open_interval(obj, 150.0))
+        self.assertEqual(obj["start"], 300.0)
+        self.assertEqual(self.clock.active_seconds(obj, now=310.0), 110.0)
+        # Late events after the pause still widen the open interval.
+        SessionClock.open_interval(obj, 250.0)
+        self.assertEqual(self.clock.active_seconds(obj, now=310.0), 160.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from db_migrations import SCHEMA_VERSION
+from dior_db import DatabaseHandler
+from session_journal import SessionJournal
+from session_stats import SessionStatsStore
+
+DAY = 86400
+NOW = 1_800_000_000
+CID = "5428000000000000001"
+
+
+class _FakeClock:
+    """Active time is whatever the test puts in `seconds[cid]`."""
+
+    def __init__(self):
+        self.seconds = {}
+
+    def now(self):
+        return 0.0
+
+    def active_seconds(self, obj, now=None):
+        return self.seconds.get(obj["id"], 0.0)
+
+
+class SessionJournalTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = DatabaseHandler(os.path.join(self.tmp, "test.db"))
+        self.store = SessionStatsStore()
+        self.clock = _FakeClock()
+        self.wall = [NOW]
+        self.journal = SessionJournal(self.db, lambda: self.store, lambda: [CID],
+                                      clock=self.clock, wall=lambda: self.wall[0])
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _rows(self):
+        self.db.pool.submit(lambda conn: None).result()  # wait for queued writes
+        return self.db.pool.query(
+            "SELECT kills, deaths, headshots, assists, revives, seconds FROM session_journal ORDER BY rowid")
+
+    def test_migration_creates_journal_table(self):
+        self.assertEqual(self.db.schema_version, SCHEMA_VERSION)
+        self.assertEqual(self._rows(), [])
+
+    def test_writes_only_changed_deltas(self):
+        row = self.store.create(CID)
+        row["k"] = 3
+        row["d"] = 1
+        self.clock.seconds[CID] = 60.0
+        self.assertEqual(self.journal.flush(), 1)
+        self.assertEqual(self.journal.flush(), 0)
+        row["k"] = 5
+        row["hs"] = 2
+        self.clock.seconds[CID] = 90.0
+        self.assertEqual(self.journal.flush(), 1)
+        self.assertEqual(self._rows(), [(3, 1, 0, 0, 0, 60.0), (2, 0, 2, 0, 0, 30.0)])
+
+    def test_sub_second_time_is_carried_to_the_next_sample(self):
+        self.store.create(CID)
+        self.clock.seconds[CID] = 0.6
+        self.assertEqual(self.journal.flush(), 0)
+        self.clock.seconds[CID] = 1.2
+        self.assertEqual(self.journal.flush(), 1)
+        self.assertAlmostEqual(self._rows()[0][5], 1.2)
+
+    def test_server_switch_neither_double_counts_nor_loses_stats(self):
+        row = self.store.create(CID)
+        row["k"] = 4
+        self.journal.flush()
+        # switch_server carries the active character over into the new store.
+        self.store = SessionStatsStore()
+        self.store[CID] = {"k": 4}
+        self.assertEqual(self.journal.flush(), 0)
+        # A fresh row (counters back at zero) starts a new baseline.
+        self.store = SessionStatsStore()
+        self.store.create(CID)["k"] = 1
+        self.assertEqual(self.journal.flush(), 1)
+        self.assertEqual([r[0] for r in self._rows()], [4, 1])
+
+    def test_summary_covers_the_requested_window(self):
+        self.db.append_journal([
+            (CID, NOW - 10 * DAY, 100, 10, 0, 0, 0, 600.0),
+            (CID, NOW - DAY, 30, 6, 10, 2, 2, 1200.0),
+            (CID, NOW, 10, 4, 2, 0, 2, 600.0),
+        ]).result()
+        week = self.journal.summary(CID, days=7)
+        self.assertEqual(week["k"], 40)
+        self.assertAlmostEqual(week["kpm"], 40 / 30.0)
+        self.assertAlmostEqual(week["kd"], 40 / 6)
+        self.assertAlmostEqual(self.journal.summary(CID, kd_mode_revive=False)["kd"], 4.0)
+        self.assertEqual(self.journal.summary("5428000000000000002")["seconds"], 0)
+
+    def test_stop_flushes_pending_deltas(self):
+        self.journal.start()
+        self.store.create(CID)["k"] = 2
+        self.journal.stop()
+        self.assertEqual(self._rows()[0][0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
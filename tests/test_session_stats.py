@@ -0,0 +1,76 @@
+import unittest
+
+import session_stats
+from session_stats import SessionStatsStore
+
+
+class SessionStatsStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = SessionStatsStore()
+
+    def test_view_behaves_like_stats_dict(self):
+        obj = self.store.create("1", name="Alice", faction="VS", world_id=10)
+        obj["k"] += 2
+        obj["last_seen_base"] = "The Crown"
+        obj["custom"] = 5
+
+        again = self.store.get("1")
+        self.assertEqual(again["k"], 2)
+        self.assertEqual(again["world_id"], "10")
+        self.assertEqual(again.get("custom"), 5)
+        self.assertEqual(again.get("missing", "x"), "x")
+        snapshot = dict(again)
+        self.assertEqual(snapshot["id"], "1")
+        self.assertEqual(snapshot["name"], "Alice")
+        self.assertIsNone(self.store.get("2"))
+
+    def test_setitem_restores_preserved_copy(self):
+        obj = self.store.create("1", name="Alice")
+        obj["k"] = 7
+        preserved = dict(obj)
+        preserved["world_id"] = "17"
+
+        fresh = SessionStatsStore()
+        fresh["1"] = preserved
+        self.assertEqual(fresh["1"]["k"], 7)
+        self.assertEqual(fresh["1"]["world_id"], "17")
+
+    def _fill(self):
+        for cid, world, k, d, rev in (
+            ("1", "10", 5, 4, 2),
+            ("2", "10", 9, 1, 0),
+            ("3", "1", 50, 0, 0),
+            ("4", "10", 1, 3, 5),
+        ):
+            obj = self.store.create(cid, name=f"P{cid}", world_id=world, start=1000.0)
+            obj["k"], obj["d"], obj["revives_received"] = k, d, rev
+
+    def _check_leaderboard(self):
+        self._fill()
+        board = self.store.leaderboard("10", {"1", "2", "3"}, kd_mode_revive=True, now=1060.0)
+        self.assertEqual([p["id"] for p in board], ["2", "1"])
+        self.assertEqual(board[1]["d"], 2)
+        self.assertEqual(board[0]["active_min"], 1.0)
+
+        board = self.store.leaderboard("10", {"1", "2", "4"}, kd_mode_revive=False, now=1000.0, limit=2)
+        self.assertEqual([(p["id"], p["d"]) for p in board], [("2", 1), ("1", 4)])
+        self.assertEqual(board[0]["active_min"], 0.5)
+
+        totals = self.store.totals(["1", "2", "missing"])
+        self.assertEqual(totals["k"], 14)
+        self.assertEqual(totals["revives_received"], 2)
+
+    def test_leaderboard_and_totals(self):
+        self._check_leaderboard()
+
+    def test_leaderboard_without_numpy(self):
+        saved = session_stats.np
+        session_stats.np = None
+        try:
+            self._check_leaderboard()
+        finally:
+            session_stats.np = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the Census duplicate filter.
+
+Simulates a steady event rate (default 2000 events/s of payload time, with a
+share of exact duplicates like the push service sends, some of them
+seconds late as after a reconnect) and reports the
+per-message cost of the time-windowed dedupe next to the previous
+set + list implementation.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Allow running from repo root or directly from tools/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from census_dedupe import TimeWindowDedupe
+
+
+def build_stream(rate, seconds, dup_ratio, dup_lookback_s, seed=1):
+    rng = random.Random(seed)
+    stream = []
+    base_ts = 1_700_000_000
+    for sec in range(seconds):
+        ts = str(base_ts + sec)
+        for _ in range(rate):
+            if stream and rng.random() < dup_ratio:
+                back = rng.randrange(1, max(2, int(dup_lookback_s * rate)))
+                stream.append(stream[max(0, len(stream) - back)])
+                continue
+            if rng.random() < 0.8:
+                stream.append({
+                    "event_name": "GainExperience",
+                    "timestamp": ts,
+                    "character_id": str(5428000000000000000 + rng.randrange(20000)),
+                    "experience_id": str(rng.choice((1, 2, 4, 7, 36, 51))),
+                    "other_id": str(5428000000000000000 + rng.randrange(20000)),
+                })
+            else:
+                stream.append({
+                    "event_name": "Death",
+                    "timestamp": ts,
+                    "character_id": str(5428000000000000000 + rng.randrange(20000)),
+                    "attacker_character_id": str(5428000000000000000 + rng.randrange(20000)),
+                    "attacker_weapon_id": str(rng.randrange(1, 9000)),
+                })
+    return stream
+
+
+def legacy_filter(stream):
+    """The previous processor() implementation (f-string UID, list.pop(0))."""
+    event_cache = set()
+    event_history = []
+    dupes = 0
+    for p in stream:
+        e_name = p.get("event_name")
+        if e_name == "GainExperience":
+            uid = f"EXP_{p.get('timestamp')}_{p.get('character_id')}_{p.get('experience_id')}_{p.get('other_id')}"
+        else:
+            uid = f"DTH_{p.get('timestamp')}_{p.get('character_id')}_{p.get('attacker_character_id')}_{p.get('attacker_weapon_id')}"
+        if uid in event_cache:
+            dupes += 1
+            continue
+        event_cache.add(uid)
+        event_history.append(uid)
+        if len(event_history) > 1000:
+            event_cache.discard(event_history.pop(0))
+    return dupes
+
+
+def windowed_filter(stream, window_s, max_entries):
+    d = TimeWindowDedupe(window_s=window_s, max_entries=max_entries)
+    for p in stream:
+        d.seen_payload(p)
+    return d.duplicates
+
+
+def bench(fn, stream, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(stream)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the Census dedupe filter.")
+    ap.add_argument("--rate", type=int, default=2000, help="Events per second of payload time")
+    ap.add_argument("--seconds", type=int, default=60, help="Seconds of payload time to simulate")
+    ap.add_argument("--dup-ratio", type=float, default=0.05, help="Share of exact duplicates")
+    ap.add_argument("--dup-lookback", type=float, default=5.0,
+                    help="Duplicates repeat an event from up to N seconds earlier")
+    ap.add_argument("--window", type=int, default=30, help="Dedupe window in seconds")
+    ap.add_argument("--max-entries", type=int, default=65536, help="Hard cap of remembered keys")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best is reported)")
+    args = ap.parse_args()
+
+    stream = build_stream(args.rate, args.seconds, args.dup_ratio, args.dup_lookback)
+    n = len(stream)
+    print(f"events: {n} ({args.rate}/s for {args.seconds}s, dup_ratio={args.dup_ratio}, "
+          f"dup_lookback={args.dup_lookback}s)")
+
+    rows = [
+        ("legacy set+list (1000 entries)", lambda s: legacy_filter(s)),
+        (f"time window ({args.window}s, cap {args.max_entries})",
+         lambda s: windowed_filter(s, args.window, args.max_entries)),
+    ]
+    for label, fn in rows:
+        elapsed, dupes = bench(fn, stream, args.repeat)
+        per_msg_us = elapsed / n * 1e6
+        budget_pct = per_msg_us * args.rate / 1e6 * 100.0
+        print(f"{label}: {per_msg_us:.2f} us/msg, duplicates caught={dupes}, "
+              f"cpu at {args.rate}/s={budget_pct:.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
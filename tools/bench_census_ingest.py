@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Census ingest throughput benchmark.
+
+Pushes synthetic (and optionally recorded) Death / GainExperience / Login
+payload mixes through the CensusWorker apply stage (apply queue ->
+_apply_payload -> _handle_death / _handle_experience) against the headless
+controller stub and reports events/s, p50/p99 per-event latency and
+allocations per event. With --baseline, exits non-zero when a mix regresses
+by more than --tolerance.
+
+Examples:
+    python tools/bench_census_ingest.py
+    python tools/bench_census_ingest.py --recording census_recordings
+    python tools/bench_census_ingest.py --save-baseline
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# Allow running from repo root or directly from tools/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from census_pipeline import decode_census_frames
+from census_recorder import iter_recording
+from census_worker import CensusWorker
+
+try:
+    from tools.census_harness import HeadlessController
+except ImportError:  # Run directly from tools/
+    from census_harness import HeadlessController
+
+
+DEFAULT_BASELINE = os.path.join(ROOT, "tools", "census_ingest_baseline.json")
+
+MY_ID = "5428000000000000001"
+MY_CHARS = {"Bench": MY_ID}
+WORLD_ID = "10"
+
+# Share of Death / GainExperience / PlayerLogin+Logout per mix.
+MIXES = {
+    "mixed": (0.25, 0.70, 0.05),
+    "death_heavy": (0.70, 0.28, 0.02),
+    "xp_heavy": (0.05, 0.94, 0.01),
+    "login_storm": (0.10, 0.40, 0.50),
+}
+
+XP_IDS = ("1", "2", "4", "5", "7", "36", "51", "53", "371", "372", "1393")
+WEAPONS = {
+    "7214": {"name": "Gauss SAW", "type": "LMG"},
+    "80": {"name": "Orion", "type": "LMG"},
+    "1": {"name": "Knife", "type": "Knife"},
+    "432": {"name": "Frag", "type": "Grenade"},
+}
+
+
+def build_payloads(mix, count, players=4000, own_ratio=0.01, seed=1):
+    """Synthetic payload stream: ~`players` active players on one world, 400 events/s of event time."""
+    p_death, p_xp, _p_login = MIXES[mix]
+    rng = random.Random(seed)
+    ids = [str(5428000000000001000 + i) for i in range(players)]
+    weapons = list(WEAPONS)
+    base_ts = 1_700_000_000
+    out = []
+    for i in range(count):
+        ts = str(base_ts + i // 400)
+        actor = MY_ID if rng.random() < own_ratio else rng.choice(ids)
+        other = rng.choice(ids)
+        team, other_team = rng.choice(("1", "2", "3")), rng.choice(("1", "2", "3"))
+        roll = rng.random()
+        if roll < p_death:
+            if rng.random() < 0.5:
+                actor, other = other, actor
+            out.append({
+                "event_name": "Death", "timestamp": ts, "world_id": WORLD_ID, "zone_id": "2",
+                "character_id": other, "attacker_character_id": actor,
+                "team_id": other_team, "attacker_team_id": team,
+                "attacker_weapon_id": rng.choice(weapons), "attacker_loadout_id": str(rng.randrange(1, 32)),
+                "character_loadout_id": str(rng.randrange(1, 32)),
+                "is_headshot": "1" if rng.random() < 0.3 else "0", "attacker_vehicle_id": "0",
+            })
+        elif roll < p_death + p_xp:
+            out.append({
+                "event_name": "GainExperience", "timestamp": ts, "world_id": WORLD_ID, "zone_id": "2",
+                "character_id": actor, "other_id": other, "team_id": team,
+                "experience_id": rng.choice(XP_IDS), "amount": "10", "loadout_id": str(rng.randrange(1, 32)),
+            })
+        else:
+            # Untracked characters only: a tracked login starts a REST lookup.
+            out.append({
+                "event_name": rng.choice(("PlayerLogin", "PlayerLogout")), "timestamp": ts,
+                "world_id": WORLD_ID, "character_id": rng.choice(ids),
+            })
+    return out
+
+
+def load_recorded_payloads(paths, limit=0):
+    frames = [frame for _ts, frame in iter_recording(paths)]
+    payloads = decode_census_frames(frames)
+    return payloads[:limit] if limit else payloads
+
+
+def make_worker():
+    controller = HeadlessController(world_id=WORLD_ID, char_data=MY_CHARS, item_db=WEAPONS)
+    controller.current_character_id = MY_ID
+    worker = CensusWorker(controller, "bench")
+    return controller, worker
+
+
+def run_timed(payloads):
+    """Same hand-off as CensusWorker.processor(), run inline and timed per event."""
+    controller, worker = make_worker()
+    q = worker.apply_queue
+    apply = worker._apply_payload
+    tracked = worker.tracked_ids
+    ingest_class = worker._ingest_class
+    latencies = []
+    errors = 0
+    perf = time.perf_counter
+
+    # Like timeit: keep collector pauses out of the per-event numbers.
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        t_start = perf()
+        for p in payloads:
+            protected, key = ingest_class(p, tracked)
+            q.put(p, protected=protected, coalesce_key=key)
+            item = q.get(timeout=0)
+            t0 = perf()
+            try:
+                apply(item)
+            except Exception:
+                errors += 1
+            latencies.append(perf() - t0)
+        elapsed = perf() - t_start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return elapsed, latencies, errors, controller
+
+
+def run_alloc(payloads):
+    _controller, worker = make_worker()
+    apply = worker._apply_payload
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        blocks_before = sys.getallocatedblocks()
+        for p in payloads:
+            try:
+                apply(p)
+            except Exception:
+                pass
+        blocks_after = sys.getallocatedblocks()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    n = max(1, len(payloads))
+    return {
+        "retained_bytes_per_event": round((after - before) / n, 1),
+        "peak_bytes_per_event": round((peak - before) / n, 1),
+        "blocks_per_event": round((blocks_after - blocks_before) / n, 2),
+    }
+
+
+def percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(round(pct / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+def bench_mix(name, payloads, repeat, alloc_events):
+    best = None
+    for _ in range(repeat):
+        elapsed, latencies, errors, controller = run_timed(payloads)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, latencies, errors, controller)
+    elapsed, latencies, errors, controller = best
+    latencies.sort()
+    result = {
+        "events": len(payloads),
+        "events_per_s": round(len(payloads) / elapsed, 1),
+        "p50_us": round(percentile(latencies, 50) * 1e6, 2),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 2),
+        "max_us": round(latencies[-1] * 1e6, 2) if latencies else 0.0,
+        "errors": errors,
+        "players": len(controller.session_stats),
+    }
+    result.update(run_alloc(payloads[:alloc_events]))
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of regression messages (empty = pass)."""
+    failures = []
+    for name, cur in results.items():
+        base = (baseline.get("mixes") or {}).get(name)
+        if not base:
+            continue
+        if cur["events_per_s"] < base["events_per_s"] * (1.0 - tolerance):
+            failures.append(f"{name}: events/s {cur['events_per_s']} < baseline {base['events_per_s']}")
+        if cur["p99_us"] > base["p99_us"] * (1.0 + tolerance):
+            failures.append(f"{name}: p99 {cur['p99_us']}us > baseline {base['p99_us']}us")
+        base_alloc = base.get("peak_bytes_per_event")
+        if base_alloc is not None and cur["peak_bytes_per_event"] > base_alloc * (1.0 + tolerance) + 64:
+            failures.append(
+                f"{name}: peak bytes/event {cur['peak_bytes_per_event']} > baseline {base_alloc}"
+            )
+        if cur["errors"] > base.get("errors", 0):
+            failures.append(f"{name}: {cur['errors']} handler errors (baseline {base.get('errors', 0)})")
+    return failures
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the Census apply stage on synthetic/recorded payload mixes.")
+    ap.add_argument("--events", type=int, default=20000, help="Synthetic events per mix")
+    ap.add_argument("--mix", action="append", choices=sorted(MIXES), help="Mix to run (repeatable, default all)")
+    ap.add_argument("--recording", action="append", help="Recording file/dir to add as the 'recorded' mix")
+    ap.add_argument("--repeat", type=int, default=5, help="Timed runs per mix (best is reported)")
+    ap.add_argument("--alloc-events", type=int, default=5000, help="Events per mix for the tracemalloc pass")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    ap.add_argument("--no-compare", action="store_true", help="Only report, never fail")
+    ap.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    ap.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = ap.parse_args()
+
+    mixes = {name: build_payloads(name, args.events) for name in (args.mix or sorted(MIXES))}
+    if args.recording:
+        mixes["recorded"] = load_recorded_payloads(args.recording)
+
+    results = {}
+    for name, payloads in mixes.items():
+        results[name] = bench_mix(name, payloads, max(1, args.repeat), args.alloc_events)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'mix':<12} {'events':>7} {'ev/s':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>9} "
+              f"{'B/ev peak':>9} {'B/ev kept':>9} {'err':>4}")
+        for name, r in results.items():
+            print(f"{name:<12} {r['events']:>7} {r['events_per_s']:>10.0f} {r['p50_us']:>8.2f} {r['p99_us']:>8.2f} "
+                  f"{r['max_us']:>9.1f} {r['peak_bytes_per_event']:>9.0f} {r['retained_bytes_per_event']:>9.0f} "
+                  f"{r['errors']:>4}")
+
+    if args.save_baseline:
+        doc = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "events_per_mix": args.events,
+            "mixes": {k: v for k, v in results.items() if k != "recorded"},
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if args.no_compare or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    failures = compare(results, baseline, args.tolerance)
+    if failures:
+        print("REGRESSION:")
+        for msg in failures:
+            print(f"  - {msg}")
+        return 1
+    print(f"OK: within {int(args.tolerance * 100)}% of baseline ({os.path.basename(args.baseline)})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Player DB lookup benchmark: legacy schema vs. migrated schema.
+
+Builds a throwaway ps2_master.db in the pre-versioning layout (TEXT
+character IDs, primary keys only), times the lookups the client does
+(by ID, by name, population by world/faction), then runs the schema
+migrations through DatabaseHandler and times the same lookups again.
+
+Example:
+    python tools/bench_db_lookup.py --players 200000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Allow running from repo root or directly from tools/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from db_migrations import schema_version
+from dior_db import DatabaseHandler
+
+WORLDS = (1, 10, 13, 17, 19, 40)
+FACTIONS = (1, 2, 3, 4)
+
+QUERIES = {
+    "by_id": "SELECT name, outfit_tag FROM player_cache WHERE character_id=?",
+    "by_name": "SELECT character_id FROM player_cache WHERE name_lower=?",
+    "world_faction": "SELECT COUNT(*) FROM player_cache WHERE world_id=? AND faction_id=?",
+}
+
+
+def build_legacy_db(path, players, seed=1):
+    """Pre-versioning layout: TEXT keys, no secondary indexes. Returns the sample (id, name) pairs."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE player_cache
+                    (character_id TEXT PRIMARY KEY, name TEXT, name_lower TEXT,
+                     faction_id INTEGER, world_id INTEGER, outfit_tag TEXT,
+                     battle_rank INTEGER, created_date TEXT, last_login TEXT,
+                     kills INTEGER, deaths INTEGER, score INTEGER, playtime INTEGER,
+                     m30_kills INTEGER, m30_deaths INTEGER, m30_score INTEGER, m30_time INTEGER)''')
+    conn.execute("CREATE TABLE my_chars (character_id TEXT PRIMARY KEY, name TEXT)")
+    rows = []
+    for i in range(players):
+        cid = str(5428000000000000000 + rng.randrange(10 ** 15))
+        name = f"Player{i}x{rng.randrange(10 ** 6)}"
+        rows.append((cid, name, name.lower(), rng.choice(FACTIONS), rng.choice(WORLDS),
+                     rng.choice(("", "DIOR", "TAG", "BRB")), rng.randrange(1, 121)))
+    conn.executemany("""INSERT OR IGNORE INTO player_cache
+                        (character_id, name, name_lower, faction_id, world_id, outfit_tag, battle_rank)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+    conn.commit()
+    conn.close()
+    return [(cid, name) for cid, name, *_rest in rng.sample(rows, min(len(rows), 2000))]
+
+
+def time_queries(path, sample, lookups, integer_ids, seed=2):
+    """Returns {query: {"us_per_op": float, "plan": str}} on a fresh connection."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    results = {}
+    for name, sql in QUERIES.items():
+        params = []
+        for _ in range(lookups):
+            cid, pname = rng.choice(sample)
+            if name == "by_id":
+                params.append((int(cid) if integer_ids else cid,))
+            elif name == "by_name":
+                params.append((pname.lower(),))
+            else:
+                params.append((rng.choice(WORLDS), rng.choice(FACTIONS)))
+        plan = " / ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params[0]))
+        # Full-scan queries are slow on a legacy DB; cap their repetitions.
+        reps = params if name == "by_id" else params[:max(1, lookups // 20)]
+        t0 = time.perf_counter()
+        for p in reps:
+            conn.execute(sql, p).fetchall()
+        elapsed = time.perf_counter() - t0
+        results[name] = {"us_per_op": round(elapsed / len(reps) * 1e6, 2), "plan": plan}
+    conn.close()
+    return results
+
+
+def run(players, lookups, workdir=None):
+    tmp = workdir or tempfile.mkdtemp(prefix="bench_db_")
+    path = os.path.join(tmp, "ps2_master.db")
+    try:
+        sample = build_legacy_db(path, players)
+        before = time_queries(path, sample, lookups, integer_ids=False)
+        size_before = os.path.getsize(path)
+
+        t0 = time.perf_counter()
+        db = DatabaseHandler(path)
+        migrate_s = time.perf_counter() - t0
+        version = db.schema_version
+        db.compact()
+        db.close()
+
+        after = time_queries(path, sample, lookups, integer_ids=True)
+        conn = sqlite3.connect(path)
+        assert schema_version(conn) == version
+        conn.close()
+        return {
+            "players": players,
+            "schema_version": version,
+            "migrate_s": round(migrate_s, 3),
+            "size_before_mb": round(size_before / 1048576, 2),
+            "size_after_mb": round(os.path.getsize(path) / 1048576, 2),
+            "before": before,
+            "after": after,
+        }
+    finally:
+        if workdir is None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Time player DB lookups before and after the schema migrations.")
+    ap.add_argument("--players", type=int, default=100000)
+    ap.add_argument("--lookups", type=int, default=5000)
+    ap.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = ap.parse_args()
+
+    report = run(args.players, args.lookups)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['players']:,} players; migrated to v{report['schema_version']} in {report['migrate_s']:.2f}s; "
+          f"file {report['size_before_mb']} MB -> {report['size_after_mb']} MB")
+    print(f"{'query':<14} {'before us':>10} {'after us':>10} {'speedup':>8}  plan after")
+    for name in QUERIES:
+        b, a = report["before"][name], report["after"][name]
+        speedup = b["us_per_op"] / a["us_per_op"] if a["us_per_op"] else float("inf")
+        print(f"{name:<14} {b['us_per_op']:>10.2f} {a['us_per_op']:>10.2f} {speedup:>7.1f}x  {a['plan']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+OverlayServer.broadcast() producer-cost microbenchmark.
+
+Times the calling thread's cost per broadcast() for a burst of overlay
+messages (hitmarkers, killfeed events, state updates) in two setups:
+
+  inline  - no WS loop, so the whole pipeline (normalize, dedupe, lanes,
+            metrics) runs on the caller; this is what every call cost
+            before the intake queue
+  queued  - a running WS loop; the caller only appends to the intake and
+            the loop thread does the rest
+
+No sockets are opened: a fake client makes the flush path run, and the
+send itself is a no-op.
+
+Example:
+    python tools/bench_overlay_broadcast.py --events 50000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+# Allow running from repo root or directly from tools/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from overlay_server import OverlayServer
+
+
+def build_messages(count):
+    """A burst mix: mostly hitmarkers, some killfeed events, a few state updates."""
+    messages = []
+    for i in range(count):
+        r = i % 10
+        if r < 6:
+            messages.append(("event", {"event_type": "hitmarker", "filename": "hitmarker.png", "n": i}))
+        elif r < 9:
+            messages.append(("killfeed", {"html": f"<span style='color:#f00'>Player{i}</span> [HS] Enemy{i}",
+                                          "event_type": "kill", "n": i}))
+        else:
+            messages.append(("stats", {"kd": 1.5, "kpm": 0.9, "kills": i}))
+    return messages
+
+
+def _server():
+    server = OverlayServer()
+    server._dedupe_window_ms = 0  # Every message reaches the lanes.
+
+    async def discard(_message):
+        return None
+
+    server._ws_broadcast = discard
+    return server
+
+
+def time_calls(server, messages):
+    t0 = time.perf_counter()
+    for category, data in messages:
+        server.broadcast(category, data)
+    return time.perf_counter() - t0
+
+
+def bench_inline(messages, frame=100):
+    server = _server()
+    elapsed = 0.0
+    for start in range(0, len(messages), frame):
+        elapsed += time_calls(server, messages[start:start + frame])
+        # Untimed flush between frames, as the WS loop would do, so queues stay realistic.
+        asyncio.run(server._flush_pending_broadcasts())
+    return {"us_per_call": round(elapsed / len(messages) * 1e6, 3),
+            "events_in": server._metrics["events_in_total"]}
+
+
+def bench_queued(messages, timeout=30.0):
+    server = _server()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="Bench-WS-Loop", daemon=True)
+    thread.start()
+    server.ws_loop = loop
+    server.is_running = True
+    server.ws_clients = {object()}
+    try:
+        elapsed = time_calls(server, messages)
+        t0 = time.perf_counter()
+        deadline = t0 + timeout
+        while server._intake or server._metrics["events_in_total"] < len(messages):
+            if time.perf_counter() > deadline:
+                break
+            time.sleep(0.001)
+        drained = time.perf_counter() - t0
+        return {"us_per_call": round(elapsed / len(messages) * 1e6, 3),
+                "drain_after_s": round(drained, 4),
+                "events_in": server._metrics["events_in_total"],
+                "max_pending_intake": server._metrics["max_pending_intake"]}
+    finally:
+        server.is_running = False
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(2.0)
+        loop.close()
+
+
+def run(events):
+    messages = build_messages(events)
+    return {"events": events, "inline": bench_inline(messages), "queued": bench_queued(messages)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Time the caller-side cost of OverlayServer.broadcast().")
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = ap.parse_args()
+
+    report = run(args.events)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    inline, queued = report["inline"], report["queued"]
+    print(f"{report['events']:,} broadcast() calls")
+    print(f"inline (caller runs pipeline): {inline['us_per_call']:.2f} us/call")
+    print(f"queued (loop runs pipeline):   {queued['us_per_call']:.2f} us/call; "
+          f"loop caught up {queued['drain_after_s'] * 1000:.1f} ms after the burst, "
+          f"peak intake {queued['max_pending_intake']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
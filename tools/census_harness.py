@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Headless controller stub for driving CensusWorker without the Qt GUI.
+
+Provides the attributes and callbacks CensusWorker reads from the client
+(config, session_stats, name_cache, item_db, streak state, ...) with no-op
+UI hooks, and counts the overlay events the worker would have fired.
+Used by the Census replay and benchmark tools.
+"""
+
+import os
+import sys
+from collections import Counter
+
+# Allow running from repo root or directly from tools/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from session_clock import SessionClock
+from session_stats import SessionStatsStore
+
+
+class HeadlessController:
+    def __init__(self, world_id="10", char_data=None, config=None, item_db=None, quiet=True):
+        self.config = dict(config or {})
+        self.char_data = dict(char_data or {})
+        self.current_world_id = str(world_id)
+        self.current_character_id = ""
+        self.last_tracked_id = ""
+        self.current_selected_char_name = ""
+        self.session_stats = SessionStatsStore()
+        self.session_clock = SessionClock()
+        self.active_players = {}
+        self.name_cache = {}
+        self.outfit_cache = {}
+        self.item_db = dict(item_db or {})
+        self.name_resolver = None
+        self.overlay_win = None
+        self.needs_reconnect = False
+        self.kd_mode_revive = True
+
+        # Streak / state fields the Census handlers read and write.
+        self.killstreak_count = 0
+        self.kill_counter = 0
+        self.streak_factions = []
+        self.streak_slot_map = []
+        self.saved_streak = 0
+        self.saved_factions = []
+        self.saved_slots = []
+        self.streak_timeout = 12.0
+        self.last_kill_time = 0
+        self.is_dead = False
+        self.was_revived = False
+        self.is_tk_death = False
+        self.myTeamId = 0
+        self.myWorldID = 0
+        self.currentZone = 0
+
+        self.quiet = quiet
+        self.logs = []
+        self.overlay_events = Counter()
+        self.voice_events = Counter()
+        self.server_switches = 0
+
+    # --- Client callbacks ---------------------------------------------------
+    def add_log(self, text):
+        self.logs.append(text)
+        if not self.quiet:
+            print(text)
+
+    def trigger_overlay_event(self, name, *args, **kwargs):
+        self.overlay_events[name] += 1
+
+    def trigger_auto_voice(self, key, *args, **kwargs):
+        self.voice_events[key] += 1
+
+    def reset_streak_state(self):
+        self.killstreak_count = 0
+        self.kill_counter = 0
+        self.streak_factions = []
+        self.streak_slot_map = []
+
+    def hide_streak_display(self):
+        pass
+
+    def update_streak_display(self):
+        pass
+
+    def update_discord_presence(self):
+        pass
+
+    def clear_discord_presence(self):
+        pass
+
+    def _get_random_slot(self):
+        return len(self.streak_slot_map)
+
+    def get_server_name_by_id(self, world_id):
+        return f"World {world_id}"
+
+    def switch_server(self, name, new_id):
+        self.server_switches += 1
+        self.current_world_id = str(new_id)
+
+    def _ensure_session_stats_entry(self, cid, name=None, start=None):
+        if start is None:
+            start = self.session_clock.now()
+        return self.session_stats.create(
+            cid, name=name or "Searching...", world_id=self.current_world_id,
+            start=start, last_kill_time=start,
+        )
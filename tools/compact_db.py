@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+One-shot compaction of the player database (ps2_master.db).
+
+Expires players not seen for --retention-days (own characters are kept),
+rebuilds the file with VACUUM (switching it to incremental auto-vacuum so
+the app can keep it small afterwards) and truncates the WAL. Run it while
+the client is closed.
+
+Example:
+    python tools/compact_db.py --retention-days 60
+"""
+
+import argparse
+import os
+import sys
+
+# Allow running from repo root or directly from tools/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from db_maintenance import DatabaseMaintenance
+from dior_db import DatabaseHandler
+from dior_utils import DB_PATH
+
+
+def describe(stats):
+    return (f"{stats['size_bytes'] / 1048576:.1f} MB ({stats['free_bytes'] / 1048576:.1f} MB free), "
+            f"{stats['players']:,} players, {stats['my_chars']} own chars")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Expire old players and VACUUM the player database.")
+    ap.add_argument("--db", default=DB_PATH, help="Database file (default: the client's ps2_master.db)")
+    ap.add_argument("--retention-days", type=int, default=90, help="Drop players not seen for this many days (0 = keep all)")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No database at {args.db}")
+        return 1
+
+    db = DatabaseHandler(args.db)
+    try:
+        maintenance = DatabaseMaintenance(db, retention_days=args.retention_days, log=lambda _msg: None)
+        before, after = maintenance.compact()
+    finally:
+        db.close()
+    print(f"Before: {describe(before)}")
+    print(f"After:  {describe(after)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Census push replay.
+
+Serves frames captured by the Census recorder (census_record config flag,
+files in census_recordings/) from a local stand-in websocket server and runs
+a headless CensusWorker against it, so the full ingest -> apply pipeline can
+be exercised offline at 1x, 10x or max speed.
+
+Example:
+    python tools/replay_census.py census_recordings --speed 10 --char Me=5428013610525658449
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import websockets
+
+# Allow running from repo root or directly from tools/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from census_recorder import iter_recording
+from census_worker import CensusWorker
+
+try:
+    from tools.census_harness import HeadlessController
+except ImportError:  # Run directly from tools/
+    from census_harness import HeadlessController
+
+
+def load_frames(paths, max_frames=0):
+    frames = []
+    for ts, frame in iter_recording(paths):
+        frames.append((ts, frame))
+        if max_frames and len(frames) >= max_frames:
+            break
+    return frames
+
+
+class ReplayServer:
+    """Local stand-in for the push endpoint: accepts (and ignores) subscribes, then plays frames."""
+
+    def __init__(self, frames, speed):
+        self.frames = frames
+        self.speed = float(speed)
+        self.sent = 0
+        self.done = asyncio.Event()
+        self.started_at = None
+        self.finished_at = None
+
+    async def handler(self, websocket):
+        drain = asyncio.create_task(self._drain(websocket))
+        try:
+            if self.sent == 0:
+                await self._play(websocket)
+            await websocket.wait_closed()
+        finally:
+            drain.cancel()
+
+    async def _drain(self, websocket):
+        async for _msg in websocket:
+            pass
+
+    async def _play(self, websocket):
+        loop = asyncio.get_running_loop()
+        self.started_at = time.perf_counter()
+        if not self.frames:
+            self.finished_at = self.started_at
+            self.done.set()
+            return
+        t0_rec = self.frames[0][0]
+        t0_loop = loop.time()
+        for ts, frame in self.frames:
+            if self.speed > 0:
+                delay = (ts - t0_rec) / self.speed - (loop.time() - t0_loop)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await websocket.send(frame)
+            self.sent += 1
+            if self.speed <= 0 and self.sent % 256 == 0:
+                await asyncio.sleep(0)  # Let the socket flush at max speed.
+        self.finished_at = time.perf_counter()
+        self.done.set()
+
+
+def parse_chars(values):
+    chars = {}
+    for item in values or ():
+        name, _, cid = item.partition("=")
+        if cid:
+            chars[name] = cid
+    return chars
+
+
+async def wait_drained(worker, timeout_s):
+    """Waits until every pipeline stage is empty (or timeout)."""
+    deadline = time.perf_counter() + timeout_s
+    stable = 0
+    last = -1
+    while time.perf_counter() < deadline:
+        stats = worker.get_pipeline_stats()
+        busy = stats["raw_depth"] + stats["decode_inflight"] + stats["apply"]["depth"]
+        applied = stats["stages"]["apply"]["events"]
+        stable = stable + 1 if (busy == 0 and applied == last) else 0
+        if stable >= 3:
+            return True
+        last = applied
+        await asyncio.sleep(0.1)
+    return False
+
+
+async def run_replay(args):
+    frames = load_frames(args.paths, args.max_frames)
+    if not frames:
+        print("No frames found.")
+        return 1
+    speed = 0.0 if str(args.speed).lower() == "max" else float(args.speed)
+    span = frames[-1][0] - frames[0][0]
+    print(f"Loaded {len(frames)} frames spanning {span:.1f}s of recorded time.")
+
+    server = ReplayServer(frames, speed)
+    async with websockets.serve(server.handler, "127.0.0.1", args.port) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        controller = HeadlessController(world_id=args.world, char_data=parse_chars(args.char), quiet=not args.verbose)
+        if controller.char_data and not args.no_auto_track:
+            controller.current_character_id = next(iter(controller.char_data.values()))
+        worker = CensusWorker(controller, "replay", uri=f"ws://127.0.0.1:{port}")
+        worker.start()
+
+        await server.done.wait()
+        drained = await wait_drained(worker, args.drain_timeout)
+        end = time.perf_counter()
+
+    stats = worker.get_pipeline_stats()
+    send_s = max(1e-9, server.finished_at - server.started_at)
+    total_s = max(1e-9, end - server.started_at)
+    report = {
+        "frames_sent": server.sent,
+        "speed": "max" if speed <= 0 else speed,
+        "send_seconds": round(send_s, 3),
+        "pipeline_seconds": round(total_s, 3),
+        "frames_per_s": round(server.sent / total_s, 1),
+        "drained": drained,
+        "players_tracked": len(controller.session_stats),
+        "overlay_events": dict(controller.overlay_events.most_common(15)),
+        "pipeline": stats,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Sent {server.sent} frames in {send_s:.2f}s; pipeline finished after {total_s:.2f}s "
+              f"({report['frames_per_s']} frames/s, drained={drained}).")
+        apply = stats["apply"]
+        print(f"Applied {stats['stages']['apply']['events']} events, filtered {stats['filtered_total']}, "
+              f"coalesced {apply['coalesced']}, dropped {apply['dropped'] + stats['raw_dropped']}, "
+              f"max apply depth {apply['max_depth']}.")
+        for name, st in stats["stages"].items():
+            print(f"  {name:<9} {st['avg_ms_per_event']:.4f} ms/event  (max batch {st['max_ms']:.2f} ms)")
+        print(f"Players tracked: {report['players_tracked']}")
+        if controller.overlay_events:
+            print("Overlay events:", ", ".join(f"{k}={v}" for k, v in report["overlay_events"].items()))
+    return 0 if drained else 2
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay recorded Census push traffic through a headless CensusWorker.")
+    ap.add_argument("paths", nargs="+", help="Recording files (.jsonl.gz) or directories of them")
+    ap.add_argument("--speed", default="1", help="Playback speed multiplier (1, 10, ...) or 'max'")
+    ap.add_argument("--port", type=int, default=0, help="Local websocket port (0 = pick a free one)")
+    ap.add_argument("--world", default="10", help="Dashboard world ID the worker filters on")
+    ap.add_argument("--char", action="append", help="Tracked character as Name=ID (repeatable)")
+    ap.add_argument("--no-auto-track", action="store_true", help="Do not pre-select the first --char as active")
+    ap.add_argument("--max-frames", type=int, default=0)
+    ap.add_argument("--drain-timeout", type=float, default=60.0)
+    ap.add_argument("--json", action="store_true", help="Print the report as JSON")
+    ap.add_argument("--verbose", action="store_true", help="Echo worker log lines")
+    args = ap.parse_args()
+    return asyncio.run(run_replay(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -544,11 +544,15 @@
     setTelemetry(`EVENT: ${evType.toUpperCase()}`, warn);
 
     if (isHitmarker && !isStartupReplay()) {
-      spawnBurst(
-        Number(data.x || 0) + Number(data.width || 220) / 2,
-        Number(data.y || 0) + Number(data.height || 220) / 2,
-        warn
-      );
+      // Server-side coalescing folds same-frame hits into one message with coalesced_count.
+      const intensity = Math.max(1, Math.min(3, Number(data.coalesced_count || 1)));
+      for (let i = 0; i < intensity; i += 1) {
+        spawnBurst(
+          Number(data.x || 0) + Number(data.width || 220) / 2,
+          Number(data.y || 0) + Number(data.height || 220) / 2,
+          warn
+        );
+      }
     }
 
     if (shouldTriggerImpact(data, evType)) {
@@ -640,7 +644,7 @@
       `lanes out[s/c/n/cos]=${Number(s.events_out_state || 0)}/${Number(s.events_out_critical || 0)}/${Number(s.events_out_normal || 0)}/${Number(s.events_out_cosmetic || 0)}\n` +
       `server flush=${Number(s.flush_count || 0)} last_flush=${Number(s.last_flush_size || 0)}\n` +
       `server pend_state=${Number(s.max_pending_state || 0)} pend_trans=${Number(s.max_pending_transient || 0)}\n` +
-      `server coalesced=${Number(s.coalesce_replaced || 0)} deduped=${Number(s.deduped_total || 0)}\n` +
+      `server coalesced=${Number(s.coalesce_replaced || 0)} merged=${Number(s.coalesced_transient_total || 0)} deduped=${Number(s.deduped_total || 0)}\n` +
       `server dropped=${Number(s.dropped_total || 0)} ovf_drop=${Number(s.dropped_transient_overflow || 0)} cos_drop=${Number(s.dropped_cosmetic_total || 0)}\n` +
       `cfg dedupe_ms=${Number(s.dedupe_window_ms || 0)} cap=${Number(s.max_transient_pending_cfg || 0)} cos_cap=${Number(s.max_cosmetic_pending_cfg || 0)}\n` +
       `ws batch=${Boolean(s.ws_batching_v2)} batch_flush=${Number(s.batch_flush_count || 0)} legacy_flush=${Number(s.legacy_flush_count || 0)} last_batch=${Number(s.last_batch_size || 0)}\n` +
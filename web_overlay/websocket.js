@@ -1,4 +1,78 @@
 (function () {
+  // MessagePack reader for the types the overlay server emits
+  // (nil, bool, int, float, str, bin, array, map).
+  const utf8 = new TextDecoder();
+
+  function unpack(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let pos = 0;
+
+    function str(len) {
+      const text = utf8.decode(bytes.subarray(pos, pos + len));
+      pos += len;
+      return text;
+    }
+    function bin(len) {
+      const out = bytes.slice(pos, pos + len);
+      pos += len;
+      return out;
+    }
+    function array(len) {
+      const out = new Array(len);
+      for (let i = 0; i < len; i += 1) {
+        out[i] = read();
+      }
+      return out;
+    }
+    function map(len) {
+      const out = {};
+      for (let i = 0; i < len; i += 1) {
+        const key = read();
+        out[key] = read();
+      }
+      return out;
+    }
+    function read() {
+      const b = bytes[pos];
+      pos += 1;
+      if (b <= 0x7f) return b;
+      if (b >= 0xe0) return b - 0x100;
+      if ((b & 0xe0) === 0xa0) return str(b & 0x1f);
+      if ((b & 0xf0) === 0x90) return array(b & 0x0f);
+      if ((b & 0xf0) === 0x80) return map(b & 0x0f);
+      let v;
+      switch (b) {
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xc4: v = bytes[pos]; pos += 1; return bin(v);
+        case 0xc5: v = view.getUint16(pos); pos += 2; return bin(v);
+        case 0xc6: v = view.getUint32(pos); pos += 4; return bin(v);
+        case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+        case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+        case 0xcc: v = bytes[pos]; pos += 1; return v;
+        case 0xcd: v = view.getUint16(pos); pos += 2; return v;
+        case 0xce: v = view.getUint32(pos); pos += 4; return v;
+        case 0xcf: v = view.getUint32(pos) * 4294967296 + view.getUint32(pos + 4); pos += 8; return v;
+        case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+        case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+        case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+        case 0xd3: v = view.getInt32(pos) * 4294967296 + view.getUint32(pos + 4); pos += 8; return v;
+        case 0xd9: v = bytes[pos]; pos += 1; return str(v);
+        case 0xda: v = view.getUint16(pos); pos += 2; return str(v);
+        case 0xdb: v = view.getUint32(pos); pos += 4; return str(v);
+        case 0xdc: v = view.getUint16(pos); pos += 2; return array(v);
+        case 0xdd: v = view.getUint32(pos); pos += 4; return array(v);
+        case 0xde: v = view.getUint16(pos); pos += 2; return map(v);
+        case 0xdf: v = view.getUint32(pos); pos += 4; return map(v);
+        default: throw new Error(`msgpack: unsupported type 0x${b.toString(16)}`);
+      }
+    }
+
+    return read();
+  }
+
   class OverlaySocket {
     constructor(onMessage) {
       this.onMessage = onMessage;
@@ -6,18 +80,56 @@
       this.retryDelayMs = 1000;
       this.maxRetryMs = 12000;
       this.retryTimer = null;
+      // Compact protocol tables, set by the server's hello frame.
+      this.categories = null;
+      this.lanes = null;
       this.connect();
     }
 
     wsUrl() {
       const cfg = window.OVERLAY_CONFIG || {};
       const port = Number(cfg.wsPort || 31338);
-      return `ws://127.0.0.1:${port}/better_planetside`;
+      let query = "";
+      if (cfg.compactWire) {
+        query = cfg.wireMsgpack ? "?proto=c1&enc=msgpack" : "?proto=c1";
+      }
+      return `ws://127.0.0.1:${port}/better_planetside${query}`;
+    }
+
+    // [category, data] or [category, data, seq, lane, coalesce_key] -> the JSON message shape.
+    expandCompact(fields) {
+      const cat = fields[0];
+      const message = {
+        category: typeof cat === "number" ? this.categories[cat] : cat,
+        data: fields[1] || {}
+      };
+      if (fields.length > 2) {
+        message.meta = {
+          seq: fields[2],
+          v2: { category: this.lanes[fields[3]] || "normal", coalesce_key: fields[4] || "" }
+        };
+      }
+      return message;
+    }
+
+    deliverBatch(messages, rxMs) {
+      messages.forEach((msg, idx) => {
+        if (msg && typeof msg === "object") {
+          msg.__perf_ws_rx_ms = rxMs;
+          msg.__from_batch = true;
+          msg.__batch_index = idx;
+          msg.__batch_size = messages.length;
+        }
+        this.onMessage(msg);
+      });
     }
 
     connect() {
       this.clearRetry();
+      this.categories = null;
+      this.lanes = null;
       this.ws = new WebSocket(this.wsUrl());
+      this.ws.binaryType = "arraybuffer";
 
       this.ws.onopen = () => {
         this.retryDelayMs = 1000;
@@ -25,18 +137,16 @@
 
       this.ws.onmessage = (event) => {
         try {
-          const payload = JSON.parse(event.data);
+          const payload = typeof event.data === "string" ? JSON.parse(event.data) : unpack(event.data);
           const rxMs = performance.now();
-          if (payload && payload.kind === "batch" && Array.isArray(payload.events)) {
-            payload.events.forEach((msg, idx) => {
-              if (msg && typeof msg === "object") {
-                msg.__perf_ws_rx_ms = rxMs;
-                msg.__from_batch = true;
-                msg.__batch_index = idx;
-                msg.__batch_size = payload.events.length;
-              }
-              this.onMessage(msg);
-            });
+          if (payload && payload.k === "hello") {
+            this.categories = payload.cats || [];
+            this.lanes = payload.lanes || [];
+          } else if (payload && this.categories && Array.isArray(payload.e)) {
+            this.deliverBatch(payload.e.map((fields) => this.expandCompact(fields)), rxMs);
+          } else if (payload && payload.kind === "batch" && Array.isArray(payload.events)) {
+            // JSON protocol: also what a compact request gets from a server with it turned off.
+            this.deliverBatch(payload.events, rxMs);
           } else {
             if (payload && typeof payload === "object") {
               payload.__perf_ws_rx_ms = rxMs;
@@ -77,4 +187,5 @@
   }
 
   window.OverlaySocket = OverlaySocket;
+  window.OverlaySocket.unpack = unpack;
 })();